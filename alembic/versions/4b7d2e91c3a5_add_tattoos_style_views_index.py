@@ -0,0 +1,30 @@
+"""add gallery index on tattoos(style_id, views desc, id)
+
+Revision ID: 4b7d2e91c3a5
+Revises: 9f3c1b2a7d10
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "4b7d2e91c3a5"
+down_revision = "9f3c1b2a7d10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches the gallery order, so keyset pages are plain index range scans.
+    op.create_index(
+        "ix_tattoos_style_id_views_id",
+        "tattoos",
+        ["style_id", sa.text("views DESC"), "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tattoos_style_id_views_id", table_name="tattoos")
@@ -0,0 +1,33 @@
+"""add styles.top_tattoo_id summary column
+
+Revision ID: 8d1f5a3e6b27
+Revises: 4b7d2e91c3a5
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "8d1f5a3e6b27"
+down_revision = "4b7d2e91c3a5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("styles", sa.Column("top_tattoo_id", sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE styles SET top_tattoo_id = (
+            SELECT t.id FROM tattoos t
+            WHERE t.style_id = styles.id
+            ORDER BY t.views DESC, t.id
+            LIMIT 1
+        )
+        """)
+
+
+def downgrade() -> None:
+    op.drop_column("styles", "top_tattoo_id")
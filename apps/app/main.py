@@ -6,22 +6,38 @@ import logging
 import time
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import Update
 from fastapi import FastAPI, HTTPException, Request
 from redis.asyncio import Redis
 
+from apps.app.routes.calendar import router as calendar_router
 from apps.app.routes.health import router as health_router
 from apps.app.routes.miniapp import router as miniapp_router
 from apps.app.routes.pricing import router as pricing_router
 from apps.app.routes.webapp import router as webapp_router
 from apps.bot.middlewares.db_session import DbSessionMiddleware
+from apps.bot.middlewares.fsm_unit_of_work import UnitOfWorkFSMMiddleware
 from apps.bot.routers import create_bot_router
 from core.config.settings import Settings
 from core.logging.logger import setup_logging
+from core.services.calendar_availability import AvailabilityCache
+from core.services.catalog import CatalogStore
+from core.services.gallery_cache import GalleryCache
 from core.services.mode import BotMode, get_bot_mode
+from core.services.month_cache import MonthCache
+from core.services.schedule import DEFAULT_SCHEDULE_POLICY
+from core.services.slot_holds import SlotHolds
+from core.services.user_cache import UserCache
+from core.services.view_counters import ViewCounters
+from core.services.webapp_context_service import SELECTED_DESIGN_KEY_PATTERN
 from infra.db.session import create_async_engine, create_sessionmaker
 from infra.redis.client import create_redis
+from infra.redis.fsm_storage import (
+    COMPACT_FSM_PREFIX,
+    LEGACY_FSM_PREFIX,
+    CompactRedisStorage,
+)
+from infra.redis.lifecycle import KeyTtlPolicy, run_key_sweeper
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +55,15 @@ def create_bot(settings: Settings) -> Bot:
 
 
 def create_dispatcher(*, settings: Settings, redis: Redis) -> Dispatcher:
-    storage = RedisStorage(redis=redis)
-    dp = Dispatcher(storage=storage)
+    storage = CompactRedisStorage(redis=redis, ttl_seconds=settings.fsm_ttl_seconds)
+    # Stock FSM middleware is replaced: one FSM read + at most one write per update.
+    dp = Dispatcher(storage=storage, disable_fsm=True)
+    dp.fsm = UnitOfWorkFSMMiddleware(
+        storage=dp.fsm.storage,
+        events_isolation=dp.fsm.events_isolation,
+        strategy=dp.fsm.strategy,
+    )
+    dp.update.outer_middleware(dp.fsm)
     dp["settings"] = settings
     # Inject per-update AsyncSession via middleware.
     # Repositories/services should accept `session: AsyncSession`.
@@ -48,6 +71,14 @@ def create_dispatcher(*, settings: Settings, redis: Redis) -> Dispatcher:
     return dp
 
 
+def _key_ttl_policies(settings: Settings) -> list[KeyTtlPolicy]:
+    return [
+        KeyTtlPolicy(f"{COMPACT_FSM_PREFIX}:*", settings.fsm_ttl_seconds),
+        KeyTtlPolicy(f"{LEGACY_FSM_PREFIX}:*", settings.fsm_ttl_seconds),
+        KeyTtlPolicy(SELECTED_DESIGN_KEY_PATTERN, settings.selected_design_ttl_seconds),
+    ]
+
+
 async def start_polling(bot: Bot, dp: Dispatcher) -> None:
     await dp.start_polling(bot)
 
@@ -61,6 +92,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     app.include_router(miniapp_router)
     app.include_router(webapp_router)
     app.include_router(pricing_router)
+    app.include_router(calendar_router)
 
     app.state.settings = settings
     app.state.logger = app_logger
@@ -69,10 +101,30 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     app.state.db_engine = engine
     app.state.session_maker = create_sessionmaker(engine=engine)
     app.state.redis = create_redis(settings.redis_url)
+    # Slot occupancy shared by booking/admin handlers; kept in sync across workers.
+    app.state.availability_cache = AvailabilityCache(
+        redis=app.state.redis, policy=DEFAULT_SCHEDULE_POLICY
+    )
+    app.state.calendar_months = MonthCache(session_maker=app.state.session_maker)
+    app.state.slot_holds = SlotHolds(redis=app.state.redis)
+    app.state.user_cache = UserCache()
+    app.state.catalog = CatalogStore(redis=app.state.redis)
+    app.state.gallery_cache = GalleryCache(redis=app.state.redis)
+    app.state.view_counters = ViewCounters(
+        session_maker=app.state.session_maker,
+        interval_seconds=settings.view_flush_interval_seconds,
+    )
 
     bot = create_bot(settings)
     dp = create_dispatcher(settings=settings, redis=app.state.redis)
     dp["session_maker"] = app.state.session_maker
+    dp["availability_cache"] = app.state.availability_cache
+    dp["calendar_months"] = app.state.calendar_months
+    dp["slot_holds"] = app.state.slot_holds
+    dp["user_cache"] = app.state.user_cache
+    dp["catalog"] = app.state.catalog
+    dp["gallery_cache"] = app.state.gallery_cache
+    dp["view_counters"] = app.state.view_counters
     dp.update.outer_middleware(DbSessionMiddleware(app.state.session_maker))
     app.state.bot = bot
     app.state.dispatcher = dp
@@ -159,6 +211,26 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 "MINI_APP_DEV_URL uses localhost; Telegram Desktop may work, "
                 "mobile Telegram clients will not reach your PC localhost"
             )
+        app.state.availability_listener_task = asyncio.create_task(
+            app.state.availability_cache.listen()
+        )
+        app.state.catalog_listener_task = asyncio.create_task(
+            app.state.catalog.listen()
+        )
+        app.state.key_sweeper_task = asyncio.create_task(
+            run_key_sweeper(
+                app.state.redis,
+                _key_ttl_policies(settings),
+                interval_seconds=settings.redis_sweep_interval_seconds,
+            )
+        )
+        app.state.view_flush_task = asyncio.create_task(app.state.view_counters.run())
+        storage = getattr(dp, "storage", None)
+        if isinstance(storage, CompactRedisStorage):
+            # Moves FSM records left by the previous RedisStorage layout.
+            app.state.fsm_migration_task = asyncio.create_task(
+                storage.migrate_legacy_keys()
+            )
         if mode == BotMode.POLLING:
             app.state.polling_task = asyncio.create_task(start_polling(bot, dp))
             app_logger.info("Polling started")
@@ -191,6 +263,28 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         else:
             await bot.delete_webhook(drop_pending_updates=False)
 
+        for task_name in ("fsm_migration_task", "key_sweeper_task", "view_flush_task"):
+            task = getattr(app.state, task_name, None)
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        try:
+            await app.state.view_counters.flush()
+        except Exception:
+            app_logger.warning(
+                "Final view counter flush failed",
+                extra={"pending": app.state.view_counters.pending()},
+                exc_info=True,
+            )
+
+        for task_name in ("availability_listener_task", "catalog_listener_task"):
+            listener_task = getattr(app.state, task_name, None)
+            if listener_task is not None:
+                listener_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await listener_task
+
         await bot.session.close()
 
         if hasattr(app.state, "db_engine"):
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.app.routes.deps import get_availability_cache, get_session
+from apps.app.schemas.calendar import CalendarAvailabilityResponse
+from core.services.calendar_availability import AvailabilityCache
+from core.services.schedule import today_msk
+
+router = APIRouter(prefix="/api/calendar", tags=["calendar"])
+logger = logging.getLogger(__name__)
+
+# Short freshness window; afterwards clients revalidate with If-None-Match.
+_CACHE_CONTROL = "public, max-age=15, must-revalidate"
+
+
+def _etag(*, version: int, today: date, start: date, end: date) -> str:
+    # `today` is part of the tag: the horizon (and past days) move at midnight.
+    return f'"av{version}-{today:%Y%m%d}-{start:%Y%m%d}-{end:%Y%m%d}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@router.get("/availability", response_model=CalendarAvailabilityResponse)
+async def calendar_availability(
+    request: Request,
+    response: Response,
+    cache: Annotated[AvailabilityCache, Depends(get_availability_cache)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    start: Annotated[date | None, Query(alias="from")] = None,
+    end: Annotated[date | None, Query(alias="to")] = None,
+) -> CalendarAvailabilityResponse | Response:
+    today = today_msk()
+    horizon_end = today + timedelta(days=cache.policy.days_ahead)
+    start = max(start or today, today)
+    end = min(end or horizon_end, horizon_end)
+    if start > end:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+
+    # Conditional GET costs one Redis GET and never touches Postgres.
+    version = await cache.version()
+    etag = _etag(version=version, today=today, start=start, end=end)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL},
+        )
+
+    snapshot = await cache.read_snapshot(today=today)
+    if snapshot is not None:
+        version, states = snapshot
+    else:
+        # Cold shared snapshot (first request of the day): build it once.
+        logger.info("Availability snapshot missing, loading from DB")
+        await cache.ensure_loaded(session=session, today=today)
+        states = {}
+        cur = start
+        while cur <= end:
+            states[cur] = cache.day_state(cur)
+            cur += timedelta(days=1)
+
+    free: list[int] = []
+    cur = start
+    while cur <= end:
+        booked, blocked, is_day_off = states.get(cur, (0, 0, False))
+        free.append(0 if is_day_off else cache.full_mask & ~(booked | blocked))
+        cur += timedelta(days=1)
+
+    response.headers["ETag"] = _etag(version=version, today=today, start=start, end=end)
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    return CalendarAvailabilityResponse(
+        version=version,
+        start=start,
+        end=end,
+        slots=list(cache.slots),
+        free=free,
+    )
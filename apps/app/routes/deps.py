@@ -12,6 +12,9 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from core.config.settings import Settings
+from core.services.calendar_availability import AvailabilityCache
+from core.services.catalog import CatalogStore
+from core.services.user_cache import UserCache
 from core.services.webapp_auth_service import WebAppIdentity, get_identity_by_token
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -27,6 +30,18 @@ def get_redis(request: Request) -> Redis:
     return request.app.state.redis
 
 
+def get_availability_cache(request: Request) -> AvailabilityCache:
+    return request.app.state.availability_cache
+
+
+def get_user_cache(request: Request) -> UserCache:
+    return request.app.state.user_cache
+
+
+def get_catalog(request: Request) -> CatalogStore:
+    return request.app.state.catalog
+
+
 async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     session_maker: async_sessionmaker[AsyncSession] = request.app.state.session_maker
     async with session_maker() as session:
@@ -6,9 +6,10 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from apps.app.routes.deps import get_session, get_webapp_identity
+from apps.app.routes.deps import get_session, get_user_cache, get_webapp_identity
 from apps.app.schemas.webapp import PricingCalcRequest, PricingCalcResponse
 from core.services.pricing_service import PricingRequest, calculate_price
+from core.services.user_cache import UserCache
 from core.services.webapp_auth_service import WebAppIdentity
 
 router = APIRouter(prefix="/api/pricing", tags=["pricing"])
@@ -20,6 +21,7 @@ async def pricing_calc(
     payload: PricingCalcRequest,
     identity: Annotated[WebAppIdentity, Depends(get_webapp_identity)],
     session: Annotated[AsyncSession, Depends(get_session)],
+    users: Annotated[UserCache, Depends(get_user_cache)],
 ) -> PricingCalcResponse:
     logger.info(
         "Pricing calculation requested",
@@ -39,6 +41,7 @@ async def pricing_calc(
                 body_zone=payload.body_zone,
                 promo_code=payload.promo_code,
             ),
+            users=users,
         )
     except ValueError as e:
         logger.warning(
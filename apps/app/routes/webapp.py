@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.app.routes.deps import (
     enforce_webapp_auth_rate_limit,
+    get_catalog,
     get_redis,
     get_session,
     get_settings,
@@ -23,7 +24,7 @@ from apps.app.schemas.webapp import (
     WebAppUser,
 )
 from core.config.settings import Settings
-from core.repositories.tattoos import get_tattoo
+from core.services.catalog import CatalogStore
 from core.services.webapp_auth_service import WebAppIdentity, authenticate_webapp
 from core.services.webapp_context_service import (
     build_webapp_context,
@@ -67,12 +68,14 @@ async def webapp_context(
     identity: Annotated[WebAppIdentity, Depends(get_webapp_identity)],
     session: Annotated[AsyncSession, Depends(get_session)],
     redis: Annotated[Redis, Depends(get_redis)],
+    catalog: Annotated[CatalogStore, Depends(get_catalog)],
 ) -> WebAppContextResponse:
     logger.info("WebApp context requested", extra={"tg_id": identity.tg_id})
     context = await build_webapp_context(
         session=session,
         redis=redis,
         identity=identity,
+        catalog=catalog,
     )
     return WebAppContextResponse(
         user=WebAppUser(tg_id=context.tg_id, username=context.username),
@@ -85,15 +88,18 @@ async def webapp_context(
 @router.post("/selected-design", response_model=SelectedDesignResponse)
 async def webapp_selected_design(
     payload: SelectedDesignRequest,
+    settings: Annotated[Settings, Depends(get_settings)],
     identity: Annotated[WebAppIdentity, Depends(get_webapp_identity)],
     session: Annotated[AsyncSession, Depends(get_session)],
     redis: Annotated[Redis, Depends(get_redis)],
+    catalog: Annotated[CatalogStore, Depends(get_catalog)],
 ) -> SelectedDesignResponse:
     logger.info(
         "WebApp selected design update requested",
         extra={"tg_id": identity.tg_id, "tattoo_id": payload.tattoo_id},
     )
-    tattoo = await get_tattoo(session=session, tattoo_id=payload.tattoo_id)
+    snapshot = await catalog.current(session=session)
+    tattoo = snapshot.tattoo(payload.tattoo_id)
     if tattoo is None:
         logger.warning(
             "WebApp selected design not found",
@@ -105,6 +111,7 @@ async def webapp_selected_design(
         redis=redis,
         tg_id=identity.tg_id,
         tattoo_id=payload.tattoo_id,
+        ttl_seconds=settings.selected_design_ttl_seconds,
     )
     logger.info(
         "WebApp selected design updated",
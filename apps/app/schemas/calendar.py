@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CalendarAvailabilityResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    version: int
+    start: date = Field(alias="from")
+    end: date = Field(alias="to")
+    # Slot labels; bit i of a day's mask refers to slots[i].
+    slots: list[str]
+    # One free-slot bitmask per day from `from` to `to` inclusive.
+    free: list[int]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from calendar import monthrange
-from datetime import date, time
+from datetime import date, time, timedelta
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
@@ -19,13 +19,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from apps.bot.states.admin_calendar import AdminCalendarStates
 from core.config.settings import Settings
 from core.repositories import schedule_exceptions as exc_repo
-from core.services.calendar_availability import _parse_time_hhmm
+from core.services.calendar_availability import AvailabilityCache, _parse_time_hhmm
 from core.services.calendar_ui import CalendarCb, CalendarView, build_calendar_keyboard
+from core.services.callback_codec import CompiledCallbackCodec
 from core.services.menu import MENU_ADMIN
+from core.services.month_cache import MonthCache, MonthLoader
 from core.services.schedule import DEFAULT_SCHEDULE_POLICY, list_time_slots, today_msk
 
 
-class AdminCalCb(CallbackData, prefix="admincal"):
+class AdminCalCb(CompiledCallbackCodec, CallbackData, prefix="admincal"):
     action: str
     value: str | None = None
 
@@ -87,15 +89,42 @@ def _month_bounds(view: CalendarView) -> tuple[date, date]:
     return start, end
 
 
+def _day_off_loader(view: CalendarView) -> MonthLoader:
+    async def load(session: AsyncSession) -> set[date]:
+        start, end = _month_bounds(view)
+        return await exc_repo.list_day_off_dates(
+            session=session, start_date=start, end_date_inclusive=end
+        )
+
+    return load
+
+
 async def _dayoff_calendar_kb(
     *,
     session: AsyncSession,
+    availability: AvailabilityCache,
+    months: MonthCache,
     today: date,
     view: CalendarView,
 ) -> InlineKeyboardMarkup:
     start, end = _month_bounds(view)
-    marked = await exc_repo.list_day_off_dates(
-        session=session, start_date=start, end_date_inclusive=end
+    # Day-off toggles from any worker bump the availability generation, so a
+    # marker set cached before the change is never served after it.
+    await availability.ensure_loaded(session=session, today=today)
+    generation = availability.generation
+    # Warm neighbouring months (within the navigable window) for prev/next.
+    max_day = today + timedelta(days=DEFAULT_SCHEDULE_POLICY.days_ahead)
+    for adjacent in (start - timedelta(days=1), end + timedelta(days=1)):
+        if date(today.year, today.month, 1) <= adjacent <= max_day:
+            adjacent_view = CalendarView(year=adjacent.year, month=adjacent.month)
+            months.prefetch(
+                ("day_off", adjacent_view.year, adjacent_view.month, generation),
+                _day_off_loader(adjacent_view),
+            )
+    marked = await months.get(
+        ("day_off", view.year, view.month, generation),
+        _day_off_loader(view),
+        session=session,
     )
     kb = build_calendar_keyboard(
         today=today,
@@ -141,6 +170,8 @@ def create_admin_calendar_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
     ) -> None:
         if query.message is None:
             await query.answer()
@@ -153,7 +184,13 @@ def create_admin_calendar_router() -> Router:
 
         today = today_msk()
         view = CalendarView(year=today.year, month=today.month)
-        kb = await _dayoff_calendar_kb(session=session, today=today, view=view)
+        kb = await _dayoff_calendar_kb(
+            session=session,
+            availability=availability_cache,
+            months=calendar_months,
+            today=today,
+            view=view,
+        )
         await state.set_state(AdminCalendarStates.day_off_date)
         await query.message.answer("Выберите дату (toggle выходной):", reply_markup=kb)
         await query.answer()
@@ -205,6 +242,8 @@ def create_admin_calendar_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
     ) -> None:
         if query.message is None:
             await query.answer()
@@ -219,6 +258,8 @@ def create_admin_calendar_router() -> Router:
             today = today_msk()
             kb = await _dayoff_calendar_kb(
                 session=session,
+                availability=availability_cache,
+                months=calendar_months,
                 today=today,
                 view=CalendarView(year=callback_data.year, month=callback_data.month),
             )
@@ -237,11 +278,15 @@ def create_admin_calendar_router() -> Router:
 
         async with session.begin():
             now_day_off = await exc_repo.toggle_day_off(session=session, day=chosen)
+        await availability_cache.publish_day_off(day=chosen, is_day_off=now_day_off)
+        calendar_months.clear()
 
         # Refresh calendar markup to show updated markers.
         today = today_msk()
         kb = await _dayoff_calendar_kb(
             session=session,
+            availability=availability_cache,
+            months=calendar_months,
             today=today,
             view=CalendarView(year=callback_data.year, month=callback_data.month),
         )
@@ -313,6 +358,8 @@ def create_admin_calendar_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
     ) -> None:
         if query.message is None:
             await query.answer()
@@ -350,6 +397,10 @@ def create_admin_calendar_router() -> Router:
                 day=day,
                 slot_time=slot_time,
             )
+        await availability_cache.publish_blocked_slot(
+            day=day, slot_time=slot_time, is_blocked=now_blocked
+        )
+        calendar_months.clear()
 
         # Refresh keyboard so admin sees current blocked slots.
         blocked = await exc_repo.list_blocked_slots_for_date(session=session, day=day)
@@ -10,11 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.bot.states.admin_catalog import AdminCatalogStates
 from core.config.settings import Settings
-from core.repositories.styles import create_style, list_styles
+from core.repositories.styles import create_style
 from core.repositories.tattoos import create_tattoo
+from core.services.callback_codec import CompiledCallbackCodec
+from core.services.catalog import CatalogStore
 
 
-class AdminCatalogCb(CallbackData, prefix="admincat"):
+class AdminCatalogCb(CompiledCallbackCodec, CallbackData, prefix="admincat"):
     action: str
     style_id: int | None = None
 
@@ -43,6 +45,7 @@ def create_admin_catalog_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        catalog: CatalogStore,
     ) -> None:
         if not _ensure_admin(message, settings):
             await state.clear()
@@ -60,6 +63,7 @@ def create_admin_catalog_router() -> Router:
         except ValueError:
             await message.answer("Стиль уже существует.")
             return
+        await catalog.publish_change(session=session)
 
         await state.clear()
         await message.answer(f"Стиль создан: {style.name} (id={style.id})")
@@ -70,12 +74,13 @@ def create_admin_catalog_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        catalog: CatalogStore,
     ) -> None:
         if not _ensure_admin(message, settings):
             await message.answer("Недостаточно прав.")
             return
 
-        styles = await list_styles(session=session)
+        styles = (await catalog.current(session=session)).styles
         if not styles:
             await message.answer("Сначала добавьте стиль: /add_style")
             return
@@ -167,6 +172,7 @@ def create_admin_catalog_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        catalog: CatalogStore,
     ) -> None:
         if not _ensure_admin(message, settings):
             await state.clear()
@@ -203,6 +209,7 @@ def create_admin_catalog_router() -> Router:
         except ValueError:
             await message.answer("Тату с таким названием уже существует.")
             return
+        await catalog.publish_change(session=session)
 
         await state.clear()
         await message.answer(f"Тату создано: {tattoo.name} (id={tattoo.id})")
@@ -1,44 +1,64 @@
 from __future__ import annotations
 
-from datetime import date
+import asyncio
+import logging
+from datetime import date, timedelta
 from typing import Any
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import (
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+)
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.bot.middlewares.fsm_unit_of_work import flush_fsm
 from apps.bot.states.booking import BookingStates
 from core.config.settings import Settings
-from core.repositories.orders import exists_order_with_start_at
 from core.services.booking_flow import (
     CONFIRM_IN_FLIGHT_KEY,
     ORDER_ID_KEY,
     QUESTION_MESSAGE_ID_KEY,
+    QUESTION_RENDER_HASH_KEY,
+    SLOT_HOLD_KEY,
     SUMMARY_MESSAGE_ID_KEY,
+    SUMMARY_RENDER_HASH_KEY,
     BookingCb,
     build_summary_keyboard,
-    encode_calendar_time_for_callback,
+    calendar_slot_key_from_callback,
+    encode_calendar_slot_for_callback,
     next_missing_step,
     parse_set_value,
     question_for_step,
+    render_fingerprint,
     render_summary,
     reset_booking_draft_data,
 )
 from core.services.calendar_availability import (
+    AvailabilityCache,
     CalendarAvailabilityService,
-    _parse_time_hhmm,
 )
 from core.services.calendar_ui import CalendarCb, CalendarView, build_calendar_keyboard
 from core.services.menu import MENU_BOOK, build_main_menu_keyboard
+from core.services.month_cache import MonthCache
 from core.services.schedule import (
     DEFAULT_SCHEDULE_POLICY,
-    compose_start_at_utc,
+    hhmm_to_minutes,
+    minutes_to_hhmm,
+    slot_key,
+    slot_key_to_msk,
     today_msk,
 )
+from core.services.slot_holds import SlotHolds
+from core.services.user_cache import UserCache
+
+logger = logging.getLogger(__name__)
 
 _EDIT_FIELDS = {
     "want_custom_sketch",
@@ -63,7 +83,53 @@ def _state_for_step(step: str) -> Any:
     return mapping[step]
 
 
-def _build_time_keyboard(*, slots: list[str]) -> Any:
+def _availability_service(
+    cache: AvailabilityCache, months: MonthCache, holds: SlotHolds
+) -> CalendarAvailabilityService:
+    return CalendarAvailabilityService(
+        policy=DEFAULT_SCHEDULE_POLICY, index=cache, months=months, holds=holds
+    )
+
+
+async def _release_slot_hold(
+    *, service: CalendarAvailabilityService, state: FSMContext, data: dict[str, Any]
+) -> None:
+    key = data.pop(SLOT_HOLD_KEY, None)
+    if service.holds is not None and isinstance(key, int):
+        await service.holds.release(key=key, holder=state.key.user_id)
+
+
+async def _calendar_keyboard(
+    *,
+    service: CalendarAvailabilityService,
+    session: AsyncSession,
+    today: date,
+    view: CalendarView,
+) -> InlineKeyboardMarkup:
+    # Only the displayed month is computed; adjacent months are prefetched.
+    disabled = await service.get_month_disabled_dates(
+        session=session, today=today, year=view.year, month=view.month
+    )
+    kb = build_calendar_keyboard(
+        today=today,
+        view=view,
+        policy=DEFAULT_SCHEDULE_POLICY,
+        disabled_dates=disabled,
+    )
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            *kb.inline_keyboard,
+            [
+                InlineKeyboardButton(
+                    text="Ближайшее свободное",
+                    callback_data=BookingCb(action="first_free").pack(),
+                )
+            ],
+        ]
+    )
+
+
+def _build_time_keyboard(*, day: date, slots: list[str]) -> Any:
     builder = InlineKeyboardBuilder()
     for slot in slots:
         builder.button(
@@ -71,7 +137,9 @@ def _build_time_keyboard(*, slots: list[str]) -> Any:
             callback_data=BookingCb(
                 action="set",
                 field="calendar_time",
-                value=encode_calendar_time_for_callback(slot),
+                value=encode_calendar_slot_for_callback(
+                    slot_key(day, hhmm_to_minutes(slot))
+                ),
             ).pack(),
         )
     builder.adjust(3)
@@ -100,6 +168,28 @@ async def _try_edit_message(
         return False
 
 
+async def _edit_if_changed(
+    *,
+    message: Message,
+    message_id: int,
+    text: str,
+    reply_markup: InlineKeyboardMarkup | None,
+    known_hash: str | None,
+) -> str | None:
+    """
+    Edit a flow message unless it already shows exactly this content.
+
+    Returns the content fingerprint (to store in FSM) or None if the edit failed.
+    """
+    fingerprint = render_fingerprint(text, reply_markup)
+    if fingerprint == known_hash:
+        return fingerprint
+    ok = await _try_edit_message(
+        message=message, message_id=message_id, text=text, reply_markup=reply_markup
+    )
+    return fingerprint if ok else None
+
+
 async def _try_delete_message(*, message: Message, message_id: int) -> bool:
     try:
         await message.bot.delete_message(chat_id=message.chat.id, message_id=message_id)
@@ -141,7 +231,12 @@ async def _replace_question_message(
     if question_id is not None:
         await _try_delete_message(message=message, message_id=question_id)
     sent = await message.answer(text, reply_markup=reply_markup)
-    await state.update_data({QUESTION_MESSAGE_ID_KEY: sent.message_id})
+    await state.update_data(
+        {
+            QUESTION_MESSAGE_ID_KEY: sent.message_id,
+            QUESTION_RENDER_HASH_KEY: render_fingerprint(text, reply_markup),
+        }
+    )
 
 
 async def _render_flow(
@@ -150,6 +245,7 @@ async def _render_flow(
     state: FSMContext,
     step: str,
     session: AsyncSession,
+    service: CalendarAvailabilityService,
     override_question_text: str | None = None,
 ) -> None:
     data = await state.get_data()
@@ -161,101 +257,103 @@ async def _render_flow(
     if override_question_text is not None:
         question_text = override_question_text
 
-    service = CalendarAvailabilityService(policy=DEFAULT_SCHEDULE_POLICY)
-
     # Dynamic availability-aware keyboards for date/time steps.
-    if step == "calendar_date":
-        disabled = await service.get_disabled_dates(session=session, today=today_msk())
-        question_kb = build_calendar_keyboard(
-            today=today_msk(),
-            view=CalendarView(year=today_msk().year, month=today_msk().month),
-            policy=DEFAULT_SCHEDULE_POLICY,
-            disabled_dates=disabled,
-        )
-
-    if step == "calendar_time":
-        raw_date = data.get("calendar_date")
-        if not isinstance(raw_date, str):
-            # Fall back to date step if state is inconsistent.
-            disabled = await service.get_disabled_dates(
-                session=session, today=today_msk()
-            )
-            question_text = "Выберите дату:"
-            question_kb = build_calendar_keyboard(
-                today=today_msk(),
-                view=CalendarView(year=today_msk().year, month=today_msk().month),
-                policy=DEFAULT_SCHEDULE_POLICY,
-                disabled_dates=disabled,
-            )
-            step = "calendar_date"
-        else:
-            chosen_date = date.fromisoformat(raw_date)
-            slots = await service.get_available_slots(session=session, day=chosen_date)
-            if not slots:
-                # Date became unavailable (fully booked / blocked). Force re-pick.
-                data.pop("calendar_time", None)
-                data.pop("calendar_date", None)
-                await state.set_data(data)
-                disabled = await service.get_disabled_dates(
-                    session=session, today=today_msk()
-                )
-                question_text = (
-                    "На выбранную дату нет доступных слотов. Выберите другую дату:"
-                )
-                question_kb = build_calendar_keyboard(
-                    today=today_msk(),
-                    view=CalendarView(year=today_msk().year, month=today_msk().month),
-                    policy=DEFAULT_SCHEDULE_POLICY,
-                    disabled_dates=disabled,
-                )
+    if step in {"calendar_date", "calendar_time"}:
+        today = today_msk()
+        if step == "calendar_time":
+            raw_date = data.get("calendar_date")
+            if not isinstance(raw_date, str):
+                # Fall back to date step if state is inconsistent.
+                question_text = "Выберите дату:"
                 step = "calendar_date"
             else:
-                question_kb = _build_time_keyboard(slots=slots)
+                chosen_date = date.fromisoformat(raw_date)
+                slots = await service.get_available_slots(
+                    session=session, day=chosen_date, holder=state.key.user_id
+                )
+                if not slots:
+                    # Date became unavailable (fully booked / blocked). Force re-pick.
+                    data.pop("calendar_time", None)
+                    data.pop("calendar_date", None)
+                    await state.set_data(data)
+                    question_text = (
+                        "На выбранную дату нет доступных слотов. Выберите другую дату:"
+                    )
+                    step = "calendar_date"
+                else:
+                    question_kb = _build_time_keyboard(day=chosen_date, slots=slots)
+        if step == "calendar_date":
+            question_kb = await _calendar_keyboard(
+                service=service,
+                session=session,
+                today=today,
+                view=CalendarView(year=today.year, month=today.month),
+            )
 
     summary_id = data.get(SUMMARY_MESSAGE_ID_KEY)
     question_id = data.get(QUESTION_MESSAGE_ID_KEY)
 
     # Keep ordering invariant: summary must be "upper" message (older) than question.
     # If we can't edit both existing messages, we send a fresh pair in correct order.
+    # Unchanged messages are skipped; the two edits are independent, so they run
+    # concurrently.
     if summary_id is not None and question_id is not None:
-        ok_summary = await _try_edit_message(
-            message=message,
-            message_id=summary_id,
-            text=summary_text,
-            reply_markup=summary_kb,
-        )
-        ok_question = await _try_edit_message(
-            message=message,
-            message_id=question_id,
-            text=question_text,
-            reply_markup=question_kb,
+        summary_hash, question_hash = await asyncio.gather(
+            _edit_if_changed(
+                message=message,
+                message_id=summary_id,
+                text=summary_text,
+                reply_markup=summary_kb,
+                known_hash=data.get(SUMMARY_RENDER_HASH_KEY),
+            ),
+            _edit_if_changed(
+                message=message,
+                message_id=question_id,
+                text=question_text,
+                reply_markup=question_kb,
+                known_hash=data.get(QUESTION_RENDER_HASH_KEY),
+            ),
         )
-        if ok_summary and ok_question:
+        if summary_hash is not None and question_hash is not None:
+            await state.update_data(
+                {
+                    SUMMARY_RENDER_HASH_KEY: summary_hash,
+                    QUESTION_RENDER_HASH_KEY: question_hash,
+                }
+            )
             await state.set_state(_state_for_step(step))
             return
 
     # Best-effort cleanup: delete old bot messages (keep exactly 2 flow messages).
-    if summary_id is not None:
-        await _try_delete_message(message=message, message_id=summary_id)
-    if question_id is not None:
-        await _try_delete_message(message=message, message_id=question_id)
+    await asyncio.gather(
+        *(
+            _try_delete_message(message=message, message_id=message_id)
+            for message_id in (summary_id, question_id)
+            if message_id is not None
+        )
+    )
 
+    # Sequential on purpose: the summary must be sent (and so dated) first.
     sent_summary = await message.answer(summary_text, reply_markup=summary_kb)
     sent_question = await message.answer(question_text, reply_markup=question_kb)
-    summary_id = sent_summary.message_id
-    question_id = sent_question.message_id
 
     await state.update_data(
         {
-            SUMMARY_MESSAGE_ID_KEY: summary_id,
-            QUESTION_MESSAGE_ID_KEY: question_id,
+            SUMMARY_MESSAGE_ID_KEY: sent_summary.message_id,
+            QUESTION_MESSAGE_ID_KEY: sent_question.message_id,
+            SUMMARY_RENDER_HASH_KEY: render_fingerprint(summary_text, summary_kb),
+            QUESTION_RENDER_HASH_KEY: render_fingerprint(question_text, question_kb),
         }
     )
     await state.set_state(_state_for_step(step))
 
 
 async def _advance(
-    *, message: Message, state: FSMContext, session: AsyncSession
+    *,
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+    service: CalendarAvailabilityService,
 ) -> None:
     data = await state.get_data()
     step = next_missing_step(data)
@@ -263,9 +361,11 @@ async def _advance(
     if step == "calendar_time":
         raw_date = data.get("calendar_date")
         if isinstance(raw_date, str):
-            chosen_date = date.fromisoformat(raw_date)
-            service = CalendarAvailabilityService(policy=DEFAULT_SCHEDULE_POLICY)
-            slots = await service.get_available_slots(session=session, day=chosen_date)
+            slots = await service.get_available_slots(
+                session=session,
+                day=date.fromisoformat(raw_date),
+                holder=state.key.user_id,
+            )
             if not slots:
                 data.pop("calendar_time", None)
                 data.pop("calendar_date", None)
@@ -276,12 +376,15 @@ async def _advance(
                     state=state,
                     step=step,
                     session=session,
+                    service=service,
                     override_question_text=(
                         "На выбранную дату нет доступных слотов. Выберите другую дату:"
                     ),
                 )
                 return
-    await _render_flow(message=message, state=state, step=step, session=session)
+    await _render_flow(
+        message=message, state=state, step=step, session=session, service=service
+    )
 
 
 def create_booking_router() -> Router:
@@ -292,34 +395,62 @@ def create_booking_router() -> Router:
         message: Message,
         state: FSMContext,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
+        slot_holds: SlotHolds,
     ) -> None:
-        await _advance(message=message, state=state, session=session)
+        # Re-entry from the menu: the user may have deleted the flow messages,
+        # so don't trust the stored fingerprints.
+        await state.update_data(
+            {SUMMARY_RENDER_HASH_KEY: None, QUESTION_RENDER_HASH_KEY: None}
+        )
+        await _advance(
+            message=message,
+            state=state,
+            session=session,
+            service=_availability_service(
+                availability_cache, calendar_months, slot_holds
+            ),
+        )
 
     @router.message(BookingStates.promo_code)
     async def promo_code_input(
-        message: Message, state: FSMContext, session: AsyncSession
+        message: Message,
+        state: FSMContext,
+        session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
+        slot_holds: SlotHolds,
     ) -> None:
+        service = _availability_service(availability_cache, calendar_months, slot_holds)
         code = (message.text or "").strip()
         # Treat empty input as "not answered yet": ask again.
         if not code:
             data = await state.get_data()
             question_id = data.get(QUESTION_MESSAGE_ID_KEY)
             if question_id is not None:
-                ok = await _try_edit_message(
+                question_hash = await _edit_if_changed(
                     message=message,
                     message_id=question_id,
                     text="Введите промокод или нажмите «Пропустить».",
                     reply_markup=question_for_step("promo_code", today=today_msk())[1],
+                    known_hash=data.get(QUESTION_RENDER_HASH_KEY),
                 )
-                if not ok:
+                if question_hash is not None:
+                    await state.update_data({QUESTION_RENDER_HASH_KEY: question_hash})
+                else:
                     # Keep 2-message invariant and refresh message ids if needed.
                     await _render_flow(
-                        message=message, state=state, step="promo_code", session=session
+                        message=message,
+                        state=state,
+                        step="promo_code",
+                        session=session,
+                        service=service,
                     )
             return
 
         await state.update_data({"promo_code": code})
-        await _advance(message=message, state=state, session=session)
+        await _advance(message=message, state=state, session=session, service=service)
 
     @router.callback_query(CalendarCb.filter(), BookingStates.calendar_date)
     async def calendar_callback(
@@ -327,11 +458,15 @@ def create_booking_router() -> Router:
         callback_data: CalendarCb,
         state: FSMContext,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
+        slot_holds: SlotHolds,
     ) -> None:
         if query.message is None:
             await query.answer()
             return
 
+        service = _availability_service(availability_cache, calendar_months, slot_holds)
         current_state = await state.get_state()
         data = await state.get_data()
         summary_id = data.get(SUMMARY_MESSAGE_ID_KEY)
@@ -357,8 +492,6 @@ def create_booking_router() -> Router:
         if not (1 <= callback_data.month <= 12):
             await query.answer("Некорректные данные.", show_alert=False)
             return
-        from datetime import timedelta
-
         max_day = today + timedelta(days=DEFAULT_SCHEDULE_POLICY.days_ahead)
         if not (today.year - 1 <= callback_data.year <= max_day.year + 1):
             await query.answer("Некорректные данные.", show_alert=False)
@@ -381,21 +514,22 @@ def create_booking_router() -> Router:
             if question_id is None:
                 await query.answer()
                 return
-            service = CalendarAvailabilityService(policy=DEFAULT_SCHEDULE_POLICY)
-            disabled = await service.get_disabled_dates(session=session, today=today)
-            kb = build_calendar_keyboard(
+            kb = await _calendar_keyboard(
+                service=service,
+                session=session,
                 today=today,
                 view=CalendarView(year=callback_data.year, month=callback_data.month),
-                policy=DEFAULT_SCHEDULE_POLICY,
-                disabled_dates=disabled,
             )
-            ok = await _try_edit_message(
+            question_hash = await _edit_if_changed(
                 message=query.message,
                 message_id=question_id,
                 text="Выберите дату:",
                 reply_markup=kb,
+                known_hash=data.get(QUESTION_RENDER_HASH_KEY),
             )
-            if not ok:
+            if question_hash is not None:
+                await state.update_data({QUESTION_RENDER_HASH_KEY: question_hash})
+            else:
                 # If the question message was deleted or can't be edited, replace it
                 # and update FSM data.
                 await _replace_question_message(
@@ -426,9 +560,9 @@ def create_booking_router() -> Router:
             ):
                 await query.answer("Дата недоступна.", show_alert=False)
                 return
-            service = CalendarAvailabilityService(policy=DEFAULT_SCHEDULE_POLICY)
-            slots = await service.get_available_slots(session=session, day=chosen)
-            if not slots:
+            if not await service.get_available_slots(
+                session=session, day=chosen, holder=state.key.user_id
+            ):
                 await query.answer(
                     "На эту дату нет доступных слотов.", show_alert=False
                 )
@@ -436,8 +570,11 @@ def create_booking_router() -> Router:
 
             data["calendar_date"] = chosen.isoformat()
             data.pop("calendar_time", None)
+            await _release_slot_hold(service=service, state=state, data=data)
             await state.set_data(data)
-            await _advance(message=query.message, state=state, session=session)
+            await _advance(
+                message=query.message, state=state, session=session, service=service
+            )
             await query.answer()
             return
 
@@ -450,11 +587,17 @@ def create_booking_router() -> Router:
         state: FSMContext,
         settings: Settings,
         session: AsyncSession,
+        availability_cache: AvailabilityCache,
+        calendar_months: MonthCache,
+        slot_holds: SlotHolds,
+        user_cache: UserCache,
     ) -> None:
         if query.message is None:
             await query.answer()
             return
 
+        service = _availability_service(availability_cache, calendar_months, slot_holds)
+
         current_state = await state.get_state()
         data = await state.get_data()
         summary_id = data.get(SUMMARY_MESSAGE_ID_KEY)
@@ -479,7 +622,11 @@ def create_booking_router() -> Router:
                 await query.answer()
                 return
             await _render_flow(
-                message=query.message, state=state, step=step, session=session
+                message=query.message,
+                state=state,
+                step=step,
+                session=session,
+                service=service,
             )
             await query.answer()
             return
@@ -490,7 +637,9 @@ def create_booking_router() -> Router:
                 await query.answer()
                 return
             await state.update_data({field: None})
-            await _advance(message=query.message, state=state, session=session)
+            await _advance(
+                message=query.message, state=state, session=session, service=service
+            )
             await query.answer()
             return
 
@@ -512,6 +661,7 @@ def create_booking_router() -> Router:
                 data = await state.get_data()
                 data["calendar_date"] = parsed
                 data.pop("calendar_time", None)
+                await _release_slot_hold(service=service, state=state, data=data)
                 await state.set_data(data)
             else:
                 if field == "calendar_time":
@@ -521,16 +671,64 @@ def create_booking_router() -> Router:
                         await query.answer("Сначала выберите дату.", show_alert=False)
                         return
                     chosen_date = date.fromisoformat(raw_date)
-                    service = CalendarAvailabilityService(
-                        policy=DEFAULT_SCHEDULE_POLICY
-                    )
-                    if not await service.is_slot_available(
-                        session=session, day=chosen_date, slot_hhmm=str(parsed)
+                    key = calendar_slot_key_from_callback(value)
+                    if key is None:
+                        key = slot_key(chosen_date, hhmm_to_minutes(str(parsed)))
+                    holder = state.key.user_id
+                    if slot_key_to_msk(key)[0] != chosen_date or not (
+                        await service.is_slot_key_available(
+                            session=session, key=key, holder=holder
+                        )
                     ):
                         await query.answer("Слот недоступен.", show_alert=False)
                         return
-                await state.update_data({field: parsed})
-            await _advance(message=query.message, state=state, session=session)
+                    # Lease the slot while the user finishes the draft.
+                    if not await slot_holds.acquire(key=key, holder=holder):
+                        await query.answer(
+                            "Слот сейчас бронирует другой клиент. "
+                            "Выберите другое время.",
+                            show_alert=False,
+                        )
+                        return
+                    if data.get(SLOT_HOLD_KEY) != key:
+                        await _release_slot_hold(
+                            service=service, state=state, data=data
+                        )
+                    data[field] = parsed
+                    data[SLOT_HOLD_KEY] = key
+                    await state.set_data(data)
+                else:
+                    await state.update_data({field: parsed})
+            await _advance(
+                message=query.message, state=state, session=session, service=service
+            )
+            await query.answer()
+            return
+
+        if callback_data.action == "first_free":
+            # Pick date and time in one tap: lease the earliest slot we can get.
+            holder = state.key.user_id
+            candidates = await service.find_next_available(
+                session=session, from_day=today_msk(), count=3, holder=holder
+            )
+            for key in candidates:
+                if await slot_holds.acquire(key=key, holder=holder):
+                    break
+            else:
+                await query.answer("Свободных слотов нет.", show_alert=False)
+                return
+
+            day, minutes = slot_key_to_msk(key)
+            data = await state.get_data()
+            if data.get(SLOT_HOLD_KEY) != key:
+                await _release_slot_hold(service=service, state=state, data=data)
+            data["calendar_date"] = day.isoformat()
+            data["calendar_time"] = minutes_to_hhmm(minutes)
+            data[SLOT_HOLD_KEY] = key
+            await state.set_data(data)
+            await _advance(
+                message=query.message, state=state, session=session, service=service
+            )
             await query.answer()
             return
 
@@ -553,6 +751,8 @@ def create_booking_router() -> Router:
                     await query.answer("Подтверждаем заявку...", show_alert=False)
                     return
                 await state.update_data({CONFIRM_IN_FLIGHT_KEY: True})
+                # Concurrent taps must see the flag before the order commit.
+                await flush_fsm(state)
 
             calendar_date = data.get("calendar_date")
             calendar_time = data.get("calendar_time")
@@ -566,9 +766,14 @@ def create_booking_router() -> Router:
                 await query.answer("Некорректная дата.", show_alert=False)
                 await state.update_data({CONFIRM_IN_FLIGHT_KEY: False})
                 return
-            service = CalendarAvailabilityService(policy=DEFAULT_SCHEDULE_POLICY)
-            if not await service.is_slot_available(
-                session=session, day=chosen_date, slot_hhmm=str(calendar_time)
+            try:
+                chosen_key = slot_key(chosen_date, hhmm_to_minutes(str(calendar_time)))
+            except ValueError:
+                chosen_key = None
+            # No DB pre-check: taken, blocked and day-off slots are rejected by
+            # the booking statement itself.
+            if chosen_key is None or not await service.is_slot_key_open(
+                chosen_key, holder=user.id
             ):
                 await query.answer(
                     "Слот больше недоступен. Выберите другое время.", show_alert=False
@@ -582,6 +787,7 @@ def create_booking_router() -> Router:
                     state=state,
                     step="calendar_time",
                     session=session,
+                    service=service,
                 )
                 return
 
@@ -592,112 +798,115 @@ def create_booking_router() -> Router:
             # double-click duplicates.
             summary_id = data.get(SUMMARY_MESSAGE_ID_KEY)
             question_id = data.get(QUESTION_MESSAGE_ID_KEY)
-            if summary_id is not None:
-                await _try_edit_message(
+            # Keep texts, just remove keyboards.
+            question_text, _ = question_for_step("confirm", today=today_msk())
+            edits = {
+                hash_key: _edit_if_changed(
                     message=query.message,
-                    message_id=summary_id,
-                    text=render_summary(data),
+                    message_id=message_id,
+                    text=text,
                     reply_markup=None,
+                    known_hash=data.get(hash_key),
                 )
-            if question_id is not None:
-                # Keep text, just remove keyboard.
-                question_text, _ = question_for_step("confirm", today=today_msk())
-                await _try_edit_message(
-                    message=query.message,
-                    message_id=question_id,
-                    text=question_text,
-                    reply_markup=None,
+                for hash_key, message_id, text in (
+                    (SUMMARY_RENDER_HASH_KEY, summary_id, render_summary(data)),
+                    (QUESTION_RENDER_HASH_KEY, question_id, question_text),
                 )
+                if message_id is not None
+            }
+            hashes = await asyncio.gather(*edits.values())
+            # Failed edits forget the fingerprint so the next render edits again.
+            await state.update_data(dict(zip(edits, hashes, strict=True)))
 
             if not (isinstance(existing_order_id, int) and existing_order_id > 0):
                 try:
-                    # Best-effort race guard: avoid duplicate booking for same start_at.
-                    start_at_utc = compose_start_at_utc(
-                        chosen_date=date.fromisoformat(str(calendar_date)),
-                        chosen_time=_parse_time_hhmm(str(calendar_time)),
-                    )
-                    if await exists_order_with_start_at(
-                        session=session, start_at=start_at_utc
-                    ):
-                        await state.update_data({CONFIRM_IN_FLIGHT_KEY: False})
-                        await _render_flow(
-                            message=query.message,
-                            state=state,
-                            step="calendar_time",
-                            session=session,
-                        )
-                        await query.answer(
-                            "Слот уже занят. Выберите другое время.", show_alert=False
-                        )
-                        return
-
                     order_id = await persist_booking_as_order(
                         session=session,
                         tg_id=user.id,
                         tg_nickname=nickname,
                         calendar_date=str(calendar_date),
                         calendar_time=str(calendar_time),
+                        availability=availability_cache,
+                        users=user_cache,
                     )
                 except IntegrityError:
-                    # DB-level protection (unique slot) triggered by concurrent booking.
+                    # Lost a race on the unique slot despite ON CONFLICT.
+                    order_id = None
+                except Exception:
+                    # Allow retry by restoring the confirm UI.
                     await state.update_data({CONFIRM_IN_FLIGHT_KEY: False})
-                    data = await state.get_data()
-                    data.pop("calendar_time", None)
-                    await state.set_data(data)
                     await _render_flow(
                         message=query.message,
                         state=state,
-                        step="calendar_time",
+                        step="confirm",
                         session=session,
+                        service=service,
                     )
                     await query.answer(
-                        "Слот уже занят. Выберите другое время.",
+                        "Не удалось подтвердить заявку. Попробуйте ещё раз.",
                         show_alert=False,
                     )
                     return
-                except Exception:
-                    # Allow retry by restoring the confirm UI.
+                if order_id is None:
+                    # The booking statement found the slot taken, blocked or
+                    # on a day off: bring every worker's view of the day in
+                    # line with Postgres.
+                    try:
+                        await availability_cache.publish_day_from_db(
+                            session=session, day=chosen_date
+                        )
+                    except Exception:
+                        logger.warning(
+                            "Failed to refresh availability after rejected booking",
+                            extra={"day": chosen_date.isoformat()},
+                            exc_info=True,
+                        )
                     await state.update_data({CONFIRM_IN_FLIGHT_KEY: False})
+                    data = await state.get_data()
+                    data.pop("calendar_time", None)
+                    await _release_slot_hold(service=service, state=state, data=data)
+                    await state.set_data(data)
                     await _render_flow(
                         message=query.message,
                         state=state,
-                        step="confirm",
+                        step="calendar_time",
                         session=session,
+                        service=service,
                     )
                     await query.answer(
-                        "Не удалось подтвердить заявку. Попробуйте ещё раз.",
+                        "Слот уже занят. Выберите другое время.",
                         show_alert=False,
                     )
                     return
                 await state.update_data({ORDER_ID_KEY: int(order_id)})
 
             # Finish: disable old inline keyboards, clear draft, return to main menu.
-            if summary_id is not None:
-                ok_s = await _try_edit_message(
+            async def finish_edit(message_id: int | None, text: str) -> bool:
+                if message_id is None:
+                    return False
+                return await _try_edit_message(
                     message=query.message,
-                    message_id=summary_id,
-                    text=(
-                        f"{render_summary(data)}\n\n"
-                        f"Статус: подтверждено\n"
-                        f"Заказ: #{order_id}"
-                    ),
-                    reply_markup=None,
-                )
-            else:
-                ok_s = False
-            if question_id is not None:
-                ok_q = await _try_edit_message(
-                    message=query.message,
-                    message_id=question_id,
-                    text=(
-                        f"Заявка подтверждена. Номер заказа: #{order_id}\n\n"
-                        "Главное меню доступно на клавиатуре ниже."
-                    ),
+                    message_id=message_id,
+                    text=text,
                     reply_markup=None,
                 )
-            else:
-                ok_q = False
 
+            ok_s, ok_q = await asyncio.gather(
+                finish_edit(
+                    summary_id,
+                    f"{render_summary(data)}\n\n"
+                    f"Статус: подтверждено\n"
+                    f"Заказ: #{order_id}",
+                ),
+                finish_edit(
+                    question_id,
+                    f"Заявка подтверждена. Номер заказа: #{order_id}\n\n"
+                    "Главное меню доступно на клавиатуре ниже.",
+                ),
+            )
+
+            # The order now occupies the slot; the lease is no longer needed.
+            await _release_slot_hold(service=service, state=state, data=data)
             await state.clear()
             # Ensure user sees a result even if messages were deleted.
             if not (ok_s and ok_q):
@@ -714,24 +923,31 @@ def create_booking_router() -> Router:
 
         if callback_data.action == "reset":
             data = await state.get_data()
+            await _release_slot_hold(service=service, state=state, data=data)
             await state.set_data(reset_booking_draft_data(data))
             await _render_flow(
                 message=query.message,
                 state=state,
                 step="want_custom_sketch",
                 session=session,
+                service=service,
             )
             await query.answer()
             return
 
         if callback_data.action == "menu":
             data = await state.get_data()
-            summary_id = data.get(SUMMARY_MESSAGE_ID_KEY)
-            question_id = data.get(QUESTION_MESSAGE_ID_KEY)
-            if summary_id is not None:
-                await _try_delete_message(message=query.message, message_id=summary_id)
-            if question_id is not None:
-                await _try_delete_message(message=query.message, message_id=question_id)
+            await asyncio.gather(
+                *(
+                    _try_delete_message(message=query.message, message_id=message_id)
+                    for message_id in (
+                        data.get(SUMMARY_MESSAGE_ID_KEY),
+                        data.get(QUESTION_MESSAGE_ID_KEY),
+                    )
+                    if message_id is not None
+                )
+            )
+            await _release_slot_hold(service=service, state=state, data=data)
             await state.clear()
             await _send_main_menu(message=query.message, settings=settings)
             await query.answer()
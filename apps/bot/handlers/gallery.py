@@ -8,25 +8,35 @@ from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.repositories.styles import (
-    get_style,
-    increment_style_views,
-    list_styles_with_top_tattoo,
-)
-from core.repositories.tattoos import get_tattoo, list_tattoos_by_style
+from core.repositories.styles import list_styles_with_top_tattoo
+from core.repositories.tattoos import TattooCursor, list_tattoos_by_style
+from core.services.callback_codec import CompiledCallbackCodec
+from core.services.catalog import CatalogStore, StyleRecord
+from core.services.gallery_cache import GalleryCache
 from core.services.menu import MENU_GALLERY
+from core.services.view_counters import ViewCounters
 
 _PAGE_SIZE = 8
-_MAX_PAGE = 200
 
 _GALLERY_MESSAGE_ID_KEY = "gallery_message_id"
 
+# GalleryCb.seek: rows after / before the (views, ref_id) cursor, or starting
+# at it (returning from a tattoo card to the page it was opened from).
+_SEEK_AFTER = "a"
+_SEEK_BEFORE = "b"
+_SEEK_FROM = "f"
 
-class GalleryCb(CallbackData, prefix="gallery"):
+
+class GalleryCb(CompiledCallbackCodec, CallbackData, prefix="gallery"):
     action: str
     style_id: int | None = None
     tattoo_id: int | None = None
-    page: int | None = None
+    # Keyset cursor: (views, id) of a boundary tattoo of the page.
+    views: int | None = None
+    ref_id: int | None = None
+    seek: str | None = None
+    # Rank of the page's first row; only used for numbering.
+    pos: int | None = None
 
 
 def _styles_keyboard(styles: list[tuple[int, str, str | None]]) -> InlineKeyboardMarkup:
@@ -35,7 +45,7 @@ def _styles_keyboard(styles: list[tuple[int, str, str | None]]) -> InlineKeyboar
         text = style_name if top_label is None else f"{style_name} · {top_label}"
         builder.button(
             text=text,
-            callback_data=GalleryCb(action="style", style_id=style_id, page=0).pack(),
+            callback_data=GalleryCb(action="style", style_id=style_id).pack(),
         )
     builder.adjust(1)
     return builder.as_markup()
@@ -44,47 +54,76 @@ def _styles_keyboard(styles: list[tuple[int, str, str | None]]) -> InlineKeyboar
 def _style_page_keyboard(
     *,
     style_id: int,
-    page: int,
+    pos: int,
     tattoos: list[tuple[int, str, int]],
     has_prev: bool,
     has_next: bool,
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
+    if tattoos:
+        first_id, _, first_views = tattoos[0]
+        last_id, _, last_views = tattoos[-1]
     for tattoo_id, name, views in tattoos:
         builder.button(
             text=f"{name} · {views}",
             callback_data=GalleryCb(
-                action="tattoo", style_id=style_id, tattoo_id=tattoo_id, page=page
+                action="tattoo",
+                style_id=style_id,
+                tattoo_id=tattoo_id,
+                views=first_views,
+                ref_id=first_id,
+                seek=_SEEK_FROM,
+                pos=pos,
             ).pack(),
         )
-    if has_prev:
+    if has_prev and tattoos:
         builder.button(
             text="« Назад",
             callback_data=GalleryCb(
-                action="page", style_id=style_id, page=page - 1
+                action="page",
+                style_id=style_id,
+                views=first_views,
+                ref_id=first_id,
+                seek=_SEEK_BEFORE,
+                pos=max(0, pos - _PAGE_SIZE),
             ).pack(),
         )
-    if has_next:
+    if has_next and tattoos:
         builder.button(
             text="Дальше »",
             callback_data=GalleryCb(
-                action="page", style_id=style_id, page=page + 1
+                action="page",
+                style_id=style_id,
+                views=last_views,
+                ref_id=last_id,
+                seek=_SEEK_AFTER,
+                pos=pos + len(tattoos),
             ).pack(),
         )
     builder.button(text="К стилям", callback_data=GalleryCb(action="back").pack())
 
     # tattoos are 1-column; nav/back row is up to 3 buttons
+    nav = int(has_prev and bool(tattoos)) + int(has_next and bool(tattoos))
     widths: list[int] = [1] * len(tattoos)
-    widths.append(min(3, int(has_prev) + int(has_next) + 1))
+    widths.append(min(3, nav + 1))
     builder.adjust(*widths)
     return builder.as_markup()
 
 
-def _tattoo_keyboard(*, style_id: int, page: int) -> InlineKeyboardMarkup:
+def _tattoo_keyboard(
+    *, style_id: int, views: int, ref_id: int, pos: int
+) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(
         text="← Назад",
-        callback_data=GalleryCb(action="page", style_id=style_id, page=page).pack(),
+        callback_data=GalleryCb(
+            action="page",
+            style_id=style_id,
+            views=views,
+            ref_id=ref_id,
+            seek=_SEEK_FROM,
+            pos=pos,
+        ).pack(),
     )
     builder.adjust(1)
     return builder.as_markup()
@@ -130,41 +169,89 @@ async def _render_styles(
 
 async def _render_style_page(
     *,
-    message: Message,
     session: AsyncSession,
-    style_id: int,
-    page: int,
-) -> None:
-    # Legacy helper left for compatibility; gallery flow now uses edit-only path.
-    style = await get_style(session=session, style_id=style_id)
-    if style is None:
-        await message.answer("Стиль не найден.")
-        return
-
-    offset = page * _PAGE_SIZE
+    style: StyleRecord,
+    cursor: TattooCursor | None = None,
+    seek: str = _SEEK_AFTER,
+    pos: int = 0,
+) -> tuple[str, InlineKeyboardMarkup]:
+    before = cursor is not None and seek == _SEEK_BEFORE
     items = await list_tattoos_by_style(
-        session=session, style_id=style_id, limit=_PAGE_SIZE + 1, offset=offset
+        session=session,
+        style_id=style.id,
+        limit=_PAGE_SIZE + 1,
+        cursor=cursor,
+        before=before,
+        inclusive=seek == _SEEK_FROM,
     )
-    has_next = len(items) > _PAGE_SIZE
-    items = items[:_PAGE_SIZE]
-    has_prev = page > 0
+    if before:
+        has_prev = len(items) > _PAGE_SIZE
+        if not has_prev:
+            # Reached the top: show a full first page rather than a short one.
+            return await _render_style_page(session=session, style=style)
+        items = items[-_PAGE_SIZE:]
+        has_next = True
+    else:
+        has_next = len(items) > _PAGE_SIZE
+        items = items[:_PAGE_SIZE]
+        has_prev = cursor is not None and (seek == _SEEK_AFTER or pos > 0)
+    pos = max(0, pos) if has_prev else 0
 
     lines = [f"Стиль: {style.name}"]
     if not items:
         lines += ["", "Пока нет работ."]
     else:
         lines.append("")
-        for i, t in enumerate(items, start=1 + offset):
+        for i, t in enumerate(items, start=1 + pos):
             lines.append(f"{i}. {t.name} — {t.views} views")
 
     kb = _style_page_keyboard(
-        style_id=style_id,
-        page=page,
+        style_id=style.id,
+        pos=pos,
         tattoos=[(t.id, t.name, t.views) for t in items],
         has_prev=has_prev,
         has_next=has_next,
     )
-    await message.answer("\n".join(lines), reply_markup=kb)
+    return "\n".join(lines), kb
+
+
+async def _cached_styles(
+    *, session: AsyncSession, cache: GalleryCache
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    text, kb = await cache.get(("styles",), lambda: _render_styles(session=session))
+    return text, None if kb is None else kb.model_copy()
+
+
+async def _cached_style_page(
+    *,
+    session: AsyncSession,
+    cache: GalleryCache,
+    style: StyleRecord,
+    cursor: TattooCursor | None = None,
+    seek: str = _SEEK_AFTER,
+    pos: int = 0,
+) -> tuple[str, InlineKeyboardMarkup]:
+    text, kb = await cache.get(
+        ("style", style.id, cursor, seek, pos),
+        lambda: _render_style_page(
+            session=session, style=style, cursor=cursor, seek=seek, pos=pos
+        ),
+    )
+    return text, kb.model_copy()
+
+
+def _callback_cursor(callback_data: GalleryCb) -> TattooCursor | None:
+    if callback_data.views is None or callback_data.ref_id is None:
+        return None
+    return callback_data.views, callback_data.ref_id
+
+
+def _legacy_style_id(data: str) -> int | None:
+    """Style of a pre-keyset ``gallery:<action>:<style>:<tattoo>:<page>`` button."""
+    parts = data.split(GalleryCb.__separator__)
+    if len(parts) != 5 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
 
 
 def create_gallery_router() -> Router:
@@ -172,9 +259,12 @@ def create_gallery_router() -> Router:
 
     @router.message(F.text == MENU_GALLERY)
     async def gallery_entry(
-        message: Message, session: AsyncSession, state: FSMContext
+        message: Message,
+        session: AsyncSession,
+        state: FSMContext,
+        gallery_cache: GalleryCache,
     ) -> None:
-        text, kb = await _render_styles(session=session)
+        text, kb = await _cached_styles(session=session, cache=gallery_cache)
         sent = await message.answer(text, reply_markup=kb)
         await state.update_data({_GALLERY_MESSAGE_ID_KEY: sent.message_id})
 
@@ -184,6 +274,9 @@ def create_gallery_router() -> Router:
         callback_data: GalleryCb,
         session: AsyncSession,
         state: FSMContext,
+        gallery_cache: GalleryCache,
+        view_counters: ViewCounters,
+        catalog: CatalogStore,
     ) -> None:
         if query.message is None:
             await query.answer()
@@ -206,7 +299,7 @@ def create_gallery_router() -> Router:
             return
 
         if callback_data.action == "back":
-            text, kb = await _render_styles(session=session)
+            text, kb = await _cached_styles(session=session, cache=gallery_cache)
             await _try_edit_message(
                 message=query.message,
                 message_id=int(gallery_message_id),
@@ -220,109 +313,67 @@ def create_gallery_router() -> Router:
             if callback_data.style_id is None:
                 await query.answer()
                 return
-            async with session.begin():
-                await increment_style_views(
-                    session=session,
-                    style_id=callback_data.style_id,
-                )
-
-            page = 0
-            offset = page * _PAGE_SIZE
-            style = await get_style(session=session, style_id=callback_data.style_id)
+            snapshot = await catalog.current(session=session)
+            style = snapshot.style(callback_data.style_id)
             if style is None:
                 await query.answer("Стиль не найден.", show_alert=False)
                 return
-            items = await list_tattoos_by_style(
-                session=session,
-                style_id=callback_data.style_id,
-                limit=_PAGE_SIZE + 1,
-                offset=offset,
-            )
-            has_next = len(items) > _PAGE_SIZE
-            items = items[:_PAGE_SIZE]
-            has_prev = False
-            lines = [f"Стиль: {style.name}"]
-            if not items:
-                lines += ["", "Пока нет работ."]
-            else:
-                lines.append("")
-                for i, t in enumerate(items, start=1 + offset):
-                    lines.append(f"{i}. {t.name} — {t.views} views")
-            kb = _style_page_keyboard(
-                style_id=callback_data.style_id,
-                page=page,
-                tattoos=[(t.id, t.name, t.views) for t in items],
-                has_prev=has_prev,
-                has_next=has_next,
+            text, kb = await _cached_style_page(
+                session=session, cache=gallery_cache, style=style
             )
+            view_counters.add_style_view(style.id)
             await _try_edit_message(
                 message=query.message,
                 message_id=int(gallery_message_id),
-                text="\n".join(lines),
+                text=text,
                 reply_markup=kb,
             )
             await query.answer()
             return
 
         if callback_data.action == "page":
-            if callback_data.style_id is None or callback_data.page is None:
+            if callback_data.style_id is None:
                 await query.answer()
                 return
-            page = max(0, min(_MAX_PAGE, int(callback_data.page)))
-            offset = page * _PAGE_SIZE
-
-            style = await get_style(session=session, style_id=callback_data.style_id)
+            snapshot = await catalog.current(session=session)
+            style = snapshot.style(callback_data.style_id)
             if style is None:
                 await query.answer("Стиль не найден.", show_alert=False)
                 return
-            items = await list_tattoos_by_style(
+            text, kb = await _cached_style_page(
                 session=session,
-                style_id=callback_data.style_id,
-                limit=_PAGE_SIZE + 1,
-                offset=offset,
-            )
-            has_next = len(items) > _PAGE_SIZE
-            items = items[:_PAGE_SIZE]
-            has_prev = page > 0
-            lines = [f"Стиль: {style.name}"]
-            if not items:
-                lines += ["", "Пока нет работ."]
-            else:
-                lines.append("")
-                for i, t in enumerate(items, start=1 + offset):
-                    lines.append(f"{i}. {t.name} — {t.views} views")
-            kb = _style_page_keyboard(
-                style_id=callback_data.style_id,
-                page=page,
-                tattoos=[(t.id, t.name, t.views) for t in items],
-                has_prev=has_prev,
-                has_next=has_next,
+                cache=gallery_cache,
+                style=style,
+                cursor=_callback_cursor(callback_data),
+                seek=callback_data.seek or _SEEK_AFTER,
+                pos=callback_data.pos or 0,
             )
             await _try_edit_message(
                 message=query.message,
                 message_id=int(gallery_message_id),
-                text="\n".join(lines),
+                text=text,
                 reply_markup=kb,
             )
             await query.answer()
             return
 
         if callback_data.action == "tattoo":
+            cursor = _callback_cursor(callback_data)
             if (
                 callback_data.style_id is None
                 or callback_data.tattoo_id is None
-                or callback_data.page is None
+                or cursor is None
             ):
                 await query.answer()
                 return
 
-            tattoo = await get_tattoo(
-                session=session, tattoo_id=callback_data.tattoo_id
-            )
+            snapshot = await catalog.current(session=session)
+            tattoo = snapshot.tattoo(callback_data.tattoo_id)
             if tattoo is None:
                 await query.answer("Работа не найдена.", show_alert=False)
                 await query.answer()
                 return
+            view_counters.add_tattoo_view(tattoo.id)
 
             # Keep gallery edit-only (single message). Media edits are avoided here.
             text = (
@@ -331,8 +382,12 @@ def create_gallery_router() -> Router:
                 f"price: {tattoo.price or '—'}\n"
                 f"photo: {'есть' if tattoo.photo_file_id else 'нет'}"
             )
-            page = max(0, min(_MAX_PAGE, int(callback_data.page)))
-            kb = _tattoo_keyboard(style_id=callback_data.style_id, page=page)
+            kb = _tattoo_keyboard(
+                style_id=callback_data.style_id,
+                views=cursor[0],
+                ref_id=cursor[1],
+                pos=max(0, callback_data.pos or 0),
+            )
             await _try_edit_message(
                 message=query.message,
                 message_id=int(gallery_message_id),
@@ -344,6 +399,40 @@ def create_gallery_router() -> Router:
 
         await query.answer()
 
+    # Registered last: only gets gallery buttons GalleryCb could not unpack.
+    @router.callback_query(
+        F.data.startswith(f"{GalleryCb.__prefix__}{GalleryCb.__separator__}")
+    )
+    async def gallery_legacy_callback(
+        query: CallbackQuery,
+        session: AsyncSession,
+        state: FSMContext,
+        gallery_cache: GalleryCache,
+        catalog: CatalogStore,
+    ) -> None:
+        # Messages sent before keyset pagination carry the old ``page`` layout:
+        # restart from the first page instead of leaving the tap unanswered.
+        if query.message is None:
+            await query.answer()
+            return
+        style = None
+        style_id = _legacy_style_id(query.data or "")
+        if style_id is not None:
+            snapshot = await catalog.current(session=session)
+            style = snapshot.style(style_id)
+        if style is None:
+            text, kb = await _cached_styles(session=session, cache=gallery_cache)
+        else:
+            text, kb = await _cached_style_page(
+                session=session, cache=gallery_cache, style=style
+            )
+        message_id = query.message.message_id
+        if await _try_edit_message(
+            message=query.message, message_id=message_id, text=text, reply_markup=kb
+        ):
+            await state.update_data({_GALLERY_MESSAGE_ID_KEY: message_id})
+        await query.answer()
+
     return router
 
 
@@ -1,3 +1,9 @@
 from .db_session import DbSessionMiddleware
+from .fsm_unit_of_work import BufferedFSMContext, UnitOfWorkFSMMiddleware, flush_fsm
 
-__all__ = ["DbSessionMiddleware"]
+__all__ = [
+    "BufferedFSMContext",
+    "DbSessionMiddleware",
+    "UnitOfWorkFSMMiddleware",
+    "flush_fsm",
+]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import copy
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any, cast
+
+from aiogram import Bot
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import TelegramObject
+
+FsmRecord = tuple[str | None, dict[str, Any]]
+
+
+async def load_fsm_record(storage: BaseStorage, key: StorageKey) -> FsmRecord:
+    """State and data of one FSM key in a single storage round trip."""
+    loader = getattr(storage, "load_record", None)
+    if loader is not None:
+        return cast(FsmRecord, await loader(key))
+    if isinstance(storage, RedisStorage):
+        raw_state, raw_data = await storage.redis.mget(
+            storage.key_builder.build(key, "state"),
+            storage.key_builder.build(key, "data"),
+        )
+        if isinstance(raw_state, bytes):
+            raw_state = raw_state.decode("utf-8")
+        data = storage.json_loads(raw_data) if raw_data is not None else {}
+        return raw_state, cast(dict[str, Any], data)
+    return await storage.get_state(key), await storage.get_data(key)
+
+
+async def save_fsm_record(
+    storage: BaseStorage,
+    key: StorageKey,
+    *,
+    state: str | None,
+    data: dict[str, Any],
+    previous_data: dict[str, Any],
+    state_changed: bool,
+    data_changed: bool,
+) -> None:
+    """Persist the changed parts of one FSM key in a single storage round trip."""
+    saver = getattr(storage, "save_record", None)
+    if saver is not None:
+        await saver(
+            key,
+            state=state,
+            data=data,
+            previous_data=previous_data,
+            state_changed=state_changed,
+            data_changed=data_changed,
+        )
+        return
+    if not isinstance(storage, RedisStorage):
+        if state_changed:
+            await storage.set_state(key, state)
+        if data_changed:
+            await storage.set_data(key, data)
+        return
+
+    async with storage.redis.pipeline(transaction=True) as pipe:
+        if state_changed:
+            state_key = storage.key_builder.build(key, "state")
+            if state is None:
+                pipe.delete(state_key)
+            else:
+                pipe.set(state_key, state, ex=storage.state_ttl)
+        if data_changed:
+            data_key = storage.key_builder.build(key, "data")
+            if not data:
+                pipe.delete(data_key)
+            else:
+                pipe.set(data_key, storage.json_dumps(data), ex=storage.data_ttl)
+        await pipe.execute()
+
+
+class BufferedFSMContext(FSMContext):
+    """
+    ``FSMContext`` over an in-memory view of one update's state and data.
+
+    Reads are served from the view loaded by ``UnitOfWorkFSMMiddleware``;
+    writes only mark it dirty and are persisted by ``flush()``. Getters return
+    copies, like a storage round trip would, so handlers can't change the view
+    without calling a setter.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        key: StorageKey,
+        *,
+        state: str | None,
+        data: dict[str, Any],
+    ) -> None:
+        super().__init__(storage=storage, key=key)
+        self._state = state
+        self._data = data
+        self._loaded_data = data
+        self._state_changed = False
+        self._data_changed = False
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._state_changed or self._data_changed
+
+    async def set_state(self, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        if value != self._state:
+            self._state = value
+            self._state_changed = True
+
+    async def get_state(self) -> str | None:
+        return self._state
+
+    async def set_data(self, data: Mapping[str, Any]) -> None:
+        data = copy.deepcopy(dict(data))
+        if data != self._data:
+            self._data = data
+            self._data_changed = True
+
+    async def get_data(self) -> dict[str, Any]:
+        return copy.deepcopy(self._data)
+
+    async def get_value(self, key: str, default: Any | None = None) -> Any | None:
+        return copy.deepcopy(self._data.get(key, default))
+
+    async def update_data(
+        self,
+        data: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        merged = {**self._data, **copy.deepcopy(kwargs)}
+        if merged != self._data:
+            self._data = merged
+            self._data_changed = True
+        return copy.deepcopy(self._data)
+
+    async def flush(self) -> None:
+        if not self.is_dirty:
+            return
+        await save_fsm_record(
+            self.storage,
+            self.key,
+            state=self._state,
+            data=self._data,
+            previous_data=self._loaded_data,
+            state_changed=self._state_changed,
+            data_changed=self._data_changed,
+        )
+        self._loaded_data = self._data
+        self._state_changed = False
+        self._data_changed = False
+
+
+async def flush_fsm(state: FSMContext) -> None:
+    """Write pending FSM changes now (no-op for write-through contexts)."""
+    if isinstance(state, BufferedFSMContext):
+        await state.flush()
+
+
+class UnitOfWorkFSMMiddleware(FSMContextMiddleware):
+    """
+    FSM middleware with one read and at most one write per update.
+
+    Drop-in replacement for aiogram's ``FSMContextMiddleware``: state and data
+    are loaded together before the handler runs (``raw_state`` included) and
+    flushed once afterwards, only if a handler changed them. The write happens
+    even if the handler raises, matching the write-through behaviour of the
+    stock context.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        bot: Bot = cast(Bot, data["bot"])
+        context = self.resolve_event_context(bot, data)
+        data["fsm_storage"] = self.storage
+        if context is None:
+            return await handler(event, data)
+        async with self.events_isolation.lock(key=context.key):
+            state, fsm_data = await load_fsm_record(self.storage, context.key)
+            buffered = BufferedFSMContext(
+                self.storage, context.key, state=state, data=fsm_data
+            )
+            data.update({"state": buffered, "raw_state": state})
+            try:
+                return await handler(event, data)
+            finally:
+                await buffered.flush()
@@ -54,6 +54,18 @@ class Settings(BaseSettings):
         20, validation_alias="WEBAPP_AUTH_RATE_LIMIT_PER_MINUTE"
     )
     dev_shared_secret: str = Field("", validation_alias="DEV_SHARED_SECRET")
+    # Redis key lifecycle: idle FSM sessions and Mini App selections expire.
+    fsm_ttl_seconds: int = Field(7 * 24 * 3600, validation_alias="FSM_TTL_SECONDS")
+    selected_design_ttl_seconds: int = Field(
+        30 * 24 * 3600, validation_alias="SELECTED_DESIGN_TTL_SECONDS"
+    )
+    redis_sweep_interval_seconds: int = Field(
+        3600, validation_alias="REDIS_SWEEP_INTERVAL_SECONDS"
+    )
+    # Gallery view counters are buffered in process and written in batches.
+    view_flush_interval_seconds: float = Field(
+        5.0, validation_alias="VIEW_FLUSH_INTERVAL_SECONDS"
+    )
 
     @field_validator("admin_user_ids", mode="before")
     @classmethod
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, time, timedelta
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Select,
+    Time,
+    cast,
+    column,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infra.db.models.blocked_slot import BlockedSlot
+from infra.db.models.day_off import DayOff
+from infra.db.models.order import Order
+
+
+def unavailable_dates_stmt(
+    *,
+    start_date: date,
+    end_date_inclusive: date,
+    slot_times: Sequence[time],
+    tz_name: str,
+) -> Select:
+    """
+    Dates in range where no policy slot is free, computed entirely in Postgres.
+
+    Days (generate_series) x slots (VALUES) are anti-joined against day_off,
+    blocked_slot and orders; only dates without a single free slot are returned.
+    Slot start is ``(day + slot_time) AT TIME ZONE tz_name``, which matches how
+    ``orders.start_at`` is stored, so the order probe uses ``uq_orders_start_at``.
+    """
+    days = select(
+        cast(
+            func.generate_series(
+                cast(literal(start_date), Date),
+                cast(literal(end_date_inclusive), Date),
+                literal(timedelta(days=1)),
+            ),
+            Date,
+        ).label("day")
+    ).cte("days")
+    slots = (
+        values(column("slot_time", Time), name="slots")
+        .data([(t,) for t in slot_times])
+        .alias("slots")
+    )
+    slot_start_at = func.timezone(
+        tz_name, days.c.day + slots.c.slot_time, type_=DateTime(timezone=True)
+    )
+
+    free_slot = (
+        select(literal(1))
+        .select_from(slots)
+        .where(
+            ~exists()
+            .where(
+                BlockedSlot.date == days.c.day,
+                BlockedSlot.time == slots.c.slot_time,
+            )
+            .correlate_except(BlockedSlot)
+        )
+        .where(~exists().where(Order.start_at == slot_start_at).correlate_except(Order))
+        .correlate(days)
+    )
+    return (
+        select(days.c.day)
+        .where(or_(exists().where(DayOff.date == days.c.day), ~free_slot.exists()))
+        .order_by(days.c.day)
+    )
+
+
+async def list_unavailable_dates(
+    *,
+    session: AsyncSession,
+    start_date: date,
+    end_date_inclusive: date,
+    slot_times: Sequence[time],
+    tz_name: str,
+) -> set[date]:
+    if not slot_times:
+        # Without slots every day is unavailable; no need to ask the DB.
+        days = (end_date_inclusive - start_date).days + 1
+        return {start_date + timedelta(days=i) for i in range(max(days, 0))}
+    result = await session.execute(
+        unavailable_dates_stmt(
+            start_date=start_date,
+            end_date_inclusive=end_date_inclusive,
+            slot_times=slot_times,
+            tz_name=tz_name,
+        )
+    )
+    return set(result.scalars().all())
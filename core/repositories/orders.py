@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, DateTime, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.repositories.users import UserRef, upsert_user_stmt
+from infra.db.models.blocked_slot import BlockedSlot
+from infra.db.models.day_off import DayOff
 from infra.db.models.order import Order
+from infra.db.models.user import User
 
 
 async def create_order(
@@ -53,3 +59,88 @@ async def exists_order_with_start_at(
 ) -> bool:
     result = await session.execute(select(Order.id).where(Order.start_at == start_at))
     return result.scalar_one_or_none() is not None
+
+
+def book_slot_stmt(
+    *,
+    tg_id: int,
+    tg_nickname: str,
+    day: date,
+    slot_time: time,
+    start_at: datetime,
+    user_id: int | None = None,
+) -> Insert:
+    """
+    Upsert the user and insert the order in one statement.
+
+    The order row is produced only if the day is not a day off and the slot is
+    not blocked; ``ON CONFLICT (start_at) DO NOTHING`` (``uq_orders_start_at``)
+    resolves a concurrent booking of the same slot. ``RETURNING`` is empty
+    when the slot could not be booked.
+
+    With a known ``user_id`` (cached, nickname unchanged) the upsert is skipped.
+    """
+    upserted = None
+    if user_id is not None:
+        owner: ColumnElement[int] = literal(user_id)
+    else:
+        upserted = upsert_user_stmt(tg_id=tg_id, tg_nickname=tg_nickname).cte(
+            "booking_user"
+        )
+        # The upsert returns nothing for an unchanged existing user; the
+        # statement snapshot still sees that row in ``users``.
+        owner = func.coalesce(
+            select(upserted.c.id).scalar_subquery(),
+            select(User.id).where(User.tg_id == tg_id).scalar_subquery(),
+        )
+    order_row = (
+        select(owner, literal(start_at, DateTime(timezone=True)), func.now())
+        .where(~exists().where(DayOff.date == day))
+        .where(~exists().where(BlockedSlot.date == day, BlockedSlot.time == slot_time))
+    )
+    # Snapshot read: the pre-update row of an existing user, NULL for a new one
+    # (which has no discount yet either).
+    discount = (
+        select(User.persanal_discount).where(User.tg_id == tg_id).scalar_subquery()
+    )
+    stmt = (
+        pg_insert(Order)
+        .from_select(["user_id", "start_at", "created_at"], order_row)
+        .on_conflict_do_nothing(index_elements=[Order.start_at])
+        .returning(Order.id, Order.user_id, discount)
+    )
+    return stmt if upserted is None else stmt.add_cte(upserted)
+
+
+async def book_slot(
+    *,
+    session: AsyncSession,
+    tg_id: int,
+    tg_nickname: str,
+    day: date,
+    slot_time: time,
+    start_at: datetime,
+    user_id: int | None = None,
+) -> tuple[int, UserRef] | None:
+    """
+    Atomically book a slot.
+
+    Returns the order id and the booking user, or None if it is unavailable.
+    """
+    result = await session.execute(
+        book_slot_stmt(
+            tg_id=tg_id,
+            tg_nickname=tg_nickname,
+            day=day,
+            slot_time=slot_time,
+            start_at=start_at,
+            user_id=user_id,
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    order_id, owner_id, discount = row
+    return order_id, UserRef(
+        id=owner_id, tg_nickname=tg_nickname, personal_discount=discount
+    )
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from sqlalchemy import Select, desc, func, select, update
+from collections.abc import Collection, Mapping
+
+from sqlalchemy import Integer, Select, Update, column, desc, select, update
+from sqlalchemy import values as values_clause
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,33 +11,45 @@ from infra.db.models.style import Style
 from infra.db.models.tattoo import Tattoo
 
 
-async def get_style(*, session: AsyncSession, style_id: int) -> Style | None:
-    result = await session.execute(select(Style).where(Style.id == style_id))
-    return result.scalar_one_or_none()
+def add_style_views_stmt(deltas: Mapping[int, int]) -> Update:
+    """``UPDATE styles ... FROM (VALUES (id, delta), ...)`` for a batch of views."""
+    rows = values_clause(
+        column("id", Integer), column("delta", Integer), name="deltas"
+    ).data(sorted(deltas.items()))
+    return (
+        update(Style)
+        .where(Style.id == rows.c.id)
+        .values(views=Style.views + rows.c.delta)
+    )
+
+
+async def add_style_views(*, session: AsyncSession, deltas: Mapping[int, int]) -> None:
+    if deltas:
+        await session.execute(add_style_views_stmt(deltas))
+
 
+def refresh_top_tattoos_stmt(style_ids: Collection[int] | Select) -> Update:
+    """
+    Recompute ``styles.top_tattoo_id`` for ``style_ids``.
 
-async def increment_style_views(*, session: AsyncSession, style_id: int) -> None:
-    await session.execute(
-        update(Style).where(Style.id == style_id).values(views=Style.views + 1)
+    Each style costs one top-1 probe of ``ix_tattoos_style_id_views_id``.
+    """
+    top = (
+        select(Tattoo.id)
+        .where(Tattoo.style_id == Style.id)
+        .order_by(desc(Tattoo.views), Tattoo.id.asc())
+        .limit(1)
+        .scalar_subquery()
     )
+    return update(Style).where(Style.id.in_(style_ids)).values(top_tattoo_id=top)
 
 
 async def list_styles_with_top_tattoo(
     *, session: AsyncSession
 ) -> list[tuple[Style, Tattoo | None]]:
-    ranked = select(
-        Tattoo.id.label("tattoo_id"),
-        Tattoo.style_id.label("style_id"),
-        func.row_number()
-        .over(partition_by=Tattoo.style_id, order_by=(desc(Tattoo.views), Tattoo.id))
-        .label("rn"),
-    ).subquery()
-
     stmt: Select = (
         select(Style, Tattoo)
-        .outerjoin(ranked, ranked.c.style_id == Style.id)
-        .outerjoin(Tattoo, Tattoo.id == ranked.c.tattoo_id)
-        .where((ranked.c.rn == 1) | (ranked.c.rn.is_(None)))
+        .outerjoin(Tattoo, Tattoo.id == Style.top_tattoo_id)
         .order_by(Style.name.asc())
     )
 
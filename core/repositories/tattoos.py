@@ -1,26 +1,67 @@
 from __future__ import annotations
 
-from sqlalchemy import desc, select
+from collections.abc import Mapping
+
+from sqlalchemy import Integer, Update, column, desc, or_, select, update
+from sqlalchemy import values as values_clause
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.repositories.styles import refresh_top_tattoos_stmt
 from infra.db.models.tattoo import Tattoo
 
+# Keyset cursor in gallery order: (views, id) of a boundary tattoo.
+TattooCursor = tuple[int, int]
+
 
 async def list_tattoos_by_style(
     *,
     session: AsyncSession,
     style_id: int,
     limit: int,
-    offset: int,
+    cursor: TattooCursor | None = None,
+    before: bool = False,
+    inclusive: bool = False,
 ) -> list[Tattoo]:
-    result = await session.execute(
-        select(Tattoo)
-        .where(Tattoo.style_id == style_id)
-        .order_by(desc(Tattoo.views), Tattoo.id.asc())
-        .limit(limit)
-        .offset(offset)
-    )
+    """
+    Up to ``limit`` tattoos of a style in gallery order (views desc, id asc).
+
+    Without ``cursor`` this is the first page. Otherwise the rows right after
+    the cursor (``inclusive`` keeps the cursor row itself), or with ``before``
+    the ``limit`` rows right before it, still returned in gallery order. Every
+    seek is a range scan of ``ix_tattoos_style_id_views_id``, so deep pages
+    cost the same as the first one.
+    """
+    stmt = select(Tattoo).where(Tattoo.style_id == style_id)
+    if cursor is not None:
+        views, tattoo_id = cursor
+        if before:
+            # ``views >= v`` bounds the index range; the OR only trims ties.
+            stmt = stmt.where(
+                Tattoo.views >= views,
+                or_(Tattoo.views > views, Tattoo.id < tattoo_id),
+            )
+        else:
+            stmt = stmt.where(
+                Tattoo.views <= views,
+                or_(
+                    Tattoo.views < views,
+                    Tattoo.id >= tattoo_id if inclusive else Tattoo.id > tattoo_id,
+                ),
+            )
+    if before and cursor is not None:
+        stmt = stmt.order_by(Tattoo.views.asc(), Tattoo.id.desc())
+    else:
+        stmt = stmt.order_by(desc(Tattoo.views), Tattoo.id.asc())
+    result = await session.execute(stmt.limit(limit))
+    items = list(result.scalars().all())
+    if before and cursor is not None:
+        items.reverse()
+    return items
+
+
+async def list_tattoos(*, session: AsyncSession) -> list[Tattoo]:
+    result = await session.execute(select(Tattoo).order_by(Tattoo.id.asc()))
     return list(result.scalars().all())
 
 
@@ -29,6 +70,30 @@ async def get_tattoo(*, session: AsyncSession, tattoo_id: int) -> Tattoo | None:
     return result.scalar_one_or_none()
 
 
+def add_tattoo_views_stmt(deltas: Mapping[int, int]) -> Update:
+    """``UPDATE tattoos ... FROM (VALUES (id, delta), ...)`` for a batch of views."""
+    rows = values_clause(
+        column("id", Integer), column("delta", Integer), name="deltas"
+    ).data(sorted(deltas.items()))
+    return (
+        update(Tattoo)
+        .where(Tattoo.id == rows.c.id)
+        .values(views=Tattoo.views + rows.c.delta)
+    )
+
+
+async def add_tattoo_views(*, session: AsyncSession, deltas: Mapping[int, int]) -> None:
+    """Add batched views and move each affected style's top tattoo if needed."""
+    if not deltas:
+        return
+    await session.execute(add_tattoo_views_stmt(deltas))
+    await session.execute(
+        refresh_top_tattoos_stmt(
+            select(Tattoo.style_id).where(Tattoo.id.in_(sorted(deltas))).distinct()
+        )
+    )
+
+
 async def create_tattoo(
     *,
     session: AsyncSession,
@@ -45,4 +110,5 @@ async def create_tattoo(
         await session.flush()
     except IntegrityError as e:
         raise ValueError("tattoo already exists") from e
+    await session.execute(refresh_top_tattoos_stmt([style_id]))
     return tattoo
@@ -1,29 +1,54 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from infra.db.models.user import User
 
 
+@dataclass(frozen=True, slots=True)
+class UserRef:
+    """What hot paths need from ``users``: the id and the personal discount."""
+
+    id: int
+    tg_nickname: str
+    personal_discount: Decimal | None
+
+
 async def get_user_by_tg_id(*, session: AsyncSession, tg_id: int) -> User | None:
     result = await session.execute(select(User).where(User.tg_id == tg_id))
     return result.scalar_one_or_none()
 
 
-async def get_or_create_user(
-    *,
-    session: AsyncSession,
-    tg_id: int,
-    tg_nickname: str,
-) -> User:
-    user = await get_user_by_tg_id(session=session, tg_id=tg_id)
-    if user is not None:
-        if user.tg_nickname != tg_nickname:
-            user.tg_nickname = tg_nickname
-        return user
-
-    user = User(tg_id=tg_id, tg_nickname=tg_nickname)
-    session.add(user)
-    await session.flush()
-    return user
+def upsert_user_stmt(*, tg_id: int, tg_nickname: str) -> Insert:
+    """
+    ``INSERT ... ON CONFLICT (tg_id) DO UPDATE ... RETURNING id, discount``.
+
+    The nickname is only rewritten when it actually changed, so repeat users
+    don't produce dead tuples; in that case no row is returned (see callers).
+    """
+    stmt = pg_insert(User).values(
+        tg_id=tg_id, tg_nickname=tg_nickname, created_at=func.now()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[User.tg_id],
+        set_={"tg_nickname": stmt.excluded.tg_nickname},
+        where=User.tg_nickname.is_distinct_from(stmt.excluded.tg_nickname),
+    ).returning(User.id, User.persanal_discount)
+
+
+async def get_user_ref(*, session: AsyncSession, tg_id: int) -> UserRef | None:
+    result = await session.execute(
+        select(User.id, User.tg_nickname, User.persanal_discount).where(
+            User.tg_id == tg_id
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return UserRef(id=row[0], tg_nickname=row[1], personal_discount=row[2])
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import date, time, timedelta
+from time import monotonic
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.repositories import orders as orders_repo
+from core.repositories import schedule_exceptions as exc_repo
+from core.services.schedule import (
+    DEFAULT_SCHEDULE_POLICY,
+    SchedulePolicy,
+    SlotKey,
+    day_start_key,
+    list_slot_minutes,
+    list_time_slots,
+    slot_key_from_datetime,
+    slot_key_to_datetime,
+)
+
+
+class AvailabilityIndex:
+    """
+    In-process slot occupancy index: one bitmask per day, one bit per slot.
+
+    Bit ``i`` of a mask corresponds to ``list_time_slots(policy)[i]``.
+    The index covers ``[today, today + days_ahead]``; it is loaded with three
+    range queries and then kept current via the ``apply_*`` hooks, which callers
+    invoke after the corresponding write has been committed. A full reload
+    happens when the Moscow date changes or after ``max_age_seconds`` so writes
+    made by other processes are eventually picked up.
+    """
+
+    def __init__(
+        self,
+        *,
+        policy: SchedulePolicy = DEFAULT_SCHEDULE_POLICY,
+        max_age_seconds: float = 300.0,
+    ) -> None:
+        self.policy = policy
+        self.max_age_seconds = max_age_seconds
+        self.slots: tuple[str, ...] = tuple(list_time_slots(policy))
+        self.full_mask = (1 << len(self.slots)) - 1
+        self._bit_by_slot = {slot: 1 << i for i, slot in enumerate(self.slots)}
+        self._bit_by_minute = {
+            minutes: 1 << i for i, minutes in enumerate(list_slot_minutes(policy))
+        }
+        self._booked: dict[date, int] = {}
+        self._blocked: dict[date, int] = {}
+        self._day_off: set[date] = set()
+        self._start: date | None = None
+        self._end: date | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        # Bumped on every change so derived results can detect they are stale.
+        self.generation = 0
+
+    def slot_bit(self, slot_hhmm: str) -> int:
+        # Slots outside the policy have no bit (0) and never affect availability.
+        return self._bit_by_slot.get(slot_hhmm, 0)
+
+    def minute_bit(self, minutes: int) -> int:
+        return self._bit_by_minute.get(minutes, 0)
+
+    def mask_for(self, slots: Iterable[str]) -> int:
+        mask = 0
+        for slot in slots:
+            mask |= self.slot_bit(slot)
+        return mask
+
+    def slots_for(self, mask: int) -> list[str]:
+        return [slot for i, slot in enumerate(self.slots) if mask >> i & 1]
+
+    def covers(self, day: date) -> bool:
+        return self._start is not None and self._start <= day <= self._end
+
+    def is_fresh(self, *, today: date) -> bool:
+        return (
+            self._start == today
+            and monotonic() - self._loaded_at < self.max_age_seconds
+        )
+
+    def invalidate(self) -> None:
+        self._start = None
+        self._end = None
+        self._loaded_at = 0.0
+        self.generation += 1
+
+    async def ensure_loaded(self, *, session: AsyncSession, today: date) -> None:
+        if self.is_fresh(today=today):
+            return
+        async with self._lock:
+            # Another task may have loaded the index while we were waiting.
+            if self.is_fresh(today=today):
+                return
+            await self.load(session=session, today=today)
+
+    async def load(self, *, session: AsyncSession, today: date) -> None:
+        start = today
+        end = today + timedelta(days=self.policy.days_ahead)
+
+        day_off = await exc_repo.list_day_off_dates(
+            session=session, start_date=start, end_date_inclusive=end
+        )
+        blocked_by_date = await exc_repo.list_blocked_slots_between(
+            session=session, start_date=start, end_date_inclusive=end
+        )
+        booked_start_ats = await orders_repo.list_order_start_at_between(
+            session=session,
+            start_at=slot_key_to_datetime(day_start_key(start)),
+            end_at=slot_key_to_datetime(day_start_key(end + timedelta(days=1))),
+        )
+
+        blocked: dict[date, int] = {}
+        for day, times in blocked_by_date.items():
+            mask = 0
+            for t in times:
+                mask |= self.minute_bit(t.hour * 60 + t.minute)
+            if mask:
+                blocked[day] = mask
+
+        # Slot key -> (day, bit) for the whole horizon: orders map with one lookup.
+        bit_by_key: dict[SlotKey, tuple[date, int]] = {}
+        cur = start
+        while cur <= end:
+            base = day_start_key(cur)
+            for minutes, bit in self._bit_by_minute.items():
+                bit_by_key[base + minutes] = (cur, bit)
+            cur += timedelta(days=1)
+
+        booked: dict[date, int] = {}
+        for dt in booked_start_ats:
+            hit = bit_by_key.get(slot_key_from_datetime(dt))
+            if hit is not None:
+                day, bit = hit
+                booked[day] = booked.get(day, 0) | bit
+
+        self.restore(
+            start=start, end=end, day_off=day_off, blocked=blocked, booked=booked
+        )
+
+    def restore(
+        self,
+        *,
+        start: date,
+        end: date,
+        day_off: Iterable[date],
+        blocked: dict[date, int],
+        booked: dict[date, int],
+    ) -> None:
+        self._day_off = set(day_off)
+        self._blocked = {d: m for d, m in blocked.items() if m}
+        self._booked = {d: m for d, m in booked.items() if m}
+        self._start = start
+        self._end = end
+        self._loaded_at = monotonic()
+        self.generation += 1
+
+    @property
+    def horizon(self) -> tuple[date, date] | None:
+        if self._start is None or self._end is None:
+            return None
+        return self._start, self._end
+
+    def day_state(self, day: date) -> tuple[int, int, bool]:
+        """Return ``(booked_mask, blocked_mask, is_day_off)`` for a day."""
+        return (
+            self._booked.get(day, 0),
+            self._blocked.get(day, 0),
+            day in self._day_off,
+        )
+
+    def set_day_state(
+        self, day: date, *, booked: int, blocked: int, is_day_off: bool
+    ) -> None:
+        if not self.covers(day):
+            return
+        for masks, mask in ((self._booked, booked), (self._blocked, blocked)):
+            if mask:
+                masks[day] = mask
+            else:
+                masks.pop(day, None)
+        if is_day_off:
+            self._day_off.add(day)
+        else:
+            self._day_off.discard(day)
+        self.generation += 1
+
+    def free_mask(self, day: date) -> int:
+        if day in self._day_off:
+            return 0
+        taken = self._booked.get(day, 0) | self._blocked.get(day, 0)
+        return self.full_mask & ~taken
+
+    def available_slots(self, day: date) -> list[str]:
+        return self.slots_for(self.free_mask(day))
+
+    def is_slot_free(self, day: date, slot_hhmm: str) -> bool:
+        bit = self.slot_bit(slot_hhmm)
+        return bool(bit) and bool(self.free_mask(day) & bit)
+
+    def is_slot_key_free(self, key: SlotKey) -> bool:
+        if self._start is None:
+            return False
+        offset = key - day_start_key(self._start)
+        day = self._start + timedelta(days=offset // 1440)
+        bit = self.minute_bit(offset % 1440)
+        return bool(bit) and self.covers(day) and bool(self.free_mask(day) & bit)
+
+    def disabled_dates(self, *, start: date, end: date) -> set[date]:
+        disabled: set[date] = set()
+        cur = start
+        while cur <= end:
+            if not self.free_mask(cur):
+                disabled.add(cur)
+            cur += timedelta(days=1)
+        return disabled
+
+    def apply_order(self, *, day: date, slot_hhmm: str) -> None:
+        if not self.covers(day):
+            return
+        bit = self.slot_bit(slot_hhmm)
+        if bit:
+            self._booked[day] = self._booked.get(day, 0) | bit
+            self.generation += 1
+
+    def apply_day_off(self, *, day: date, is_day_off: bool) -> None:
+        if not self.covers(day):
+            return
+        if is_day_off:
+            self._day_off.add(day)
+        else:
+            self._day_off.discard(day)
+        self.generation += 1
+
+    def apply_blocked_slot(
+        self, *, day: date, slot_time: time, is_blocked: bool
+    ) -> None:
+        if not self.covers(day):
+            return
+        bit = self.minute_bit(slot_time.hour * 60 + slot_time.minute)
+        if not bit:
+            return
+        mask = self._blocked.get(day, 0)
+        mask = mask | bit if is_blocked else mask & ~bit
+        if mask:
+            self._blocked[day] = mask
+        else:
+            self._blocked.pop(day, None)
+        self.generation += 1
+
+
+__all__ = ["AvailabilityIndex"]
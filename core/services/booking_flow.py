@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import date
+from itertools import product
 from typing import Any
 
 from aiogram.filters.callback_data import CallbackData
@@ -10,19 +12,31 @@ from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from core.services.calendar_ui import CalendarView, build_calendar_keyboard
-from core.services.schedule import DEFAULT_SCHEDULE_POLICY, list_time_slots
+from core.services.callback_codec import CompiledCallbackCodec
+from core.services.schedule import (
+    DEFAULT_SCHEDULE_POLICY,
+    SlotKey,
+    list_time_slots,
+    minutes_to_hhmm,
+    slot_key_to_msk,
+)
 
 SUMMARY_MESSAGE_ID_KEY = "booking_summary_message_id"
 QUESTION_MESSAGE_ID_KEY = "booking_question_message_id"
+# Fingerprints of what the flow messages currently show (see render_fingerprint).
+SUMMARY_RENDER_HASH_KEY = "booking_summary_render_hash"
+QUESTION_RENDER_HASH_KEY = "booking_question_render_hash"
 # Booking flow internal keys stored in FSM data.
 CONFIRM_IN_FLIGHT_KEY = "booking_confirm_in_flight"
 ORDER_ID_KEY = "booking_order_id"
+# Slot key leased in Redis for the chosen calendar_time (see SlotHolds).
+SLOT_HOLD_KEY = "booking_slot_hold"
 
 # Optional draft fields that might exist in older/newer iterations of the flow.
 _OPTIONAL_DRAFT_KEYS: frozenset[str] = frozenset({"price_estimate"})
 
 
-class BookingCb(CallbackData, prefix="booking"):
+class BookingCb(CompiledCallbackCodec, CallbackData, prefix="booking"):
     action: str
     field: str | None = None
     value: str | None = None
@@ -60,14 +74,38 @@ def encode_calendar_time_for_callback(value: str) -> str:
     return value.replace(":", "")
 
 
+def encode_calendar_slot_for_callback(key: SlotKey) -> str:
+    # Date-aware time buttons carry the integer slot key itself.
+    return str(key)
+
+
+def calendar_slot_key_from_callback(value: str) -> SlotKey | None:
+    # Slot keys are long ints; 4-digit values are HHMM from date-less keyboards.
+    if len(value) > 4 and value.isdigit():
+        return int(value)
+    return None
+
+
 def decode_calendar_time_from_callback(value: str) -> str:
     if ":" in value:
         return value
     if len(value) == 4 and value.isdigit():
         return f"{value[:2]}:{value[2:]}"
+    key = calendar_slot_key_from_callback(value)
+    if key is not None:
+        return minutes_to_hhmm(slot_key_to_msk(key)[1])
     raise ValueError("Invalid calendar_time format")
 
 
+def render_fingerprint(text: str, reply_markup: InlineKeyboardMarkup | None) -> str:
+    """Short stable hash of a message's text and inline keyboard."""
+    digest = hashlib.blake2b(text.encode(), digest_size=8)
+    if reply_markup is not None:
+        digest.update(b"\0")
+        digest.update(reply_markup.model_dump_json(exclude_none=True).encode())
+    return digest.hexdigest()
+
+
 def reset_booking_draft_data(data: Mapping[str, Any]) -> dict[str, Any]:
     """
     Clear user-provided booking draft fields while keeping flow message ids.
@@ -81,6 +119,7 @@ def reset_booking_draft_data(data: Mapping[str, Any]) -> dict[str, Any]:
         new_data.pop(key, None)
     new_data.pop(CONFIRM_IN_FLIGHT_KEY, None)
     new_data.pop(ORDER_ID_KEY, None)
+    new_data.pop(SLOT_HOLD_KEY, None)
     return new_data
 
 
@@ -150,63 +189,116 @@ def _fmt_value(field: str, value: Any) -> str:
     return str(value)
 
 
+def _keyboard(
+    buttons: list[tuple[str, CallbackData]], *, width: int
+) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    for text, callback_data in buttons:
+        builder.button(text=text, callback_data=callback_data.pack())
+    builder.adjust(width)
+    return builder.as_markup()
+
+
+# Static pieces of the flow UI, built once at import. Builders below hand out
+# shallow copies: callers may replace rows but must not mutate shared buttons.
+_SUMMARY_HEADER = "Сводка заказа\n"
+_SUMMARY_PREFIXES: tuple[tuple[str, str], ...] = tuple(
+    (field.key, f"{field.label}: ") for field in BOOKING_FIELDS
+)
+_SUMMARY_UNANSWERED: dict[str, str] = {
+    key: f"{prefix}—" for key, prefix in _SUMMARY_PREFIXES
+}
+
+
+def _build_summary_keyboard(answered: tuple[bool, ...]) -> InlineKeyboardMarkup:
+    buttons: list[tuple[str, CallbackData]] = [
+        (f"Изменить: {field.label}", BookingCb(action="edit", field=field.key))
+        for field, is_set in zip(BOOKING_FIELDS, answered, strict=True)
+        if is_set
+    ]
+    # Flow-level actions are always available.
+    buttons.append(("Сбросить заявку", BookingCb(action="reset")))
+    buttons.append(("В меню", BookingCb(action="menu")))
+    return _keyboard(buttons, width=1)
+
+
+# One keyboard per answered/unanswered combination (2 ** len(BOOKING_FIELDS)).
+_SUMMARY_KEYBOARDS: dict[tuple[bool, ...], InlineKeyboardMarkup] = {
+    answered: _build_summary_keyboard(answered)
+    for answered in product((False, True), repeat=len(BOOKING_FIELDS))
+}
+
+_WANT_CUSTOM_SKETCH_KEYBOARD = _keyboard(
+    [
+        ("Да", BookingCb(action="set", field="want_custom_sketch", value="1")),
+        ("Нет", BookingCb(action="set", field="want_custom_sketch", value="0")),
+    ],
+    width=2,
+)
+_BODY_PART_KEYBOARD = _keyboard(
+    [
+        (label, BookingCb(action="set", field="body_part", value=key))
+        for key, label in BODY_PART_OPTIONS.items()
+    ],
+    width=2,
+)
+_CALENDAR_TIME_KEYBOARD = _keyboard(
+    [
+        (
+            slot,
+            BookingCb(
+                action="set",
+                field="calendar_time",
+                value=encode_calendar_time_for_callback(slot),
+            ),
+        )
+        for slot in list_time_slots(DEFAULT_SCHEDULE_POLICY)
+    ],
+    width=3,
+)
+_PROMO_CODE_KEYBOARD = _keyboard(
+    [("Пропустить", BookingCb(action="skip", field="promo_code"))], width=1
+)
+_CONFIRM_KEYBOARD = _keyboard([("Подтвердить", BookingCb(action="confirm"))], width=1)
+
+_QUESTION_TEXTS: dict[str, str] = {
+    "want_custom_sketch": "Нужен индивидуальный эскиз?",
+    "body_part": "Выберите часть тела:",
+    "calendar_date": "Выберите дату:",
+    "calendar_time": "Выберите время (МСК):",
+    "promo_code": "Введите промокод или нажмите «Пропустить».",
+    "confirm": "Проверьте сводку и подтвердите запись.",
+}
+_STATIC_QUESTION_KEYBOARDS: dict[str, InlineKeyboardMarkup] = {
+    "want_custom_sketch": _WANT_CUSTOM_SKETCH_KEYBOARD,
+    "body_part": _BODY_PART_KEYBOARD,
+    "calendar_time": _CALENDAR_TIME_KEYBOARD,
+    "promo_code": _PROMO_CODE_KEYBOARD,
+    "confirm": _CONFIRM_KEYBOARD,
+}
+
+
 def render_summary(data: Mapping[str, Any]) -> str:
-    lines: list[str] = ["Сводка заказа", ""]
-    for field in BOOKING_FIELDS:
-        if is_answered(data, field.key):
-            rendered = _fmt_value(field.key, data.get(field.key))
+    lines = [_SUMMARY_HEADER]
+    for key, prefix in _SUMMARY_PREFIXES:
+        if key in data:
+            lines.append(prefix + _fmt_value(key, data[key]))
         else:
-            rendered = "—"
-        lines.append(f"{field.label}: {rendered}")
+            lines.append(_SUMMARY_UNANSWERED[key])
     return "\n".join(lines)
 
 
 def build_summary_keyboard(data: Mapping[str, Any]) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    for field in BOOKING_FIELDS:
-        if not is_answered(data, field.key):
-            continue
-        builder.button(
-            text=f"Изменить: {field.label}",
-            callback_data=BookingCb(action="edit", field=field.key).pack(),
-        )
-    # Flow-level actions are always available.
-    builder.button(
-        text="Сбросить заявку",
-        callback_data=BookingCb(action="reset").pack(),
-    )
-    builder.button(text="В меню", callback_data=BookingCb(action="menu").pack())
-    builder.adjust(1)
-    return builder.as_markup()
+    answered = tuple(is_answered(data, field.key) for field in BOOKING_FIELDS)
+    return _SUMMARY_KEYBOARDS[answered].model_copy()
 
 
 def build_want_custom_sketch_keyboard() -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    builder.button(
-        text="Да",
-        callback_data=BookingCb(
-            action="set", field="want_custom_sketch", value="1"
-        ).pack(),
-    )
-    builder.button(
-        text="Нет",
-        callback_data=BookingCb(
-            action="set", field="want_custom_sketch", value="0"
-        ).pack(),
-    )
-    builder.adjust(2)
-    return builder.as_markup()
+    return _WANT_CUSTOM_SKETCH_KEYBOARD.model_copy()
 
 
 def build_body_part_keyboard() -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    for key, label in BODY_PART_OPTIONS.items():
-        builder.button(
-            text=label,
-            callback_data=BookingCb(action="set", field="body_part", value=key).pack(),
-        )
-    builder.adjust(2)
-    return builder.as_markup()
+    return _BODY_PART_KEYBOARD.model_copy()
 
 
 def build_calendar_date_keyboard(*, today: date) -> InlineKeyboardMarkup:
@@ -218,50 +310,23 @@ def build_calendar_date_keyboard(*, today: date) -> InlineKeyboardMarkup:
 
 
 def build_calendar_time_keyboard() -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    for slot in list_time_slots(DEFAULT_SCHEDULE_POLICY):
-        builder.button(
-            text=slot,
-            callback_data=BookingCb(
-                action="set",
-                field="calendar_time",
-                value=encode_calendar_time_for_callback(slot),
-            ).pack(),
-        )
-    builder.adjust(3)
-    return builder.as_markup()
+    return _CALENDAR_TIME_KEYBOARD.model_copy()
 
 
 def build_promo_code_keyboard() -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    builder.button(
-        text="Пропустить",
-        callback_data=BookingCb(action="skip", field="promo_code").pack(),
-    )
-    builder.adjust(1)
-    return builder.as_markup()
+    return _PROMO_CODE_KEYBOARD.model_copy()
 
 
 def build_confirm_keyboard() -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    builder.button(text="Подтвердить", callback_data=BookingCb(action="confirm").pack())
-    builder.adjust(1)
-    return builder.as_markup()
+    return _CONFIRM_KEYBOARD.model_copy()
 
 
 def question_for_step(
     step: str, *, today: date
 ) -> tuple[str, InlineKeyboardMarkup | None]:
-    if step == "want_custom_sketch":
-        return "Нужен индивидуальный эскиз?", build_want_custom_sketch_keyboard()
-    if step == "body_part":
-        return "Выберите часть тела:", build_body_part_keyboard()
+    text = _QUESTION_TEXTS.get(step)
+    if text is None:
+        raise ValueError(f"Unknown step: {step}")
     if step == "calendar_date":
-        return "Выберите дату:", build_calendar_date_keyboard(today=today)
-    if step == "calendar_time":
-        return "Выберите время (МСК):", build_calendar_time_keyboard()
-    if step == "promo_code":
-        return "Введите промокод или нажмите «Пропустить».", build_promo_code_keyboard()
-    if step == "confirm":
-        return "Проверьте сводку и подтвердите запись.", build_confirm_keyboard()
-    raise ValueError(f"Unknown step: {step}")
+        return text, build_calendar_date_keyboard(today=today)
+    return text, _STATIC_QUESTION_KEYBOARDS[step].model_copy()
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, time
+from datetime import date
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.repositories.orders import create_order
-from core.repositories.users import get_or_create_user
-from core.services.schedule import compose_start_at_utc
+from core.repositories.orders import book_slot
+from core.services.calendar_availability import (
+    AvailabilityCache,
+    forget_availability_memo,
+)
+from core.services.schedule import (
+    hhmm_to_minutes,
+    minutes_to_time,
+    slot_key,
+    slot_key_to_datetime,
+)
+from core.services.user_cache import UserCache
 
 
 @dataclass(frozen=True, slots=True)
@@ -16,14 +26,6 @@ class BookingDraft:
     calendar_time: str
 
 
-def _parse_time_hhmm(value: str) -> time:
-    parts = value.split(":")
-    if len(parts) != 2:
-        raise ValueError("invalid time format")
-    h, m = int(parts[0]), int(parts[1])
-    return time(hour=h, minute=m)
-
-
 def _parse_date_iso(value: str) -> date:
     return date.fromisoformat(value)
 
@@ -35,21 +37,47 @@ async def persist_booking_as_order(
     tg_nickname: str,
     calendar_date: str,
     calendar_time: str,
-) -> int:
+    availability: AvailabilityCache | None = None,
+    users: UserCache | None = None,
+) -> int | None:
+    """
+    Book the slot in a single statement (one DB round trip).
+
+    Returns the order id, or None when the slot is taken, blocked or on a day
+    off; the database decides, so concurrent confirms can't double-book.
+    With ``users``, a known user with an unchanged nickname skips the upsert.
+    """
     chosen_date = _parse_date_iso(calendar_date)
-    chosen_time = _parse_time_hhmm(calendar_time)
-    start_at_utc = compose_start_at_utc(
-        chosen_date=chosen_date, chosen_time=chosen_time
-    )
-
-    async with session.begin():
-        user = await get_or_create_user(
-            session=session,
-            tg_id=tg_id,
-            tg_nickname=tg_nickname,
-        )
-        order = await create_order(
-            session=session, user_id=user.id, start_at=start_at_utc
-        )
-
-    return order.id
+    minutes = hhmm_to_minutes(calendar_time)
+    start_at_utc = slot_key_to_datetime(slot_key(chosen_date, minutes))
+
+    known = users.get(tg_id) if users is not None else None
+    user_id = known.id if known and known.tg_nickname == tg_nickname else None
+    try:
+        async with session.begin():
+            booked = await book_slot(
+                session=session,
+                tg_id=tg_id,
+                tg_nickname=tg_nickname,
+                day=chosen_date,
+                slot_time=minutes_to_time(minutes),
+                start_at=start_at_utc,
+                user_id=user_id,
+            )
+    except IntegrityError:
+        if users is not None:
+            # Could be a stale cached user id; resolve it again next time.
+            users.forget(tg_id)
+        raise
+    if booked is None:
+        return None
+    order_id, user = booked
+    if users is not None:
+        users.remember(tg_id, user)
+
+    forget_availability_memo(session)
+    if availability is not None:
+        # Announce only after commit so other workers never see uncommitted slots.
+        await availability.publish_order(day=chosen_date, slot_hhmm=calendar_time)
+
+    return order_id
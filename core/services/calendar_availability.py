@@ -1,24 +1,55 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+import contextlib
+import logging
+import secrets
+from calendar import monthrange
+from collections.abc import Callable, Iterable, Mapping, Set
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
+from time import time as wall_time
 
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, WatchError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.repositories import availability as availability_repo
 from core.repositories import orders as orders_repo
 from core.repositories import schedule_exceptions as exc_repo
+from core.services.availability_index import AvailabilityIndex
+from core.services.month_cache import MonthCache, MonthLoader
 from core.services.schedule import (
     DEFAULT_SCHEDULE_POLICY,
     MOSCOW_TZ,
     SchedulePolicy,
-    compose_start_at_utc,
+    SlotKey,
+    day_start_key,
+    hhmm_to_minutes,
+    is_date_available,
+    list_slot_minutes,
     list_time_slots,
+    minutes_to_hhmm,
+    now_slot_key,
+    slot_key,
+    slot_key_from_datetime,
+    slot_key_to_datetime,
+    slot_key_to_msk,
+    today_msk,
 )
+from core.services.slot_holds import SlotHolds
 
+logger = logging.getLogger(__name__)
 
-def _time_to_hhmm(t: time) -> str:
-    return f"{t.hour:02d}:{t.minute:02d}"
+AVAILABILITY_VERSION_KEY = "availability:version"
+AVAILABILITY_DAYS_KEY = "availability:days"
+AVAILABILITY_CHANNEL = "availability:changed"
+_HORIZON_FIELD = "_horizon"
+# Wall-clock time the shared snapshot was last rebuilt from Postgres.
+_BUILT_AT_FIELD = "_built_at"
+_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+# Session.info key for availability computed during the current update/request.
+_RANGE_MEMO_KEY = "availability_range_memo"
 
 
 def _parse_time_hhmm(value: str) -> time:
@@ -30,13 +61,30 @@ def _parse_time_hhmm(value: str) -> time:
 
 
 def _msk_day_bounds_utc(day: date) -> tuple[datetime, datetime]:
-    start = compose_start_at_utc(chosen_date=day, chosen_time=time(0, 0))
-    end = compose_start_at_utc(
-        chosen_date=day + timedelta(days=1), chosen_time=time(0, 0)
-    )
+    start = slot_key_to_datetime(day_start_key(day))
+    end = slot_key_to_datetime(day_start_key(day + timedelta(days=1)))
     return start, end
 
 
+def _free_slots(
+    *,
+    policy: SchedulePolicy,
+    day: date,
+    is_day_off: bool,
+    blocked_minutes: Set[int],
+    booked_keys: Set[SlotKey],
+) -> tuple[str, ...]:
+    # Int-keyed variant of _compute_available_slots used by the lookup paths.
+    if is_day_off:
+        return ()
+    base = day_start_key(day)
+    return tuple(
+        minutes_to_hhmm(minutes)
+        for minutes in list_slot_minutes(policy)
+        if minutes not in blocked_minutes and base + minutes not in booked_keys
+    )
+
+
 def _compute_available_slots(
     *,
     policy: SchedulePolicy,
@@ -52,37 +100,494 @@ def _compute_available_slots(
     return [s for s in all_slots if s not in blocked_set and s not in booked_set]
 
 
+@dataclass(frozen=True, slots=True)
+class AvailabilityRange:
+    start: date
+    end: date
+    slots_by_day: Mapping[date, tuple[str, ...]]
+    disabled_dates: frozenset[date]
+    # Index generation the result was derived from (None when read from the DB).
+    generation: int | None = None
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def slots_for(self, day: date) -> list[str]:
+        return list(self.slots_by_day.get(day, ()))
+
+
+def forget_availability_memo(session: AsyncSession) -> None:
+    """Drop availability memoized on the session (call after writing orders)."""
+    info = getattr(session, "info", None)
+    if info is not None:
+        info.pop(_RANGE_MEMO_KEY, None)
+
+
+def _encode_day_state(booked: int, blocked: int, is_day_off: bool) -> str:
+    return f"{booked},{blocked},{int(is_day_off)}"
+
+
+def _decode_day_state(raw: str | None) -> tuple[int, int, bool]:
+    if not raw:
+        return 0, 0, False
+    booked, blocked, day_off = raw.split(",")
+    return int(booked), int(blocked), day_off == "1"
+
+
+def _decode_snapshot(raw: Mapping[str, str]) -> dict[date, tuple[int, int, bool]]:
+    return {
+        date.fromisoformat(field): _decode_day_state(value)
+        for field, value in raw.items()
+        if not field.startswith("_")
+    }
+
+
+DayStateChange = Callable[[int, int, bool], tuple[int, int, bool]]
+
+
+class AvailabilityCache(AvailabilityIndex):
+    """
+    Availability index shared between workers through Redis.
+
+    Per-day slot state lives in the ``availability:days`` hash (one field per
+    ISO date plus the horizon and time it was built for). Every committed
+    change is merged into the day's field in Redis under WATCH (so concurrent
+    changes from other workers are never overwritten), bumps
+    ``availability:version`` and is announced on ``availability:changed``;
+    other workers apply it from the hash. The hash is rebuilt from Postgres
+    once it is older than ``max_age_seconds``, which repairs drift from missed
+    announcements or writes made outside the bot.
+    """
+
+    def __init__(
+        self,
+        *,
+        redis: Redis,
+        policy: SchedulePolicy = DEFAULT_SCHEDULE_POLICY,
+        max_age_seconds: float = 300.0,
+    ) -> None:
+        super().__init__(policy=policy, max_age_seconds=max_age_seconds)
+        self.redis = redis
+        self._origin = secrets.token_hex(4)
+
+    @staticmethod
+    def _horizon_value(start: date, end: date) -> str:
+        return f"{start.isoformat()}:{end.isoformat()}"
+
+    async def version(self) -> int:
+        raw = await self.redis.get(AVAILABILITY_VERSION_KEY)
+        return int(raw) if raw is not None else 0
+
+    async def load(self, *, session: AsyncSession, today: date) -> None:
+        start = today
+        end = today + timedelta(days=self.policy.days_ahead)
+        horizon = self._horizon_value(start, end)
+
+        raw = await self.redis.hgetall(AVAILABILITY_DAYS_KEY)
+        if raw.get(_HORIZON_FIELD) == horizon and self._is_recent(raw):
+            booked: dict[date, int] = {}
+            blocked: dict[date, int] = {}
+            day_off: set[date] = set()
+            for day, state in _decode_snapshot(raw).items():
+                booked[day], blocked[day], is_day_off = state
+                if is_day_off:
+                    day_off.add(day)
+            self.restore(
+                start=start, end=end, day_off=day_off, blocked=blocked, booked=booked
+            )
+            return
+
+        version_before = await self.redis.get(AVAILABILITY_VERSION_KEY)
+        await super().load(session=session, today=today)
+        await self._store_snapshot(start=start, end=end, version_before=version_before)
+
+    async def read_snapshot(
+        self, *, today: date
+    ) -> tuple[int, dict[date, tuple[int, int, bool]]] | None:
+        """
+        Version counter and per-day ``(booked, blocked, is_day_off)`` read together.
+
+        Both come from one MULTI, so the state always matches the version. Returns
+        None when the shared snapshot is missing or covers another horizon.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(AVAILABILITY_VERSION_KEY)
+            pipe.hgetall(AVAILABILITY_DAYS_KEY)
+            raw_version, raw = await pipe.execute()
+        horizon = self._horizon_value(
+            today, today + timedelta(days=self.policy.days_ahead)
+        )
+        if raw.get(_HORIZON_FIELD) != horizon or not self._is_recent(raw):
+            return None
+        return int(raw_version or 0), _decode_snapshot(raw)
+
+    def _is_recent(self, raw: Mapping[str, str]) -> bool:
+        try:
+            built_at = float(raw.get(_BUILT_AT_FIELD) or 0)
+        except ValueError:
+            return False
+        return wall_time() - built_at < self.max_age_seconds
+
+    async def _store_snapshot(
+        self, *, start: date, end: date, version_before: str | None
+    ) -> None:
+        mapping = {
+            _HORIZON_FIELD: self._horizon_value(start, end),
+            _BUILT_AT_FIELD: f"{wall_time():.3f}",
+        }
+        cur = start
+        while cur <= end:
+            state = self.day_state(cur)
+            if any(state):
+                mapping[cur.isoformat()] = _encode_day_state(*state)
+            cur += timedelta(days=1)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                # A change published while we were reading Postgres may be missing
+                # from our snapshot; don't overwrite the shared copy with it.
+                await pipe.watch(AVAILABILITY_VERSION_KEY)
+                if await pipe.get(AVAILABILITY_VERSION_KEY) != version_before:
+                    self.invalidate()
+                    return
+                pipe.multi()
+                pipe.delete(AVAILABILITY_DAYS_KEY)
+                pipe.hset(AVAILABILITY_DAYS_KEY, mapping=mapping)
+                pipe.expire(AVAILABILITY_DAYS_KEY, _SNAPSHOT_TTL_SECONDS)
+                await pipe.execute()
+            except WatchError:
+                self.invalidate()
+
+    async def _publish_change(self, day: date, change: DayStateChange) -> None:
+        """
+        Merge one committed change into the shared day state and announce it.
+
+        The field is read and rewritten under WATCH, so a concurrent change to
+        the same day by another worker is retried on top of, never overwritten.
+        The merged state replaces the local one.
+        """
+        horizon = self.horizon
+        field = day.isoformat()
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(AVAILABILITY_DAYS_KEY)
+                        raw_horizon, raw_state = await pipe.hmget(
+                            AVAILABILITY_DAYS_KEY, [_HORIZON_FIELD, field]
+                        )
+                        merged = None
+                        if (
+                            horizon is not None
+                            and self.covers(day)
+                            and raw_horizon == self._horizon_value(*horizon)
+                        ):
+                            merged = change(*_decode_day_state(raw_state))
+                        pipe.multi()
+                        if merged is not None:
+                            pipe.hset(
+                                AVAILABILITY_DAYS_KEY,
+                                field,
+                                _encode_day_state(*merged),
+                            )
+                        pipe.incr(AVAILABILITY_VERSION_KEY)
+                        await pipe.execute()
+                        break
+                    except WatchError:
+                        continue
+            await self.redis.publish(AVAILABILITY_CHANNEL, f"{self._origin}|{field}")
+        except RedisError:
+            # The DB write is already committed but the shared snapshot may now
+            # miss it: drop it so the next load rebuilds it from Postgres.
+            logger.warning(
+                "Failed to publish availability change", extra={"day": field}
+            )
+            with contextlib.suppress(RedisError):
+                await self.redis.delete(AVAILABILITY_DAYS_KEY)
+            return
+        if merged is not None:
+            booked, blocked, is_day_off = merged
+            self.set_day_state(
+                day, booked=booked, blocked=blocked, is_day_off=is_day_off
+            )
+
+    async def publish_order(self, *, day: date, slot_hhmm: str) -> None:
+        self.apply_order(day=day, slot_hhmm=slot_hhmm)
+        bit = self.slot_bit(slot_hhmm)
+        await self._publish_change(
+            day, lambda booked, blocked, off: (booked | bit, blocked, off)
+        )
+
+    async def publish_day_off(self, *, day: date, is_day_off: bool) -> None:
+        self.apply_day_off(day=day, is_day_off=is_day_off)
+        await self._publish_change(
+            day, lambda booked, blocked, _off: (booked, blocked, is_day_off)
+        )
+
+    async def publish_blocked_slot(
+        self, *, day: date, slot_time: time, is_blocked: bool
+    ) -> None:
+        self.apply_blocked_slot(day=day, slot_time=slot_time, is_blocked=is_blocked)
+        bit = self.minute_bit(slot_time.hour * 60 + slot_time.minute)
+        await self._publish_change(
+            day,
+            lambda booked, blocked, off: (
+                booked,
+                blocked | bit if is_blocked else blocked & ~bit,
+                off,
+            ),
+        )
+
+    async def publish_day_from_db(self, *, session: AsyncSession, day: date) -> None:
+        """
+        Re-read one day from Postgres and publish it.
+
+        Used when a write was rejected for a reason the local state may not
+        know about (slot booked, blocked or day off elsewhere). Bookings are
+        merged into the shared state; blocks and day off are taken from the DB.
+        """
+        is_day_off = await exc_repo.is_day_off(session=session, day=day)
+        blocked_times = await exc_repo.list_blocked_slots_for_date(
+            session=session, day=day
+        )
+        start_utc, end_utc = _msk_day_bounds_utc(day)
+        booked_start_ats = await orders_repo.list_order_start_at_between(
+            session=session, start_at=start_utc, end_at=end_utc
+        )
+        base = day_start_key(day)
+        booked = 0
+        for dt in booked_start_ats:
+            booked |= self.minute_bit(slot_key_from_datetime(dt) - base)
+        blocked = 0
+        for t in blocked_times:
+            blocked |= self.minute_bit(t.hour * 60 + t.minute)
+
+        self.set_day_state(day, booked=booked, blocked=blocked, is_day_off=is_day_off)
+        await self._publish_change(
+            day,
+            lambda shared_booked, _blocked, _off: (
+                shared_booked | booked,
+                blocked,
+                is_day_off,
+            ),
+        )
+
+    async def handle_invalidation(self, payload: str) -> None:
+        origin, _, raw_day = payload.partition("|")
+        if origin == self._origin:
+            return
+        try:
+            day = date.fromisoformat(raw_day)
+        except ValueError:
+            return
+        horizon = self.horizon
+        if horizon is None or not self.covers(day):
+            return
+        raw_horizon, raw_state = await self.redis.hmget(
+            AVAILABILITY_DAYS_KEY, [_HORIZON_FIELD, day.isoformat()]
+        )
+        if raw_horizon != self._horizon_value(*horizon):
+            # Shared snapshot belongs to another horizon: reload on next lookup.
+            self.invalidate()
+            return
+        booked, blocked, is_day_off = _decode_day_state(raw_state)
+        self.set_day_state(day, booked=booked, blocked=blocked, is_day_off=is_day_off)
+
+    async def listen(self, *, reconnect_delay_seconds: float = 1.0) -> None:
+        """Apply changes published by other workers; run as a background task."""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(AVAILABILITY_CHANNEL)
+                # Messages may have been missed while (re)connecting.
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    await self.handle_invalidation(str(message["data"]))
+            except RedisError:
+                logger.warning("Availability invalidation listener disconnected")
+                await asyncio.sleep(reconnect_delay_seconds)
+            finally:
+                await pubsub.aclose()
+
+
 @dataclass(frozen=True, slots=True)
 class CalendarAvailabilityService:
     policy: SchedulePolicy = DEFAULT_SCHEDULE_POLICY
+    # Optional process-wide occupancy index; without it every call hits the DB.
+    index: AvailabilityIndex | None = None
+    # Without an index, compute disabled dates with a single SQL statement
+    # instead of fetching every booking in the horizon.
+    pushdown_disabled_dates: bool = False
+    # Optional per-process cache for month-scoped results (calendar navigation).
+    months: MonthCache | None = None
+    # Optional Redis slot leases taken while a user is confirming a booking.
+    holds: SlotHolds | None = None
+
+    def __post_init__(self) -> None:
+        if self.index is not None and self.index.policy != self.policy:
+            raise ValueError("availability index policy mismatch")
+
+    async def _indexed(self, *, session: AsyncSession, today: date) -> bool:
+        if self.index is None:
+            return False
+        await self.index.ensure_loaded(session=session, today=today)
+        return True
+
+    def _memo(self, session: AsyncSession) -> list[AvailabilityRange] | None:
+        # The session lives for exactly one update/request, so is the memo.
+        info = getattr(session, "info", None)
+        if info is None:
+            return None
+        return info.setdefault(_RANGE_MEMO_KEY, {}).setdefault(self.policy, [])
+
+    def _memo_lookup(
+        self, *, session: AsyncSession, start: date, end: date
+    ) -> AvailabilityRange | None:
+        generation = self.index.generation if self.index is not None else None
+        for cached in self._memo(session) or ():
+            if (
+                cached.generation == generation
+                and cached.covers(start)
+                and cached.covers(end)
+            ):
+                return cached
+        return None
+
+    async def _fetch_range(
+        self, *, session: AsyncSession, start: date, end: date
+    ) -> dict[date, tuple[str, ...]]:
+        day_off_dates = await exc_repo.list_day_off_dates(
+            session=session,
+            start_date=start,
+            end_date_inclusive=end,
+        )
+
+        blocked_by_date = await exc_repo.list_blocked_slots_between(
+            session=session,
+            start_date=start,
+            end_date_inclusive=end,
+        )
+
+        start_utc, _ = _msk_day_bounds_utc(start)
+        _, end_utc = _msk_day_bounds_utc(end)
+        booked_start_ats = await orders_repo.list_order_start_at_between(
+            session=session,
+            start_at=start_utc,
+            end_at=end_utc,
+        )
+        booked_keys = {slot_key_from_datetime(dt) for dt in booked_start_ats}
+
+        slots_by_day: dict[date, tuple[str, ...]] = {}
+        cur = start
+        while cur <= end:
+            slots_by_day[cur] = _free_slots(
+                policy=self.policy,
+                day=cur,
+                is_day_off=cur in day_off_dates,
+                blocked_minutes={
+                    t.hour * 60 + t.minute for t in blocked_by_date.get(cur, ())
+                },
+                booked_keys=booked_keys,
+            )
+            cur += timedelta(days=1)
+        return slots_by_day
+
+    async def get_availability_range(
+        self,
+        *,
+        session: AsyncSession,
+        start: date,
+        end: date,
+    ) -> AvailabilityRange:
+        """
+        Available slots per day and the disabled-date set for ``[start, end]``.
+
+        Computed from the index when it covers the range, otherwise from one
+        batched fetch (three range queries). Results are memoized on the session,
+        so repeated lookups within the same update reuse them.
+        """
+        if start > end:
+            raise ValueError("start must not be after end")
+
+        indexed = await self._indexed(session=session, today=today_msk())
+        cached = self._memo_lookup(session=session, start=start, end=end)
+        if cached is not None:
+            return cached
+
+        if indexed and self.index.covers(start) and self.index.covers(end):
+            slots_by_day: dict[date, tuple[str, ...]] = {}
+            cur = start
+            while cur <= end:
+                slots_by_day[cur] = tuple(self.index.available_slots(cur))
+                cur += timedelta(days=1)
+            generation = self.index.generation
+        else:
+            slots_by_day = await self._fetch_range(
+                session=session, start=start, end=end
+            )
+            generation = self.index.generation if self.index is not None else None
+
+        result = AvailabilityRange(
+            start=start,
+            end=end,
+            slots_by_day=slots_by_day,
+            disabled_dates=frozenset(
+                d for d, slots in slots_by_day.items() if not slots
+            ),
+            generation=generation,
+        )
+        memo = self._memo(session)
+        if memo is not None:
+            memo.append(result)
+        return result
 
     async def get_available_slots(
         self,
         *,
         session: AsyncSession,
         day: date,
+        holder: int | None = None,
     ) -> list[str]:
+        slots = await self._unbooked_slots(session=session, day=day)
+        if self.holds is None or not slots:
+            return slots
+        # Slots leased by other users count as taken; the holder sees its own.
+        base = day_start_key(day)
+        by_key = {base + hhmm_to_minutes(slot): slot for slot in slots}
+        held = await self.holds.held_by_others(by_key, holder=holder)
+        return [slot for key, slot in by_key.items() if key not in held]
+
+    async def _unbooked_slots(self, *, session: AsyncSession, day: date) -> list[str]:
+        indexed = await self._indexed(session=session, today=today_msk())
+        cached = self._memo_lookup(session=session, start=day, end=day)
+        if cached is not None:
+            return cached.slots_for(day)
+        if indexed and self.index.covers(day):
+            return self.index.available_slots(day)
+
         if await exc_repo.is_day_off(session=session, day=day):
             return []
 
         blocked_times = await exc_repo.list_blocked_slots_for_date(
             session=session, day=day
         )
-        blocked = {_time_to_hhmm(t) for t in blocked_times}
-
         start_utc, end_utc = _msk_day_bounds_utc(day)
         booked_start_ats = await orders_repo.list_order_start_at_between(
             session=session,
             start_at=start_utc,
             end_at=end_utc,
         )
-        booked = {dt.astimezone(MOSCOW_TZ).strftime("%H:%M") for dt in booked_start_ats}
 
-        return _compute_available_slots(
-            policy=self.policy,
-            is_day_off=False,
-            blocked=blocked,
-            booked=booked,
+        return list(
+            _free_slots(
+                policy=self.policy,
+                day=day,
+                is_day_off=False,
+                blocked_minutes={t.hour * 60 + t.minute for t in blocked_times},
+                booked_keys={slot_key_from_datetime(dt) for dt in booked_start_ats},
+            )
         )
 
     async def get_disabled_dates(
@@ -91,55 +596,134 @@ class CalendarAvailabilityService:
         session: AsyncSession,
         today: date,
     ) -> set[date]:
-        start_date = today
-        end_date = today + timedelta(days=self.policy.days_ahead)
+        end = today + timedelta(days=self.policy.days_ahead)
+        if self.pushdown_disabled_dates and self.index is None:
+            cached = self._memo_lookup(session=session, start=today, end=end)
+            if cached is not None:
+                return set(cached.disabled_dates)
+            return await availability_repo.list_unavailable_dates(
+                session=session,
+                start_date=today,
+                end_date_inclusive=end,
+                slot_times=[
+                    _parse_time_hhmm(slot) for slot in list_time_slots(self.policy)
+                ],
+                tz_name=MOSCOW_TZ.key,
+            )
 
-        day_off_dates = await exc_repo.list_day_off_dates(
-            session=session,
-            start_date=start_date,
-            end_date_inclusive=end_date,
+        availability = await self.get_availability_range(
+            session=session, start=today, end=end
         )
+        return set(availability.disabled_dates)
 
-        blocked_by_date = await exc_repo.list_blocked_slots_between(
-            session=session,
-            start_date=start_date,
-            end_date_inclusive=end_date,
-        )
+    async def find_next_available(
+        self,
+        *,
+        session: AsyncSession,
+        from_day: date,
+        count: int = 1,
+        holder: int | None = None,
+        chunk_days: int = 7,
+    ) -> list[SlotKey]:
+        """
+        Earliest ``count`` free slots at or after ``from_day`` within the horizon.
 
-        start_utc, _ = _msk_day_bounds_utc(start_date)
-        end_utc = compose_start_at_utc(
-            chosen_date=end_date + timedelta(days=1), chosen_time=time(0, 0)
-        )
-        booked_start_ats = await orders_repo.list_order_start_at_between(
-            session=session,
-            start_at=start_utc,
-            end_at=end_utc,
+        Slots that have already started, or start within the policy's
+        ``lead_minutes``, are skipped.
+        The scan walks forward and stops as soon as enough slots are found: day by
+        day on the index, otherwise in ``chunk_days`` batches (three range queries
+        each) instead of materialising the whole horizon.
+        """
+        today = today_msk()
+        earliest = now_slot_key() + self.policy.lead_minutes
+        start = max(from_day, today)
+        horizon_end = today + timedelta(days=self.policy.days_ahead)
+        found: list[SlotKey] = []
+        indexed = await self._indexed(session=session, today=today)
+        while start <= horizon_end and len(found) < count:
+            end = min(start + timedelta(days=chunk_days - 1), horizon_end)
+            candidates: list[SlotKey] = []
+            cur = start
+            if indexed and self.index.covers(start) and self.index.covers(end):
+                while cur <= end and len(candidates) < count:
+                    base = day_start_key(cur)
+                    candidates.extend(
+                        base + hhmm_to_minutes(slot)
+                        for slot in self.index.available_slots(cur)
+                    )
+                    cur += timedelta(days=1)
+                # Resume after the last scanned day if held slots fall through.
+                end = cur - timedelta(days=1)
+            else:
+                availability = await self._fetch_range(
+                    session=session, start=start, end=end
+                )
+                for cur, slots in sorted(availability.items()):
+                    base = day_start_key(cur)
+                    candidates.extend(base + hhmm_to_minutes(s) for s in slots)
+            candidates = [key for key in candidates if key > earliest]
+            if candidates and self.holds is not None:
+                held = await self.holds.held_by_others(candidates, holder=holder)
+                candidates = [key for key in candidates if key not in held]
+            found.extend(candidates[: count - len(found)])
+            start = end + timedelta(days=1)
+        return found
+
+    def _month_range(
+        self, *, today: date, year: int, month: int
+    ) -> tuple[date, date] | None:
+        start = max(date(year, month, 1), today)
+        end = min(
+            date(year, month, monthrange(year, month)[1]),
+            today + timedelta(days=self.policy.days_ahead),
         )
-        booked_by_date: dict[date, set[str]] = {}
-        for dt in booked_start_ats:
-            dt_msk = dt.astimezone(MOSCOW_TZ)
-            booked_by_date.setdefault(dt_msk.date(), set()).add(
-                dt_msk.strftime("%H:%M")
+        return (start, end) if start <= end else None
+
+    def _month_loader(self, *, today: date, year: int, month: int) -> MonthLoader:
+        async def load(session: AsyncSession) -> frozenset[date]:
+            bounds = self._month_range(today=today, year=year, month=month)
+            if bounds is None:
+                return frozenset()
+            availability = await self.get_availability_range(
+                session=session, start=bounds[0], end=bounds[1]
             )
+            return availability.disabled_dates
 
-        disabled: set[date] = set()
-        cur = start_date
-        while cur <= end_date:
-            if cur in day_off_dates:
-                disabled.add(cur)
-            else:
-                blocked = {_time_to_hhmm(t) for t in blocked_by_date.get(cur, set())}
-                booked = booked_by_date.get(cur, set())
-                if not _compute_available_slots(
-                    policy=self.policy,
-                    is_day_off=False,
-                    blocked=blocked,
-                    booked=booked,
-                ):
-                    disabled.add(cur)
-            cur += timedelta(days=1)
+        return load
 
-        return disabled
+    async def get_month_disabled_dates(
+        self,
+        *,
+        session: AsyncSession,
+        today: date,
+        year: int,
+        month: int,
+    ) -> frozenset[date]:
+        """
+        Disabled dates of a single calendar month, clipped to the booking horizon.
+
+        With ``months`` configured the result is cached per process and the
+        adjacent months are prefetched in the background.
+        """
+        load = self._month_loader(today=today, year=year, month=month)
+        if self.months is None:
+            return await load(session)
+
+        indexed = await self._indexed(session=session, today=today)
+        generation = self.index.generation if indexed else None
+        prev_day = date(year, month, 1) - timedelta(days=1)
+        next_day = date(year, month, 28) + timedelta(days=4)
+        for adjacent in (prev_day, next_day):
+            if self._month_range(today=today, year=adjacent.year, month=adjacent.month):
+                self.months.prefetch(
+                    (self.policy, today, adjacent.year, adjacent.month, generation),
+                    self._month_loader(
+                        today=today, year=adjacent.year, month=adjacent.month
+                    ),
+                )
+        return await self.months.get(
+            (self.policy, today, year, month, generation), load, session=session
+        )
 
     async def is_slot_available(
         self,
@@ -147,16 +731,66 @@ class CalendarAvailabilityService:
         session: AsyncSession,
         day: date,
         slot_hhmm: str,
+        holder: int | None = None,
     ) -> bool:
+        try:
+            minutes = hhmm_to_minutes(slot_hhmm)
+        except ValueError:
+            return False
+        return await self.is_slot_key_available(
+            session=session, key=slot_key(day, minutes), holder=holder
+        )
+
+    async def is_slot_key_available(
+        self,
+        *,
+        session: AsyncSession,
+        key: SlotKey,
+        holder: int | None = None,
+    ) -> bool:
+        day, minutes = slot_key_to_msk(key)
         # Validate slot belongs to the schedule policy.
-        if slot_hhmm not in set(list_time_slots(self.policy)):
+        if minutes not in list_slot_minutes(self.policy):
+            return False
+        if await self._indexed(session=session, today=today_msk()) and (
+            self.index.covers(day)
+        ):
+            free = self.index.is_slot_key_free(key)
+        else:
+            slots = await self._unbooked_slots(session=session, day=day)
+            free = minutes_to_hhmm(minutes) in slots
+        if not free or self.holds is None:
+            return free
+        return key not in await self.holds.held_by_others([key], holder=holder)
+
+    async def is_slot_key_open(
+        self, key: SlotKey, *, holder: int | None = None
+    ) -> bool:
+        """
+        Cheap pre-check before an atomic booking: no database access.
+
+        Checks the slot against the policy and horizon and against other
+        users' holds; day offs, blocked slots and existing orders are left to
+        ``book_slot``.
+        """
+        day, minutes = slot_key_to_msk(key)
+        if minutes not in list_slot_minutes(self.policy):
+            return False
+        if not is_date_available(chosen=day, today=today_msk(), policy=self.policy):
             return False
-        slots = await self.get_available_slots(session=session, day=day)
-        return slot_hhmm in set(slots)
+        if self.holds is None:
+            return True
+        return key not in await self.holds.held_by_others([key], holder=holder)
 
 
 __all__ = [
+    "AVAILABILITY_CHANNEL",
+    "AVAILABILITY_DAYS_KEY",
+    "AVAILABILITY_VERSION_KEY",
+    "AvailabilityCache",
+    "AvailabilityRange",
     "CalendarAvailabilityService",
+    "forget_availability_memo",
     "_compute_available_slots",
     "_parse_time_hhmm",
 ]
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from calendar import monthrange
+from collections.abc import Set
 from dataclasses import dataclass
 from datetime import date, timedelta
+from functools import lru_cache
 
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from core.services.callback_codec import CompiledCallbackCodec
 from core.services.schedule import (
     DEFAULT_SCHEDULE_POLICY,
     SchedulePolicy,
@@ -15,7 +18,7 @@ from core.services.schedule import (
 )
 
 
-class CalendarCb(CallbackData, prefix="cal"):
+class CalendarCb(CompiledCallbackCodec, CallbackData, prefix="cal"):
     action: str
     year: int
     month: int
@@ -23,6 +26,8 @@ class CalendarCb(CallbackData, prefix="cal"):
 
 
 _WEEKDAYS_RU = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+# Rendered keyboards kept in memory (LRU); a few months x few availability states.
+_KEYBOARD_CACHE_SIZE = 256
 
 
 @dataclass(frozen=True, slots=True)
@@ -48,12 +53,39 @@ def build_calendar_keyboard(
     today: date,
     view: CalendarView,
     policy: SchedulePolicy = DEFAULT_SCHEDULE_POLICY,
-    disabled_dates: set[date] | None = None,
-    marked_dates: set[date] | None = None,
+    disabled_dates: Set[date] | None = None,
+    marked_dates: Set[date] | None = None,
+) -> InlineKeyboardMarkup:
+    """
+    Calendar markup for one month; identical inputs share one rendered keyboard.
+
+    Only dates of the displayed month affect the output, so the cache key keeps
+    just those. The returned markup is a shallow copy: callers may replace its
+    rows but must not mutate the shared buttons.
+    """
+    first = date(view.year, view.month, 1)
+    last = date(view.year, view.month, monthrange(view.year, view.month)[1])
+
+    def in_view(dates: Set[date] | None) -> frozenset[date]:
+        if not dates:
+            return frozenset()
+        return frozenset(d for d in dates if first <= d <= last)
+
+    markup = _render_calendar_keyboard(
+        today, view, policy, in_view(disabled_dates), in_view(marked_dates)
+    )
+    return markup.model_copy()
+
+
+@lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
+def _render_calendar_keyboard(
+    today: date,
+    view: CalendarView,
+    policy: SchedulePolicy,
+    disabled_dates: frozenset[date],
+    marked_dates: frozenset[date],
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    disabled_dates = disabled_dates or set()
-    marked_dates = marked_dates or set()
 
     # Header
     builder.row(
@@ -166,3 +198,13 @@ def build_calendar_keyboard(
         width=2,
     )
     return builder.as_markup()
+
+
+def calendar_keyboard_cache_info() -> tuple[int, int, int, int | None]:
+    """``(hits, misses, currsize, maxsize)`` of the rendered-keyboard cache."""
+    info = _render_calendar_keyboard.cache_info()
+    return info.hits, info.misses, info.currsize, info.maxsize
+
+
+def clear_calendar_keyboard_cache() -> None:
+    _render_calendar_keyboard.cache_clear()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import types
+import typing
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData
+from pydantic_core import PydanticUndefined
+
+_UNION_TYPES = {typing.Union, types.UnionType}
+_TRUE = frozenset({"1", "true", "t", "yes", "y", "on"})
+_FALSE = frozenset({"0", "false", "f", "no", "n", "off"})
+
+Encoder = Callable[[Any], str]
+Decoder = Callable[[str], Any]
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"Invalid boolean {raw!r}")
+
+
+def _encode_bool(value: Any) -> str:
+    return "1" if value else "0"
+
+
+# Scalar types we compile; anything else falls back to aiogram's generic codec.
+_CODECS: dict[type, tuple[Encoder, Decoder]] = {
+    str: (str, str),
+    int: (str, int),
+    bool: (_encode_bool, _parse_bool),
+}
+
+
+def _unwrap_optional(annotation: Any) -> tuple[Any, bool]:
+    if typing.get_origin(annotation) in _UNION_TYPES:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0], len(args) < len(typing.get_args(annotation))
+    return annotation, False
+
+
+class _Codec:
+    __slots__ = (
+        "prefix",
+        "sep",
+        "names",
+        "fields_set",
+        "encoders",
+        "decoders",
+        "empty",
+    )
+
+    def __init__(self, model: type[CallbackData]) -> None:
+        self.prefix = model.__prefix__
+        self.sep = model.__separator__
+        self.names = tuple(model.model_fields)
+        self.fields_set = set(self.names)
+        encoders: list[Encoder] = []
+        decoders: list[Decoder] = []
+        empty: list[Any] = []
+        for name, field in model.model_fields.items():
+            scalar, nullable = _unwrap_optional(field.annotation)
+            codec = _CODECS.get(scalar)
+            if codec is None:
+                raise TypeError(f"{model.__name__}.{name}: unsupported {scalar!r}")
+            encoders.append(codec[0])
+            decoders.append(codec[1])
+            # Mirrors aiogram: "" on a nullable field means its default / None.
+            if (nullable or not field.is_required()) and field.default != "":
+                default = field.default
+                empty.append(None if default is PydanticUndefined else default)
+            else:
+                empty.append(PydanticUndefined)
+        self.encoders = tuple(encoders)
+        self.decoders = tuple(decoders)
+        self.empty = tuple(empty)
+
+    def pack(self, obj: CallbackData) -> str:
+        sep = self.sep
+        parts = [self.prefix]
+        for name, encode in zip(self.names, self.encoders, strict=True):
+            value = getattr(obj, name)
+            if value is None:
+                parts.append("")
+                continue
+            encoded = encode(value)
+            if sep in encoded:
+                raise ValueError(
+                    f"Separator symbol {sep!r} can not be used "
+                    f"in value {name}={encoded!r}"
+                )
+            parts.append(encoded)
+        data = sep.join(parts)
+        if len(data.encode()) > MAX_CALLBACK_LENGTH:
+            raise ValueError(
+                f"Resulted callback data is too long! "
+                f"len({data!r}.encode()) > {MAX_CALLBACK_LENGTH}"
+            )
+        return data
+
+    def unpack(self, model: type[CallbackData], value: str) -> Any:
+        prefix, *parts = value.split(self.sep)
+        if len(parts) != len(self.names):
+            raise TypeError(
+                f"Callback data {model.__name__!r} takes {len(self.names)} "
+                f"arguments but {len(parts)} were given"
+            )
+        if prefix != self.prefix:
+            raise ValueError(f"Bad prefix ({prefix!r} != {self.prefix!r})")
+        payload: dict[str, Any] = {}
+        for name, raw, decode, empty in zip(
+            self.names, parts, self.decoders, self.empty, strict=True
+        ):
+            if raw == "" and empty is not PydanticUndefined:
+                payload[name] = empty
+            else:
+                payload[name] = decode(raw)
+        # Values are already typed: build the instance the way model_construct
+        # does, minus its per-field default/alias bookkeeping.
+        obj = model.__new__(model)
+        _set = object.__setattr__
+        _set(obj, "__dict__", payload)
+        _set(obj, "__pydantic_fields_set__", set(self.fields_set))
+        _set(obj, "__pydantic_extra__", None)
+        _set(obj, "__pydantic_private__", None)
+        return obj
+
+
+class CompiledCallbackCodec:
+    """
+    Mixin for ``CallbackData`` with a codec compiled once per class.
+
+    Usage: ``class FooCb(CompiledCallbackCodec, CallbackData, prefix="foo")``.
+    ``pack``/``unpack`` keep aiogram's ``prefix:field:field`` wire format
+    (``None`` -> ``""``, ``bool`` -> ``"1"``/``"0"``) but use per-field
+    formatters/parsers instead of ``model_dump`` and model validation.
+    ``CallbackData.filter()`` calls ``cls.unpack``, so handlers get it for free.
+    Classes with field types outside ``str``/``int``/``bool`` (optionally
+    nullable) keep the generic codec.
+    """
+
+    __callback_codec__: ClassVar[_Codec | None] = None
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)  # type: ignore[misc]
+        try:
+            cls.__callback_codec__ = _Codec(cls)  # type: ignore[arg-type]
+        except TypeError:
+            cls.__callback_codec__ = None
+
+    def pack(self) -> str:
+        codec = type(self).__callback_codec__
+        if codec is None:
+            return super().pack()  # type: ignore[misc]
+        return codec.pack(self)  # type: ignore[arg-type]
+
+    @classmethod
+    def unpack(cls, value: str) -> Any:
+        codec = cls.__callback_codec__
+        if codec is None:
+            return super().unpack(value)  # type: ignore[misc]
+        return codec.unpack(cls, value)  # type: ignore[arg-type]
+
+
+__all__ = ["CompiledCallbackCodec"]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from time import monotonic
+from types import MappingProxyType
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.repositories import styles as styles_repo
+from core.repositories import tattoos as tattoos_repo
+from infra.db.models.style import Style
+from infra.db.models.tattoo import Tattoo
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_CHANNEL = "catalog:changed"
+
+
+@dataclass(frozen=True, slots=True)
+class StyleRecord:
+    id: int
+    name: str
+    multiplyer: Decimal | None
+    top_tattoo_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class TattooRecord:
+    id: int
+    name: str
+    style_id: int
+    price: int | None
+    # As of the snapshot load; see CatalogStore.max_age_seconds.
+    views: int
+    photo_file_id: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """All styles and tattoos at one ``catalog:version``, indexed by id and name."""
+
+    version: int
+    # Ordered by name, like ``list_styles``.
+    styles: tuple[StyleRecord, ...]
+    styles_by_id: Mapping[int, StyleRecord]
+    styles_by_name: Mapping[str, StyleRecord]
+    tattoos_by_id: Mapping[int, TattooRecord]
+    tattoos_by_name: Mapping[str, TattooRecord]
+
+    @classmethod
+    def build(
+        cls, *, version: int, styles: Iterable[Style], tattoos: Iterable[Tattoo]
+    ) -> CatalogSnapshot:
+        style_records = tuple(
+            sorted(
+                (
+                    StyleRecord(
+                        id=s.id,
+                        name=s.name,
+                        multiplyer=s.multiplyer,
+                        top_tattoo_id=s.top_tattoo_id,
+                    )
+                    for s in styles
+                ),
+                key=lambda s: s.name,
+            )
+        )
+        tattoo_records = [
+            TattooRecord(
+                id=t.id,
+                name=t.name,
+                style_id=t.style_id,
+                price=t.price,
+                views=t.views or 0,
+                photo_file_id=t.photo_file_id,
+            )
+            for t in tattoos
+        ]
+        return cls(
+            version=version,
+            styles=style_records,
+            styles_by_id=MappingProxyType({s.id: s for s in style_records}),
+            styles_by_name=MappingProxyType({s.name: s for s in style_records}),
+            tattoos_by_id=MappingProxyType({t.id: t for t in tattoo_records}),
+            tattoos_by_name=MappingProxyType({t.name: t for t in tattoo_records}),
+        )
+
+    def style(self, style_id: int) -> StyleRecord | None:
+        return self.styles_by_id.get(style_id)
+
+    def tattoo(self, tattoo_id: int) -> TattooRecord | None:
+        return self.tattoos_by_id.get(tattoo_id)
+
+
+class CatalogStore:
+    """
+    Per-process catalog snapshot, replaced as a whole on every change.
+
+    Reads are served from memory. ``publish_change`` (called after a committed
+    admin write) bumps ``catalog:version``, announces it on ``catalog:changed``
+    and reloads the local snapshot; ``listen`` makes other workers reload on
+    their next read. Snapshots also expire after ``max_age_seconds``, which
+    bounds how stale tattoo view counts get and covers missed announcements.
+    """
+
+    def __init__(self, *, redis: Redis, max_age_seconds: float = 300.0) -> None:
+        self.redis = redis
+        self.max_age_seconds = max_age_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot | None:
+        return self._snapshot
+
+    def is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and monotonic() - self._loaded_at < self.max_age_seconds
+        )
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+    async def current(self, *, session: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and self.is_fresh():
+            return snapshot
+        async with self._lock:
+            # Another task may have reloaded while we were waiting.
+            if self._snapshot is not None and self.is_fresh():
+                return self._snapshot
+            return await self.reload(session=session)
+
+    async def _read_version(self) -> int:
+        try:
+            raw = await self.redis.get(CATALOG_VERSION_KEY)
+        except RedisError:
+            logger.warning("Failed to read catalog version")
+            return -1
+        return int(raw) if raw is not None else 0
+
+    async def reload(self, *, session: AsyncSession) -> CatalogSnapshot:
+        # Version first: rows loaded afterwards are at least that new.
+        version = await self._read_version()
+        styles = await styles_repo.list_styles(session=session)
+        tattoos = await tattoos_repo.list_tattoos(session=session)
+        snapshot = CatalogSnapshot.build(
+            version=version, styles=styles, tattoos=tattoos
+        )
+        self._snapshot = snapshot
+        self._loaded_at = monotonic()
+        return snapshot
+
+    async def publish_change(self, *, session: AsyncSession) -> CatalogSnapshot:
+        try:
+            version = await self.redis.incr(CATALOG_VERSION_KEY)
+            await self.redis.publish(CATALOG_CHANNEL, str(version))
+        except RedisError:
+            # The DB write is already committed; other workers catch up on expiry.
+            logger.warning("Failed to publish catalog change")
+        async with self._lock:
+            return await self.reload(session=session)
+
+    def handle_invalidation(self, payload: str) -> None:
+        try:
+            version = int(payload)
+        except ValueError:
+            return
+        snapshot = self._snapshot
+        if snapshot is None or version > snapshot.version:
+            self.invalidate()
+
+    async def listen(self, *, reconnect_delay_seconds: float = 1.0) -> None:
+        """Pick up changes published by other workers; run as a background task."""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(CATALOG_CHANNEL)
+                # Changes may have been missed while (re)connecting.
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self.handle_invalidation(str(message["data"]))
+            except RedisError:
+                logger.warning("Catalog invalidation listener disconnected")
+                await asyncio.sleep(reconnect_delay_seconds)
+            finally:
+                await pubsub.aclose()
+
+
+__all__ = [
+    "CATALOG_CHANNEL",
+    "CATALOG_VERSION_KEY",
+    "CatalogSnapshot",
+    "CatalogStore",
+    "StyleRecord",
+    "TattooRecord",
+]
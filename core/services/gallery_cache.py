@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from time import monotonic
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.services.catalog import CATALOG_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+GalleryRender = Callable[[], Awaitable[Any]]
+
+
+class GalleryCache:
+    """
+    Per-process cache of rendered gallery screens.
+
+    Every user gets the same text and keyboard for a given screen, so renders are
+    shared and keyed by ``catalog:version``. Catalog writes bump the version
+    (``CatalogStore.publish_change``), which retires cached screens on all
+    workers at once. View counters are not versioned: they may lag by up to
+    ``ttl_seconds``. When Redis is unavailable screens are rendered uncached.
+    """
+
+    def __init__(
+        self, *, redis: Redis, ttl_seconds: float = 60.0, max_entries: int = 1024
+    ) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def version(self) -> int | None:
+        try:
+            raw = await self.redis.get(CATALOG_VERSION_KEY)
+        except RedisError:
+            logger.warning("Failed to read catalog version")
+            return None
+        return int(raw) if raw is not None else 0
+
+    async def get(self, key: Hashable, render: GalleryRender) -> Any:
+        """Cached result of ``render()`` for ``key`` at the current catalog version."""
+        version = await self.version()
+        if version is None:
+            return await render()
+        full_key = (version, key)
+        hit, value = self._lookup(full_key)
+        if hit:
+            return value
+        value = await render()
+        self._store(full_key, value)
+        return value
+
+
+__all__ = ["GalleryCache", "GalleryRender"]
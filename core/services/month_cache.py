@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from time import monotonic
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+MonthLoader = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class MonthCache:
+    """
+    Per-process cache of month-scoped calendar results.
+
+    Callers put everything that invalidates a result (today, index generation)
+    into the key; entries additionally expire after ``ttl_seconds``. ``prefetch``
+    computes an entry in a background task with its own session, so the next
+    ``prev``/``next`` navigation is answered from a warm entry.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_maker: async_sessionmaker[AsyncSession],
+        ttl_seconds: float = 30.0,
+        max_entries: int = 256,
+    ) -> None:
+        self._session_maker = session_maker
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Task[None]] = {}
+        # Bumped by clear() so in-flight prefetches don't store stale results.
+        self._epoch = 0
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self, key: Hashable, load: MonthLoader, *, session: AsyncSession
+    ) -> Any:
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Prefetch is already running for this month: wait for it instead of
+            # computing the same result twice.
+            await asyncio.shield(pending)
+            hit, value = self._lookup(key)
+            if hit:
+                return value
+        value = await load(session)
+        self._store(key, value)
+        return value
+
+    def prefetch(self, key: Hashable, load: MonthLoader) -> None:
+        if key in self._pending or self._lookup(key)[0]:
+            return
+        self._pending[key] = asyncio.create_task(self._run(key, load))
+
+    async def _run(self, key: Hashable, load: MonthLoader) -> None:
+        epoch = self._epoch
+        try:
+            async with self._session_maker() as session:
+                value = await load(session)
+            if epoch == self._epoch:
+                self._store(key, value)
+        except Exception:
+            # Best-effort: the foreground request computes the month itself.
+            logger.warning(
+                "Month prefetch failed", extra={"key": repr(key)}, exc_info=True
+            )
+        finally:
+            self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._epoch += 1
+
+
+__all__ = ["MonthCache"]
@@ -6,6 +6,7 @@ from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP, Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.repositories import pricing as pricing_repo
+from core.services.user_cache import UserCache
 
 _ONE = Decimal("1")
 _TEN = Decimal("10")
@@ -70,6 +71,7 @@ async def _resolve_discount_multiplier(
     session: AsyncSession,
     tg_id: int,
     promo_code: str | None,
+    users: UserCache | None,
 ) -> Decimal:
     if promo_code:
         discount = await pricing_repo.get_active_discount_by_code(
@@ -78,9 +80,12 @@ async def _resolve_discount_multiplier(
         if discount is not None and discount.multiplyer is not None:
             return _as_discount_multiplier(value=Decimal(discount.multiplyer))
 
-    personal = await pricing_repo.get_user_personal_discount_multiplier(
-        session=session, tg_id=tg_id
-    )
+    if users is not None:
+        personal = await users.personal_discount(session=session, tg_id=tg_id)
+    else:
+        personal = await pricing_repo.get_user_personal_discount_multiplier(
+            session=session, tg_id=tg_id
+        )
     if personal is not None:
         return _as_discount_multiplier(value=Decimal(personal))
 
@@ -91,6 +96,7 @@ async def calculate_price(
     *,
     session: AsyncSession,
     data: PricingRequest,
+    users: UserCache | None = None,
 ) -> PricingResult:
     config = await pricing_repo.get_active_pricing_config(session=session)
     if config is None:
@@ -129,6 +135,7 @@ async def calculate_price(
         session=session,
         tg_id=data.tg_id,
         promo_code=data.promo_code,
+        users=users,
     )
     discounted = bounded_price * discount_multiplier
 
@@ -2,17 +2,25 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 MOSCOW_TZ = ZoneInfo("Europe/Moscow")
 UTC_TZ = UTC
 
+# Slot identity as a plain int: UTC minutes since the Unix epoch of the slot
+# start. It equals ``slot_key_from_datetime(orders.start_at)``, so availability
+# checks compare ints instead of formatting/parsing datetimes and "HH:MM".
+SlotKey = int
+
 
 @dataclass(frozen=True, slots=True)
 class SchedulePolicy:
     days_ahead: int
     start_hour: int
     end_hour_inclusive: int
+    # Minimum notice before a slot start; slots starting sooner are not offered.
+    lead_minutes: int = 0
 
 
 DEFAULT_SCHEDULE_POLICY = SchedulePolicy(
@@ -50,3 +58,58 @@ def compose_start_at_utc(*, chosen_date: date, chosen_time: time) -> datetime:
         tzinfo=MOSCOW_TZ,
     )
     return dt_msk.astimezone(UTC_TZ)
+
+
+@lru_cache(maxsize=16)
+def list_slot_minutes(policy: SchedulePolicy) -> tuple[int, ...]:
+    """Slot starts of ``policy`` as minutes since Moscow midnight."""
+    return tuple(
+        hour * 60 for hour in range(policy.start_hour, policy.end_hour_inclusive + 1)
+    )
+
+
+def minutes_to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minutes_to_time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+def hhmm_to_minutes(value: str) -> int:
+    parts = value.split(":")
+    if len(parts) != 2:
+        raise ValueError("invalid time format")
+    h, m = int(parts[0]), int(parts[1])
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError("invalid time format")
+    return h * 60 + m
+
+
+@lru_cache(maxsize=1024)
+def day_start_key(day: date) -> SlotKey:
+    """Slot key of Moscow midnight of ``day`` (Moscow has no DST transitions)."""
+    midnight = datetime(day.year, day.month, day.day, tzinfo=MOSCOW_TZ)
+    return int(midnight.timestamp()) // 60
+
+
+def slot_key(day: date, minutes: int) -> SlotKey:
+    return day_start_key(day) + minutes
+
+
+def slot_key_from_datetime(dt: datetime) -> SlotKey:
+    return int(dt.timestamp()) // 60
+
+
+def now_slot_key() -> SlotKey:
+    return slot_key_from_datetime(datetime.now(UTC_TZ))
+
+
+def slot_key_to_datetime(key: SlotKey) -> datetime:
+    return datetime.fromtimestamp(key * 60, UTC_TZ)
+
+
+def slot_key_to_msk(key: SlotKey) -> tuple[date, int]:
+    """Split a slot key into the Moscow date and minutes since midnight."""
+    dt_msk = slot_key_to_datetime(key).astimezone(MOSCOW_TZ)
+    return dt_msk.date(), dt_msk.hour * 60 + dt_msk.minute
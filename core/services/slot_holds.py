@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, WatchError
+
+from core.services.schedule import SlotKey
+
+logger = logging.getLogger(__name__)
+
+SLOT_HOLD_KEY_PREFIX = "slot_hold:"
+DEFAULT_SLOT_HOLD_TTL_SECONDS = 5 * 60
+
+
+def slot_hold_key(key: SlotKey) -> str:
+    return f"{SLOT_HOLD_KEY_PREFIX}{key}"
+
+
+@dataclass(frozen=True, slots=True)
+class SlotHolds:
+    """
+    Short-lived Redis leases on booking slots.
+
+    Picking a time takes a ``SET NX EX`` lease owned by the user; other users see
+    the slot as taken until the lease expires, is released, or becomes an order.
+    Contention is thus resolved in Redis before confirm reaches Postgres; the
+    unique ``start_at`` constraint stays the final guard. Redis errors are
+    logged and treated as "no hold" so booking keeps working without Redis.
+    """
+
+    redis: Redis
+    ttl_seconds: int = DEFAULT_SLOT_HOLD_TTL_SECONDS
+
+    async def acquire(self, *, key: SlotKey, holder: int) -> bool:
+        name = slot_hold_key(key)
+        try:
+            if await self.redis.set(name, str(holder), nx=True, ex=self.ttl_seconds):
+                return True
+            if await self.redis.get(name) == str(holder):
+                # Re-picking the same slot extends the user's own lease.
+                await self.redis.expire(name, self.ttl_seconds)
+                return True
+            return False
+        except RedisError:
+            logger.warning("Failed to acquire slot hold", extra={"slot_key": key})
+            return True
+
+    async def release(self, *, key: SlotKey, holder: int) -> None:
+        name = slot_hold_key(key)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                # Delete only our own lease; it may have expired and been retaken.
+                await pipe.watch(name)
+                if await pipe.get(name) != str(holder):
+                    await pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(name)
+                await pipe.execute()
+        except WatchError:
+            return
+        except RedisError:
+            logger.warning("Failed to release slot hold", extra={"slot_key": key})
+
+    async def held_by_others(
+        self, keys: Iterable[SlotKey], *, holder: int | None
+    ) -> set[SlotKey]:
+        keys = list(keys)
+        if not keys:
+            return set()
+        try:
+            owners = await self.redis.mget([slot_hold_key(k) for k in keys])
+        except RedisError:
+            logger.warning("Failed to read slot holds")
+            return set()
+        mine = str(holder) if holder is not None else None
+        return {
+            key
+            for key, owner in zip(keys, owners, strict=True)
+            if owner is not None and owner != mine
+        }
+
+
+__all__ = [
+    "DEFAULT_SLOT_HOLD_TTL_SECONDS",
+    "SLOT_HOLD_KEY_PREFIX",
+    "SlotHolds",
+    "slot_hold_key",
+]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from decimal import Decimal
+from time import monotonic
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.repositories import users as users_repo
+from core.repositories.users import UserRef
+
+
+class UserCache:
+    """
+    Per-process, bounded TTL cache of ``tg_id`` -> ``UserRef``.
+
+    Repeat users resolve without touching ``users``: booking passes the cached
+    id so the confirm statement skips its upsert (and ``remember``s the result),
+    and ``personal_discount`` reads the table only on a miss. Entries expire
+    after ``ttl_seconds``, which bounds how long a changed personal discount
+    can go unnoticed by other workers.
+    """
+
+    def __init__(self, *, ttl_seconds: float = 300.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, UserRef | None]] = OrderedDict()
+
+    def _lookup(self, tg_id: int) -> tuple[bool, UserRef | None]:
+        entry = self._entries.get(tg_id)
+        if entry is None:
+            return False, None
+        stored_at, ref = entry
+        if monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[tg_id]
+            return False, None
+        self._entries.move_to_end(tg_id)
+        return True, ref
+
+    def _store(self, tg_id: int, ref: UserRef | None) -> None:
+        self._entries[tg_id] = (monotonic(), ref)
+        self._entries.move_to_end(tg_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, tg_id: int) -> UserRef | None:
+        """Cached user, if known (no DB access)."""
+        return self._lookup(tg_id)[1]
+
+    def remember(self, tg_id: int, ref: UserRef) -> None:
+        self._store(tg_id, ref)
+
+    def forget(self, tg_id: int) -> None:
+        self._entries.pop(tg_id, None)
+
+    async def personal_discount(
+        self, *, session: AsyncSession, tg_id: int
+    ) -> Decimal | None:
+        hit, ref = self._lookup(tg_id)
+        if not hit:
+            ref = await users_repo.get_user_ref(session=session, tg_id=tg_id)
+            # Unknown users are cached too; booking replaces the entry
+            # once they book.
+            self._store(tg_id, ref)
+        return None if ref is None else ref.personal_discount
+
+
+__all__ = ["UserCache"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.repositories import styles as styles_repo
+from core.repositories import tattoos as tattoos_repo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEW_FLUSH_INTERVAL_SECONDS = 5.0
+
+
+class ViewCounters:
+    """
+    Per-process buffer of style and tattoo view increments.
+
+    Gallery taps only bump in-memory counters; ``run`` applies them every
+    ``interval_seconds`` as one ``UPDATE ... FROM (VALUES ...)`` per table in a
+    single transaction, instead of a row-locking UPDATE and commit per tap. A
+    failed flush keeps its counts for the next one; a crash loses at most one
+    interval of views.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_maker: async_sessionmaker[AsyncSession],
+        interval_seconds: float = DEFAULT_VIEW_FLUSH_INTERVAL_SECONDS,
+    ) -> None:
+        self._session_maker = session_maker
+        self.interval_seconds = interval_seconds
+        self._styles: Counter[int] = Counter()
+        self._tattoos: Counter[int] = Counter()
+
+    def add_style_view(self, style_id: int) -> None:
+        self._styles[style_id] += 1
+
+    def add_tattoo_view(self, tattoo_id: int) -> None:
+        self._tattoos[tattoo_id] += 1
+
+    def pending(self) -> int:
+        return self._styles.total() + self._tattoos.total()
+
+    async def flush(self) -> int:
+        """Write buffered views to Postgres; returns how many were written."""
+        if not self._styles and not self._tattoos:
+            return 0
+        styles, self._styles = self._styles, Counter()
+        tattoos, self._tattoos = self._tattoos, Counter()
+        try:
+            async with self._session_maker() as session, session.begin():
+                await styles_repo.add_style_views(session=session, deltas=styles)
+                await tattoos_repo.add_tattoo_views(session=session, deltas=tattoos)
+        except BaseException:
+            # Also on cancellation: the shutdown flush picks the counts up again.
+            self._styles.update(styles)
+            self._tattoos.update(tattoos)
+            raise
+        return styles.total() + tattoos.total()
+
+    async def run(self) -> None:
+        """Background loop flushing the buffer every ``interval_seconds``."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning(
+                    "View counter flush failed",
+                    extra={"pending": self.pending()},
+                    exc_info=True,
+                )
+
+
+__all__ = ["DEFAULT_VIEW_FLUSH_INTERVAL_SECONDS", "ViewCounters"]
@@ -7,9 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.repositories.pricing import get_active_pricing_config
 from core.repositories.tattoos import get_tattoo
+from core.services.catalog import CatalogStore
 from core.services.webapp_auth_service import WebAppIdentity
 
 _SELECTED_DESIGN_TEMPLATE = "user:{tg_id}:selected_design_id"
+SELECTED_DESIGN_KEY_PATTERN = _SELECTED_DESIGN_TEMPLATE.format(tg_id="*")
+SELECTED_DESIGN_TTL_SECONDS = 30 * 24 * 3600
 
 
 @dataclass(frozen=True, slots=True)
@@ -25,9 +28,15 @@ def selected_design_key(*, tg_id: int) -> str:
     return _SELECTED_DESIGN_TEMPLATE.format(tg_id=tg_id)
 
 
-async def set_selected_design(*, redis: Redis, tg_id: int, tattoo_id: int) -> None:
+async def set_selected_design(
+    *,
+    redis: Redis,
+    tg_id: int,
+    tattoo_id: int,
+    ttl_seconds: int = SELECTED_DESIGN_TTL_SECONDS,
+) -> None:
     key = selected_design_key(tg_id=tg_id)
-    await redis.set(key, str(tattoo_id))
+    await redis.set(key, str(tattoo_id), ex=ttl_seconds)
 
 
 async def get_selected_design_id(*, redis: Redis, tg_id: int) -> int | None:
@@ -46,11 +55,16 @@ async def build_webapp_context(
     session: AsyncSession,
     redis: Redis,
     identity: WebAppIdentity,
+    catalog: CatalogStore | None = None,
 ) -> WebAppContext:
     selected_design_id = await get_selected_design_id(redis=redis, tg_id=identity.tg_id)
     selected_design_name: str | None = None
     if selected_design_id is not None:
-        tattoo = await get_tattoo(session=session, tattoo_id=selected_design_id)
+        if catalog is not None:
+            snapshot = await catalog.current(session=session)
+            tattoo = snapshot.tattoo(selected_design_id)
+        else:
+            tattoo = await get_tattoo(session=session, tattoo_id=selected_design_id)
         if tattoo is None:
             selected_design_id = None
         else:
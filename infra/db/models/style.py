@@ -23,5 +23,8 @@ class Style(Base):
     )
     multiplyer: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
     views: Mapped[int] = mapped_column(Integer, default=0)
+    # Most viewed tattoo of the style (views desc, id asc), kept up to date by
+    # the tattoos repository so the gallery does not rank tattoos on every open.
+    top_tattoo_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     tattoos: Mapped[list[Tattoo]] = relationship("Tattoo", back_populates="style")
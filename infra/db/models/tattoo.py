@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infra.db.base import Base
@@ -14,6 +14,10 @@ if TYPE_CHECKING:
 
 class Tattoo(Base):
     __tablename__ = "tattoos"
+    __table_args__ = (
+        # Gallery order (views desc, id asc) per style; serves keyset pages.
+        Index("ix_tattoos_style_id_views_id", "style_id", desc("views"), "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(
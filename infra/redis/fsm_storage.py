@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Mapping
+from typing import Any, cast
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from aiogram.fsm.storage.redis import RedisEventIsolation
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+COMPACT_FSM_PREFIX = "f"
+LEGACY_FSM_PREFIX = "fsm"
+# Hash field holding the FSM state; data keys are identifiers, never "\0".
+STATE_FIELD = "\x00"
+
+
+def encode_value(value: Any) -> str:
+    """
+    Tagged compact encoding of one FSM data value.
+
+    Scalars (the bulk of the booking draft) take one tag char plus their text;
+    containers fall back to compact JSON.
+    """
+    if value is None:
+        return "n"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, int):
+        return f"i{value}"
+    if isinstance(value, str):
+        return f"s{value}"
+    if isinstance(value, float):
+        return f"d{value!r}"
+    return "j" + json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_value(raw: str) -> Any:
+    tag, body = raw[:1], raw[1:]
+    if tag == "s":
+        return body
+    if tag == "i":
+        return int(body)
+    if tag == "n":
+        return None
+    if tag == "t":
+        return True
+    if tag == "f":
+        return False
+    if tag == "d":
+        return float(body)
+    if tag == "j":
+        return json.loads(body)
+    raise ValueError(f"Unknown FSM value tag {tag!r}")
+
+
+def _decode_record(raw: Mapping[str, str]) -> tuple[str | None, dict[str, Any]]:
+    state = raw.get(STATE_FIELD)
+    data = {k: decode_value(v) for k, v in raw.items() if k != STATE_FIELD}
+    return state, data
+
+
+def _state_value(state: StateType) -> str | None:
+    return cast(str | None, state.state if isinstance(state, State) else state)
+
+
+class CompactRedisStorage(BaseStorage):
+    """
+    FSM storage keeping state and data of one context in a single Redis hash.
+
+    Layout: ``f:<chat_id>:<user_id>`` -> {``"\\0"``: state, <data key>: value}.
+    Values use ``encode_value`` instead of JSON of the whole dict, so
+    ``update_data`` writes only the fields passed (``HSET``) and the
+    unit-of-work middleware writes only changed/removed fields (``HSET``/
+    ``HDEL``) via ``save_record``; ``load_record`` is one ``HGETALL``.
+
+    With ``ttl_seconds`` every access refreshes the hash expiry, so abandoned
+    sessions disappear on their own.
+
+    Data written by the stock ``RedisStorage`` (``fsm:*:state``/``fsm:*:data``)
+    is moved over by ``migrate_legacy_keys``; until it has completed, a miss
+    falls back to the legacy keys.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key_builder: KeyBuilder | None = None,
+        legacy_key_builder: KeyBuilder | None = None,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.key_builder = key_builder or DefaultKeyBuilder(prefix=COMPACT_FSM_PREFIX)
+        self.legacy_key_builder = legacy_key_builder or DefaultKeyBuilder(
+            prefix=LEGACY_FSM_PREFIX
+        )
+        self.legacy_pending = True
+
+    def create_isolation(self, **kwargs: Any) -> RedisEventIsolation:
+        return RedisEventIsolation(
+            redis=self.redis, key_builder=self.key_builder, **kwargs
+        )
+
+    async def close(self) -> None:
+        await self.redis.aclose(close_connection_pool=True)
+
+    def _key(self, key: StorageKey) -> str:
+        return self.key_builder.build(key)
+
+    def _touch(self, pipe: Pipeline, name: str) -> None:
+        # Sliding expiry: every read or write of a context restarts its TTL.
+        if self.ttl_seconds:
+            pipe.expire(name, self.ttl_seconds)
+
+    async def load_record(self, key: StorageKey) -> tuple[str | None, dict[str, Any]]:
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(name)
+            self._touch(pipe, name)
+            raw = (await pipe.execute())[0]
+        if not raw and self.legacy_pending:
+            return await self._load_legacy(key)
+        return _decode_record(raw)
+
+    async def save_record(
+        self,
+        key: StorageKey,
+        *,
+        state: str | None,
+        data: Mapping[str, Any],
+        previous_data: Mapping[str, Any],
+        state_changed: bool,
+        data_changed: bool,
+    ) -> None:
+        name = self._key(key)
+        changed: dict[str, str] = {}
+        removed: list[str] = []
+        if data_changed:
+            for k, v in data.items():
+                encoded = encode_value(v)
+                # Compare encodings, not values: 1 == True but "i1" != "t".
+                if k not in previous_data or encode_value(previous_data[k]) != encoded:
+                    changed[k] = encoded
+            removed = [k for k in previous_data if k not in data]
+        if state_changed:
+            if state is None:
+                removed.append(STATE_FIELD)
+            else:
+                changed[STATE_FIELD] = state
+        if not changed and not removed:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if removed:
+                pipe.hdel(name, *removed)
+            if changed:
+                pipe.hset(name, mapping=changed)
+            self._touch(pipe, name)
+            await pipe.execute()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._ensure_migrated(key)
+        value = _state_value(state)
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if value is None:
+                pipe.hdel(name, STATE_FIELD)
+            else:
+                pipe.hset(name, STATE_FIELD, value)
+            self._touch(pipe, name)
+            await pipe.execute()
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state = await self.redis.hget(self._key(key), STATE_FIELD)
+        if state is None and self.legacy_pending:
+            state, _ = await self.load_record(key)
+        return cast(str | None, state)
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._ensure_migrated(key)
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # Replace all data fields but keep the state field.
+            await pipe.watch(name)
+            stale = [k for k in await pipe.hkeys(name) if k != STATE_FIELD]
+            pipe.multi()
+            if stale:
+                pipe.hdel(name, *stale)
+            if data:
+                pipe.hset(name, mapping={k: encode_value(v) for k, v in data.items()})
+            self._touch(pipe, name)
+            await pipe.execute()
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data = await self.load_record(key)
+        return data
+
+    async def get_value(
+        self, storage_key: StorageKey, dict_key: str, default: Any | None = None
+    ) -> Any | None:
+        raw = await self.redis.hget(self._key(storage_key), dict_key)
+        if raw is None:
+            if self.legacy_pending:
+                _, data = await self.load_record(storage_key)
+                return data.get(dict_key, default)
+            return default
+        return decode_value(raw)
+
+    async def update_data(
+        self, key: StorageKey, data: Mapping[str, Any]
+    ) -> dict[str, Any]:
+        if not data:
+            return await self.get_data(key)
+        await self._ensure_migrated(key)
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(name, mapping={k: encode_value(v) for k, v in data.items()})
+            pipe.hgetall(name)
+            self._touch(pipe, name)
+            raw = (await pipe.execute())[1]
+        return _decode_record(raw)[1]
+
+    async def _ensure_migrated(self, key: StorageKey) -> None:
+        # A partial write must not create the hash while legacy data still
+        # exists: the legacy record would then be shadowed and lost.
+        if self.legacy_pending and not await self.redis.exists(self._key(key)):
+            await self._load_legacy(key)
+
+    async def _load_legacy(self, key: StorageKey) -> tuple[str | None, dict[str, Any]]:
+        base = self.legacy_key_builder.build(key)
+        raw_state, raw_data = await self.redis.mget(
+            self.legacy_key_builder.build(key, "state"),
+            self.legacy_key_builder.build(key, "data"),
+        )
+        if raw_state is None and raw_data is None:
+            return None, {}
+        data = json.loads(raw_data) if raw_data is not None else {}
+        await self._move_record(
+            base=base, target=self._key(key), raw_state=raw_state, data=data
+        )
+        return raw_state, cast(dict[str, Any], data)
+
+    async def migrate_legacy_keys(self, *, batch_size: int = 500) -> int:
+        """
+        Move ``RedisStorage`` records into compact hashes; returns records moved.
+
+        Safe to run on several workers at once and alongside live traffic: a
+        record is written only if its hash does not exist yet, and the legacy
+        keys are deleted in the same MULTI.
+        """
+        legacy = self.legacy_key_builder
+        compact = self.key_builder
+        if not isinstance(legacy, DefaultKeyBuilder) or not isinstance(
+            compact, DefaultKeyBuilder
+        ):
+            self.legacy_pending = False
+            return 0
+
+        sep = legacy.separator
+        legacy_prefix = f"{legacy.prefix}{sep}"
+        moved = 0
+        seen: set[str] = set()
+        try:
+            async for name in self.redis.scan_iter(
+                match=f"{legacy_prefix}*", count=batch_size
+            ):
+                base, _, part = name.rpartition(sep)
+                if part not in ("state", "data") or base in seen:
+                    continue
+                seen.add(base)
+                raw_state, raw_data = await self.redis.mget(
+                    f"{base}{sep}state", f"{base}{sep}data"
+                )
+                data = json.loads(raw_data) if raw_data is not None else {}
+                target = f"{compact.prefix}{sep}{base[len(legacy_prefix):]}"
+                if await self._move_record(
+                    base=base, target=target, raw_state=raw_state, data=data
+                ):
+                    moved += 1
+        except RedisError:
+            logger.warning("FSM legacy key migration failed", extra={"moved": moved})
+            return moved
+        self.legacy_pending = False
+        logger.info("FSM legacy key migration finished", extra={"moved": moved})
+        return moved
+
+    async def _move_record(
+        self,
+        *,
+        base: str,
+        target: str,
+        raw_state: str | None,
+        data: Mapping[str, Any],
+    ) -> bool:
+        sep = self.legacy_key_builder.separator  # type: ignore[attr-defined]
+        fields = {k: encode_value(v) for k, v in data.items()}
+        if raw_state is not None:
+            fields[STATE_FIELD] = raw_state
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(target)
+                exists = await pipe.exists(target)
+                pipe.multi()
+                if fields and not exists:
+                    pipe.hset(target, mapping=fields)
+                    self._touch(pipe, target)
+                pipe.delete(f"{base}{sep}state", f"{base}{sep}data")
+                await pipe.execute()
+        except WatchError:
+            # The compact record was written concurrently; it wins.
+            return False
+        return bool(fields) and not exists
+
+
+__all__ = [
+    "COMPACT_FSM_PREFIX",
+    "LEGACY_FSM_PREFIX",
+    "CompactRedisStorage",
+    "decode_value",
+    "encode_value",
+]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60 * 60
+# Held by the worker running the current sweep; expires after one interval.
+SWEEP_LEASE_KEY = "lifecycle:sweep_lease"
+_SCAN_COUNT = 500
+
+
+@dataclass(frozen=True, slots=True)
+class KeyTtlPolicy:
+    """Keys matching ``pattern`` (Redis glob) must expire within ``ttl_seconds``."""
+
+    pattern: str
+    ttl_seconds: int
+
+
+@dataclass(frozen=True, slots=True)
+class PrefixUsage:
+    keys: int
+    bytes: int
+
+
+def key_prefix(key: str) -> str:
+    """Report bucket of a key: its first ``:``-separated segment."""
+    return key.split(":", 1)[0]
+
+
+async def apply_missing_ttls(
+    redis: Redis, policies: Sequence[KeyTtlPolicy], *, batch_size: int = _SCAN_COUNT
+) -> dict[str, int]:
+    """
+    Give keys without an expiry the TTL of their policy.
+
+    Live writers set TTLs themselves; this catches keys written before a policy
+    existed (or by code paths that forgot). Returns keys fixed per pattern.
+    """
+    fixed: dict[str, int] = {}
+    for policy in policies:
+        count = 0
+        batch: list[str] = []
+        async for key in redis.scan_iter(match=policy.pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                count += await _expire_persistent(redis, batch, policy.ttl_seconds)
+                batch = []
+        if batch:
+            count += await _expire_persistent(redis, batch, policy.ttl_seconds)
+        fixed[policy.pattern] = count
+    return fixed
+
+
+async def _expire_persistent(redis: Redis, keys: list[str], ttl_seconds: int) -> int:
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+        ttls = await pipe.execute()
+    # TTL -1: key exists without expiry (-2: already gone).
+    persistent = [key for key, ttl in zip(keys, ttls, strict=True) if ttl == -1]
+    if not persistent:
+        return 0
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in persistent:
+            pipe.expire(key, ttl_seconds)
+        await pipe.execute()
+    return len(persistent)
+
+
+async def memory_report(
+    redis: Redis, *, batch_size: int = _SCAN_COUNT
+) -> dict[str, PrefixUsage]:
+    """Key count and ``MEMORY USAGE`` bytes per key prefix (one full SCAN)."""
+    keys_by_prefix: dict[str, int] = {}
+    bytes_by_prefix: dict[str, int] = {}
+
+    async def account(batch: list[str]) -> None:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in batch:
+                pipe.memory_usage(key, samples=0)
+            sizes = await pipe.execute()
+        for key, size in zip(batch, sizes, strict=True):
+            prefix = key_prefix(key)
+            keys_by_prefix[prefix] = keys_by_prefix.get(prefix, 0) + 1
+            bytes_by_prefix[prefix] = bytes_by_prefix.get(prefix, 0) + int(size or 0)
+
+    batch: list[str] = []
+    async for key in redis.scan_iter(count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            await account(batch)
+            batch = []
+    if batch:
+        await account(batch)
+    return {
+        prefix: PrefixUsage(keys=count, bytes=bytes_by_prefix[prefix])
+        for prefix, count in sorted(keys_by_prefix.items())
+    }
+
+
+async def sweep_keys(
+    redis: Redis, policies: Sequence[KeyTtlPolicy], *, lease_seconds: int
+) -> bool:
+    """
+    Enforce TTL policies and log memory usage, if no other worker just did.
+
+    Every worker runs the sweeper, but the full-keyspace SCANs should happen
+    once per interval: the first worker to ``SET NX EX`` the lease sweeps, the
+    others return False until it expires.
+    """
+    if not await redis.set(SWEEP_LEASE_KEY, "1", nx=True, ex=lease_seconds):
+        return False
+    fixed = await apply_missing_ttls(redis, policies)
+    report = await memory_report(redis)
+    logger.info(
+        "Redis key sweep",
+        extra={
+            "ttl_fixed": fixed,
+            "keys": {p: u.keys for p, u in report.items()},
+            "bytes": {p: u.bytes for p, u in report.items()},
+        },
+    )
+    return True
+
+
+async def run_key_sweeper(
+    redis: Redis,
+    policies: Sequence[KeyTtlPolicy],
+    *,
+    interval_seconds: int = DEFAULT_SWEEP_INTERVAL_SECONDS,
+) -> None:
+    """Background loop calling ``sweep_keys`` every ``interval_seconds``."""
+    while True:
+        try:
+            await sweep_keys(redis, policies, lease_seconds=interval_seconds)
+        except RedisError:
+            logger.warning("Redis key sweep failed")
+        await asyncio.sleep(interval_seconds)
+
+
+__all__ = [
+    "DEFAULT_SWEEP_INTERVAL_SECONDS",
+    "SWEEP_LEASE_KEY",
+    "KeyTtlPolicy",
+    "PrefixUsage",
+    "apply_missing_ttls",
+    "key_prefix",
+    "memory_report",
+    "run_key_sweeper",
+    "sweep_keys",
+]
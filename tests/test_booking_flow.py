@@ -8,11 +8,15 @@ from core.services.booking_flow import (
     QUESTION_MESSAGE_ID_KEY,
     SUMMARY_MESSAGE_ID_KEY,
     build_summary_keyboard,
+    build_want_custom_sketch_keyboard,
+    encode_calendar_slot_for_callback,
     next_missing_step,
     parse_set_value,
+    question_for_step,
     render_summary,
     reset_booking_draft_data,
 )
+from core.services.schedule import slot_key
 
 
 def test_next_missing_step_empty() -> None:
@@ -118,6 +122,10 @@ def test_parse_set_value_validations() -> None:
     )
     assert parse_set_value(field="calendar_time", value="12:00", today=today) == "12:00"
     assert parse_set_value(field="calendar_time", value="1200", today=today) == "12:00"
+    slot_value = encode_calendar_slot_for_callback(slot_key(today, 14 * 60))
+    assert parse_set_value(field="calendar_time", value=slot_value, today=today) == (
+        "14:00"
+    )
 
     try:
         parse_set_value(field="body_part", value="bad", today=today)
@@ -136,3 +144,30 @@ def test_parse_set_value_validations() -> None:
         raise AssertionError("expected ValueError")
     except ValueError:
         pass
+
+
+def test_static_keyboards_are_prebuilt_and_copied() -> None:
+    first = build_want_custom_sketch_keyboard()
+    second = build_want_custom_sketch_keyboard()
+
+    # Shared buttons, independent markups.
+    assert first is not second
+    assert first.inline_keyboard[0][0] is second.inline_keyboard[0][0]
+    second.inline_keyboard = []
+    assert [b.text for b in first.inline_keyboard[0]] == ["Да", "Нет"]
+    assert first.inline_keyboard[0][0].callback_data == (
+        "booking:set:want_custom_sketch:1"
+    )
+
+    text, kb = question_for_step("confirm", today=date(2026, 2, 6))
+    assert text == "Проверьте сводку и подтвердите запись."
+    assert kb is not None
+    assert kb.inline_keyboard[0][0].callback_data == "booking:confirm::"
+
+
+def test_build_summary_keyboard_reuses_buttons_per_answered_set() -> None:
+    a = build_summary_keyboard({"body_part": "arm"})
+    b = build_summary_keyboard({"body_part": "leg"})
+
+    assert a.inline_keyboard[0][0] is b.inline_keyboard[0][0]
+    assert a.inline_keyboard[0][0].text == "Изменить: Часть тела"
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.repositories.orders import book_slot_stmt
+from core.repositories.users import UserRef
+from core.services.calendar_availability import CalendarAvailabilityService
+from core.services.schedule import SchedulePolicy, slot_key, today_msk
+from core.services.slot_holds import SlotHolds
+from core.services.user_cache import UserCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._store: dict[str, str] = {}
+
+    async def set(
+        self, key: str, value: str, nx: bool = False, ex: int | None = None
+    ) -> bool | None:
+        if nx and key in self._store:
+            return None
+        self._store[key] = value
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self._store.get(key)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return key in self._store
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [self._store.get(k) for k in keys]
+
+
+def _compiled_sql() -> str:
+    stmt = book_slot_stmt(
+        tg_id=42,
+        tg_nickname="nick",
+        day=date(2026, 2, 10),
+        slot_time=time(12, 0),
+        start_at=datetime(2026, 2, 10, 9, 0, tzinfo=UTC),
+    )
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+
+def test_book_slot_is_a_single_statement_with_all_guards() -> None:
+    sql = _compiled_sql()
+
+    assert sql.startswith("WITH booking_user AS (INSERT INTO users")
+    assert "ON CONFLICT (tg_id) DO UPDATE SET tg_nickname = excluded.tg_nickname" in sql
+    assert "INSERT INTO orders (user_id, start_at, created_at) SELECT" in sql
+    assert "NOT (EXISTS (SELECT * FROM day_off" in sql
+    assert "NOT (EXISTS (SELECT * FROM blocked_slot" in sql
+    assert "ON CONFLICT (start_at) DO NOTHING RETURNING orders.id" in sql
+
+
+class FakeBeginSession:
+    def __init__(self) -> None:
+        self.committed = False
+
+    def begin(self) -> FakeBeginSession:
+        return self
+
+    async def __aenter__(self) -> FakeBeginSession:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.committed = True
+
+
+@pytest.mark.asyncio
+async def test_persist_booking_returns_none_when_slot_unavailable(monkeypatch) -> None:
+    import core.services.booking_orders as booking_orders
+
+    calls: list[dict[str, Any]] = []
+
+    async def fake_book_slot(**kwargs: Any) -> int | None:
+        calls.append(kwargs)
+        return None
+
+    class FakeAvailability:
+        published = False
+
+        async def publish_order(self, *, day: date, slot_hhmm: str) -> None:
+            self.published = True
+
+    monkeypatch.setattr(booking_orders, "book_slot", fake_book_slot)
+    availability = FakeAvailability()
+
+    order_id = await booking_orders.persist_booking_as_order(
+        session=FakeBeginSession(),  # type: ignore[arg-type]
+        tg_id=42,
+        tg_nickname="nick",
+        calendar_date="2026-02-10",
+        calendar_time="12:00",
+        availability=availability,  # type: ignore[arg-type]
+    )
+
+    assert order_id is None
+    assert availability.published is False
+    assert calls[0]["slot_time"] == time(12, 0)
+    assert calls[0]["start_at"] == datetime(2026, 2, 10, 9, 0, tzinfo=UTC)
+    assert calls[0]["user_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_persist_booking_skips_upsert_for_cached_user(monkeypatch) -> None:
+    import core.services.booking_orders as booking_orders
+
+    calls: list[dict[str, Any]] = []
+
+    async def fake_book_slot(**kwargs: Any) -> tuple[int, UserRef]:
+        calls.append(kwargs)
+        return 99, UserRef(id=7, tg_nickname="nick", personal_discount=None)
+
+    monkeypatch.setattr(booking_orders, "book_slot", fake_book_slot)
+    users = UserCache()
+
+    for _ in range(2):
+        order_id = await booking_orders.persist_booking_as_order(
+            session=FakeBeginSession(),  # type: ignore[arg-type]
+            tg_id=42,
+            tg_nickname="nick",
+            calendar_date="2026-02-10",
+            calendar_time="12:00",
+            users=users,
+        )
+        assert order_id == 99
+
+    assert [call["user_id"] for call in calls] == [None, 7]
+
+
+@pytest.mark.asyncio
+async def test_is_slot_key_open_checks_policy_horizon_and_holds() -> None:
+    today = today_msk()
+    holds = SlotHolds(redis=FakeRedis())  # type: ignore[arg-type]
+    await holds.acquire(key=slot_key(today, 12 * 60), holder=1)
+    svc = CalendarAvailabilityService(
+        policy=SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=14),
+        holds=holds,
+    )
+
+    assert await svc.is_slot_key_open(slot_key(today, 12 * 60), holder=1)
+    assert not await svc.is_slot_key_open(slot_key(today, 12 * 60), holder=2)
+    assert await svc.is_slot_key_open(slot_key(today, 13 * 60), holder=2)
+    # Outside working hours / booking horizon.
+    assert not await svc.is_slot_key_open(slot_key(today, 9 * 60), holder=2)
+    assert not await svc.is_slot_key_open(
+        slot_key(date.fromordinal(today.toordinal() + 3), 13 * 60), holder=2
+    )
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from apps.bot.handlers.booking import _render_flow
+from core.services.booking_flow import (
+    QUESTION_MESSAGE_ID_KEY,
+    SUMMARY_MESSAGE_ID_KEY,
+    render_fingerprint,
+)
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.edits: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def edit_message_text(self, *, message_id: int, **_kwargs: Any) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.edits.append(message_id)
+
+
+def _message(bot: FakeBot) -> Any:
+    async def answer(*_args: Any, **_kwargs: Any) -> Any:
+        raise AssertionError("flow messages should be edited, not re-sent")
+
+    return SimpleNamespace(bot=bot, chat=SimpleNamespace(id=1), answer=answer)
+
+
+def test_render_fingerprint_tracks_text_and_keyboard() -> None:
+    kb = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="a", callback_data="x")]]
+    )
+    assert render_fingerprint("t", kb) == render_fingerprint("t", kb.model_copy())
+    assert render_fingerprint("t", kb) != render_fingerprint("t", None)
+    assert render_fingerprint("t", None) != render_fingerprint("u", None)
+
+
+@pytest.mark.asyncio
+async def test_render_flow_skips_unchanged_edits_and_runs_edits_concurrently() -> None:
+    bot = FakeBot()
+    state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=1, user_id=1))
+    await state.set_data({SUMMARY_MESSAGE_ID_KEY: 10, QUESTION_MESSAGE_ID_KEY: 11})
+    render = {
+        "message": _message(bot),
+        "state": state,
+        "step": "body_part",
+        "session": object(),
+        "service": object(),
+    }
+
+    await _render_flow(**render)
+    assert sorted(bot.edits) == [10, 11]
+    assert bot.max_in_flight == 2
+
+    bot.edits.clear()
+    await _render_flow(**render)
+    assert bot.edits == []
+
+    await state.update_data({"want_custom_sketch": True})
+    await _render_flow(**render)
+    # Only the summary changed.
+    assert bot.edits == [10]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from datetime import date, time
+from time import time as wall_time
+from typing import Any
 
 import pytest
 
@@ -116,3 +118,665 @@ async def test_get_disabled_dates_marks_day_off_and_fully_occupied_dates(
     svc = CalendarAvailabilityService(policy=policy)
     disabled = await svc.get_disabled_dates(session=object(), today=today)  # type: ignore[arg-type]
     assert disabled == {date(2026, 2, 10), date(2026, 2, 11), date(2026, 2, 12)}
+
+
+@pytest.mark.asyncio
+async def test_availability_index_serves_lookups_and_applies_writes(
+    monkeypatch,
+) -> None:
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.availability_index import AvailabilityIndex
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    calls: list[str] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        calls.append("day_off")
+        return {date(2026, 2, 11)}
+
+    async def fake_list_blocked_slots_between(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        calls.append("blocked")
+        return {today: {time(13, 0)}}
+
+    async def fake_list_orders_start_at_between(
+        *, session, start_at, end_at
+    ):  # noqa: ANN001
+        calls.append("orders")
+        return [compose_start_at_utc(chosen_date=today, chosen_time=time(12, 0))]
+
+    async def fail(**_kwargs):  # noqa: ANN003
+        raise AssertionError("per-day queries must not run when indexed")
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_between", fake_list_blocked_slots_between
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+    monkeypatch.setattr(exc_repo, "is_day_off", fail)
+    monkeypatch.setattr(exc_repo, "list_blocked_slots_for_date", fail)
+    monkeypatch.setattr("core.services.calendar_availability.today_msk", lambda: today)
+
+    index = AvailabilityIndex(policy=policy)
+    svc = CalendarAvailabilityService(policy=policy, index=index)
+    session: Any = object()
+
+    disabled = await svc.get_disabled_dates(session=session, today=today)
+    assert disabled == {today, date(2026, 2, 11)}
+    assert await svc.get_available_slots(session=session, day=date(2026, 2, 12)) == [
+        "12:00",
+        "13:00",
+    ]
+    assert calls == ["day_off", "blocked", "orders"]
+
+    index.apply_blocked_slot(day=today, slot_time=time(13, 0), is_blocked=False)
+    index.apply_day_off(day=date(2026, 2, 11), is_day_off=False)
+    index.apply_order(day=date(2026, 2, 12), slot_hhmm="13:00")
+
+    assert await svc.is_slot_available(session=session, day=today, slot_hhmm="13:00")
+    assert not await svc.is_slot_available(
+        session=session, day=date(2026, 2, 12), slot_hhmm="13:00"
+    )
+    assert await svc.get_disabled_dates(session=session, today=today) == set()
+    assert calls == ["day_off", "blocked", "orders"]
+
+
+def test_service_rejects_index_with_other_policy() -> None:
+    from core.services.availability_index import AvailabilityIndex
+
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    with pytest.raises(ValueError):
+        CalendarAvailabilityService(index=AvailabilityIndex(policy=policy))
+
+
+class _SnapshotRedis:
+    def __init__(self, data: dict[str, str]) -> None:
+        self.data = data
+
+    async def get(self, key: str) -> str | None:
+        return None
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.data)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[str | None]:
+        return [self.data.get(f) for f in fields]
+
+
+@pytest.mark.asyncio
+async def test_availability_cache_loads_snapshot_and_applies_remote_changes(
+    monkeypatch,
+) -> None:
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.calendar_availability import AvailabilityCache
+
+    async def fail(**_kwargs):  # noqa: ANN003
+        raise AssertionError("snapshot in Redis must be used instead of Postgres")
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fail)
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    redis = _SnapshotRedis(
+        {
+            "_horizon": "2026-02-10:2026-02-12",
+            "_built_at": f"{wall_time():.3f}",
+            "2026-02-10": "1,2,0",
+            "2026-02-11": "0,0,1",
+        }
+    )
+    cache = AvailabilityCache(redis=redis, policy=policy)  # type: ignore[arg-type]
+    session: Any = object()
+
+    await cache.ensure_loaded(session=session, today=today)
+    assert cache.disabled_dates(start=today, end=date(2026, 2, 12)) == {
+        today,
+        date(2026, 2, 11),
+    }
+
+    # Another worker booked 12:00 on 2026-02-12 and rewrote the day's field.
+    redis.data["2026-02-12"] = "1,0,0"
+    await cache.handle_invalidation("other|2026-02-12")
+    assert cache.available_slots(date(2026, 2, 12)) == ["13:00"]
+
+    # A snapshot rebuilt for another horizon invalidates the local copy.
+    redis.data["_horizon"] = "2026-02-11:2026-02-13"
+    await cache.handle_invalidation("other|2026-02-11")
+    assert not cache.is_fresh(today=today)
+
+
+class _WatchingRedis:
+    """Enough of redis-py's WATCH/MULTI pipeline to exercise ``_publish_change``."""
+
+    def __init__(self, data: dict[str, str]) -> None:
+        self.data = data
+        self.version = 0
+        self.published: list[str] = []
+        self.deleted = False
+        self.fail_publish = False
+        # Runs once between the WATCHed read and EXEC (another worker's write).
+        self.interleave: Any = None
+
+    def pipeline(self, transaction: bool = True) -> _WatchingPipeline:
+        return _WatchingPipeline(self)
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.data)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[str | None]:
+        return [self.data.get(field) for field in fields]
+
+    async def publish(self, channel: str, message: str) -> int:
+        if self.fail_publish:
+            from redis.exceptions import ConnectionError as RedisConnectionError
+
+            raise RedisConnectionError("down")
+        self.published.append(message)
+        return 1
+
+    async def delete(self, key: str) -> int:
+        self.deleted = True
+        self.data.clear()
+        return 1
+
+
+class _WatchingPipeline:
+    def __init__(self, redis: _WatchingRedis) -> None:
+        self.redis = redis
+        self.queued: list[Any] = []
+        self.watched: dict[str, str] | None = None
+
+    async def __aenter__(self) -> _WatchingPipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def watch(self, key: str) -> None:
+        self.watched = dict(self.redis.data)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[str | None]:
+        values = [self.redis.data.get(f) for f in fields]
+        if self.redis.interleave is not None:
+            interleave, self.redis.interleave = self.redis.interleave, None
+            interleave(self.redis.data)
+        return values
+
+    def multi(self) -> None:
+        self.queued = []
+
+    def hset(self, key: str, field: str, value: str) -> None:
+        self.queued.append(lambda: self.redis.data.__setitem__(field, value))
+
+    def incr(self, key: str) -> None:
+        self.queued.append(
+            lambda: setattr(self.redis, "version", self.redis.version + 1)
+        )
+
+    async def execute(self) -> list[Any]:
+        from redis.exceptions import WatchError
+
+        if self.watched != self.redis.data:
+            raise WatchError("changed")
+        for op in self.queued:
+            op()
+        return []
+
+
+def _loaded_cache(redis: _WatchingRedis, policy: SchedulePolicy | None = None) -> Any:
+    from core.services.calendar_availability import AvailabilityCache
+
+    if policy is None:
+        policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    return AvailabilityCache(redis=redis, policy=policy)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_publishes_on_one_day_are_merged_not_overwritten() -> None:
+    today = date(2026, 2, 10)
+    redis = _WatchingRedis(
+        {"_horizon": "2026-02-10:2026-02-12", "_built_at": f"{wall_time():.3f}"}
+    )
+    cache = _loaded_cache(redis)
+    await cache.ensure_loaded(session=object(), today=today)
+
+    # Another worker books 13:00 the same day before our 12:00 write commits.
+    redis.interleave = lambda data: data.__setitem__("2026-02-10", "2,0,0")
+    await cache.publish_order(day=today, slot_hhmm="12:00")
+
+    assert redis.data["2026-02-10"] == "3,0,0"
+    assert redis.version == 1
+    assert cache.available_slots(today) == []
+
+    await cache.publish_blocked_slot(day=today, slot_time=time(12), is_blocked=True)
+    assert redis.data["2026-02-10"] == "3,1,0"
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_drops_the_shared_snapshot() -> None:
+    today = date(2026, 2, 10)
+    redis = _WatchingRedis(
+        {"_horizon": "2026-02-10:2026-02-12", "_built_at": f"{wall_time():.3f}"}
+    )
+    cache = _loaded_cache(redis)
+    await cache.ensure_loaded(session=object(), today=today)
+    redis.fail_publish = True
+
+    await cache.publish_day_off(day=today, is_day_off=True)
+
+    assert redis.deleted
+    # The local copy still reflects the committed change.
+    assert cache.available_slots(today) == []
+
+
+@pytest.mark.asyncio
+async def test_stale_shared_snapshot_is_rebuilt_from_postgres(monkeypatch) -> None:
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.calendar_availability import AvailabilityCache
+
+    loads: list[date] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        loads.append(start_date)
+        return set()
+
+    async def fake_list_blocked_slots_between(**_kwargs):  # noqa: ANN003
+        return {}
+
+    async def fake_list_orders_start_at_between(**_kwargs):  # noqa: ANN003
+        return []
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_between", fake_list_blocked_slots_between
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    # Horizon matches, but the hash was built long ago and says 12:00 is booked.
+    redis = _SnapshotRedis(
+        {
+            "_horizon": "2026-02-10:2026-02-12",
+            "_built_at": f"{wall_time() - 3600:.3f}",
+            "2026-02-10": "1,0,0",
+        }
+    )
+    cache = AvailabilityCache(redis=redis, policy=policy)  # type: ignore[arg-type]
+
+    async def fake_store_snapshot(**_kwargs: Any) -> None:
+        return None
+
+    monkeypatch.setattr(cache, "_store_snapshot", fake_store_snapshot)
+
+    await cache.ensure_loaded(session=object(), today=today)
+
+    assert loads == [today]
+    assert cache.available_slots(today) == ["12:00", "13:00"]
+
+
+@pytest.mark.asyncio
+async def test_get_availability_range_fetches_once_per_session(monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.calendar_availability import forget_availability_memo
+
+    today = date(2026, 2, 10)
+    end = date(2026, 2, 12)
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    calls: list[str] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        calls.append("day_off")
+        return {date(2026, 2, 11)}
+
+    async def fake_list_blocked_slots_between(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        calls.append("blocked")
+        return {end: {time(13, 0)}}
+
+    async def fake_list_orders_start_at_between(
+        *, session, start_at, end_at
+    ):  # noqa: ANN001
+        calls.append("orders")
+        return [compose_start_at_utc(chosen_date=today, chosen_time=time(12, 0))]
+
+    async def fail(**_kwargs):  # noqa: ANN003
+        raise AssertionError("memoized day must not be queried again")
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_between", fake_list_blocked_slots_between
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+    monkeypatch.setattr(exc_repo, "is_day_off", fail)
+
+    svc = CalendarAvailabilityService(policy=policy)
+    session: Any = SimpleNamespace(info={})
+
+    availability = await svc.get_availability_range(
+        session=session, start=today, end=end
+    )
+    assert availability.slots_for(today) == ["13:00"]
+    assert availability.slots_for(end) == ["12:00"]
+    assert availability.disabled_dates == {date(2026, 2, 11)}
+
+    assert await svc.get_disabled_dates(session=session, today=today) == {
+        date(2026, 2, 11)
+    }
+    assert await svc.get_available_slots(session=session, day=end) == ["12:00"]
+    assert calls == ["day_off", "blocked", "orders"]
+
+    forget_availability_memo(session)
+    await svc.get_availability_range(session=session, start=today, end=today)
+    assert len(calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_get_disabled_dates_pushdown_runs_single_statement() -> None:
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import postgresql
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13)
+    statements: list[Any] = []
+
+    class _Session:
+        info: dict = {}
+
+        async def execute(self, stmt):  # noqa: ANN001
+            statements.append(stmt)
+            return SimpleNamespace(
+                scalars=lambda: SimpleNamespace(all=lambda: [date(2026, 2, 11)])
+            )
+
+    svc = CalendarAvailabilityService(policy=policy, pushdown_disabled_dates=True)
+    session: Any = _Session()
+    assert await svc.get_disabled_dates(session=session, today=today) == {
+        date(2026, 2, 11)
+    }
+    assert len(statements) == 1
+
+    sql = str(
+        statements[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert "generate_series(CAST('2026-02-10' AS DATE), CAST('2026-02-12'" in sql
+    assert "VALUES ('12:00:00'), ('13:00:00')" in sql
+    assert "FROM day_off" in sql
+    assert "FROM blocked_slot \n" in sql
+    assert "FROM orders \n" in sql
+    assert "timezone('Europe/Moscow', days.day + slots.slot_time)" in sql
+
+
+@pytest.mark.asyncio
+async def test_month_disabled_dates_prefetch_adjacent_month(monkeypatch) -> None:
+    import asyncio
+    import contextlib
+    from types import SimpleNamespace
+
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.month_cache import MonthCache
+
+    today = date(2026, 2, 20)
+    policy = SchedulePolicy(days_ahead=20, start_hour=12, end_hour_inclusive=12)
+    ranges: list[tuple[date, date]] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        ranges.append((start_date, end_date_inclusive))
+        return {date(2026, 2, 25), date(2026, 3, 5)}
+
+    async def fake_list_blocked_slots_between(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        return {}
+
+    async def fake_list_orders_start_at_between(
+        *, session, start_at, end_at
+    ):  # noqa: ANN001
+        return []
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_between", fake_list_blocked_slots_between
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+
+    @contextlib.asynccontextmanager
+    async def session_maker():  # noqa: ANN202
+        yield SimpleNamespace(info={})
+
+    months = MonthCache(session_maker=session_maker)  # type: ignore[arg-type]
+    svc = CalendarAvailabilityService(policy=policy, months=months)
+    session: Any = SimpleNamespace(info={})
+
+    february = await svc.get_month_disabled_dates(
+        session=session, today=today, year=2026, month=2
+    )
+    assert february == {date(2026, 2, 25)}
+    await asyncio.sleep(0)
+    # Only the visible part of February plus the prefetched, clipped March.
+    assert sorted(ranges) == [
+        (date(2026, 2, 20), date(2026, 2, 28)),
+        (date(2026, 3, 1), date(2026, 3, 12)),
+    ]
+
+    march = await svc.get_month_disabled_dates(
+        session=session, today=today, year=2026, month=3
+    )
+    assert march == {date(2026, 3, 5)}
+    assert len(ranges) == 2
+
+
+@pytest.mark.asyncio
+async def test_find_next_available_stops_at_first_free_slots(monkeypatch) -> None:
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+    import core.services.calendar_availability as availability_module
+    from core.services.schedule import slot_key
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(days_ahead=30, start_hour=12, end_hour_inclusive=13)
+    ranges: list[tuple[date, date]] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        ranges.append((start_date, end_date_inclusive))
+        # The first week is fully off.
+        return {date(2026, 2, d) for d in range(10, 17)}
+
+    async def fake_list_blocked_slots_between(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        return {date(2026, 2, 17): {time(12, 0)}}
+
+    async def fake_list_orders_start_at_between(
+        *, session, start_at, end_at
+    ):  # noqa: ANN001
+        return [
+            compose_start_at_utc(chosen_date=date(2026, 2, 18), chosen_time=time(12))
+        ]
+
+    monkeypatch.setattr(availability_module, "today_msk", lambda: today)
+    monkeypatch.setattr(
+        availability_module, "now_slot_key", lambda: slot_key(today, 9 * 60)
+    )
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_between", fake_list_blocked_slots_between
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+
+    svc = CalendarAvailabilityService(policy=policy)
+    session: Any = object()
+    found = await svc.find_next_available(session=session, from_day=today, count=2)
+
+    assert found == [
+        slot_key(date(2026, 2, 17), 13 * 60),
+        slot_key(date(2026, 2, 18), 13 * 60),
+    ]
+    # Two 7-day chunks were enough; the rest of the horizon was never read.
+    assert ranges == [
+        (date(2026, 2, 10), date(2026, 2, 16)),
+        (date(2026, 2, 17), date(2026, 2, 23)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_find_next_available_skips_slots_that_already_started(
+    monkeypatch,
+) -> None:
+    import core.services.calendar_availability as availability_module
+    from core.services.schedule import slot_key
+
+    today = date(2026, 2, 10)
+    policy = SchedulePolicy(
+        days_ahead=2, start_hour=12, end_hour_inclusive=15, lead_minutes=60
+    )
+    redis = _WatchingRedis(
+        {
+            "_horizon": "2026-02-10:2026-02-12",
+            "_built_at": f"{wall_time():.3f}",
+        }
+    )
+    cache = _loaded_cache(redis, policy=policy)
+    monkeypatch.setattr(availability_module, "today_msk", lambda: today)
+    # 13:10 Moscow: 12:00 and 13:00 are gone, 14:00 is inside the lead time.
+    monkeypatch.setattr(
+        availability_module, "now_slot_key", lambda: slot_key(today, 13 * 60 + 10)
+    )
+
+    svc = CalendarAvailabilityService(policy=policy, index=cache)
+    found = await svc.find_next_available(session=object(), from_day=today, count=2)
+
+    assert found == [
+        slot_key(today, 15 * 60),
+        slot_key(date(2026, 2, 11), 12 * 60),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rejected_booking_republishes_the_day_from_postgres(
+    monkeypatch,
+) -> None:
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+
+    async def fake_is_day_off(*, session, day):  # noqa: ANN001
+        return False
+
+    async def fake_list_blocked_slots_for_date(*, session, day):  # noqa: ANN001
+        return {time(12, 0)}
+
+    async def fake_list_orders_start_at_between(**_kwargs):  # noqa: ANN003
+        return []
+
+    monkeypatch.setattr(exc_repo, "is_day_off", fake_is_day_off)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_for_date", fake_list_blocked_slots_for_date
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+
+    today = date(2026, 2, 10)
+    redis = _WatchingRedis(
+        {
+            "_horizon": "2026-02-10:2026-02-12",
+            "_built_at": f"{wall_time():.3f}",
+            # Another worker's booking of 13:00 is already in the shared state.
+            "2026-02-10": "2,0,0",
+        }
+    )
+    cache = _loaded_cache(redis)
+    await cache.ensure_loaded(session=object(), today=today)
+
+    # 12:00 was rejected because an admin blocked it, not because it is booked.
+    await cache.publish_day_from_db(session=object(), day=today)
+
+    assert redis.data["2026-02-10"] == "2,1,0"
+    assert cache.day_state(today) == (2, 1, False)
+    assert redis.published == [f"{cache._origin}|2026-02-10"]
+
+
+@pytest.mark.asyncio
+async def test_admin_day_off_markers_follow_remote_changes(monkeypatch) -> None:
+    import contextlib
+    from types import SimpleNamespace
+
+    import apps.bot.handlers.admin_calendar as admin_calendar
+    import core.repositories.schedule_exceptions as exc_repo
+    from core.services.calendar_ui import CalendarView
+    from core.services.month_cache import MonthCache
+
+    day_off_dates: set[date] = set()
+    loads: list[date] = []
+
+    async def fake_list_day_off_dates(
+        *, session, start_date, end_date_inclusive
+    ):  # noqa: ANN001
+        loads.append(start_date)
+        return set(day_off_dates)
+
+    monkeypatch.setattr(exc_repo, "list_day_off_dates", fake_list_day_off_dates)
+
+    @contextlib.asynccontextmanager
+    async def session_maker():  # noqa: ANN202
+        yield SimpleNamespace(info={})
+
+    today = date(2026, 2, 10)
+    redis = _WatchingRedis(
+        {"_horizon": "2026-02-10:2026-02-12", "_built_at": f"{wall_time():.3f}"}
+    )
+    cache = _loaded_cache(redis)
+    months = MonthCache(session_maker=session_maker)  # type: ignore[arg-type]
+    view = CalendarView(year=2026, month=2)
+
+    async def render() -> None:
+        await admin_calendar._dayoff_calendar_kb(
+            session=object(),  # type: ignore[arg-type]
+            availability=cache,
+            months=months,
+            today=today,
+            view=view,
+        )
+
+    await render()
+    await render()
+    assert loads.count(date(2026, 2, 1)) == 1
+
+    # Another worker marks a day off and announces it.
+    day_off_dates.add(date(2026, 2, 11))
+    redis.data["2026-02-11"] = "0,0,1"
+    await cache.handle_invalidation("other|2026-02-11")
+    await render()
+    assert loads.count(date(2026, 2, 1)) == 2
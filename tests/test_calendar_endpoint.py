@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import importlib
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+from aiogram import Dispatcher
+from fastapi.testclient import TestClient
+
+from apps.app.routes import deps as deps_module
+from core.services.calendar_availability import AvailabilityCache
+from core.services.schedule import SchedulePolicy, today_msk
+
+
+class DummySession:
+    async def close(self) -> None:
+        return None
+
+
+class DummyBot:
+    def __init__(self) -> None:
+        self.session = DummySession()
+        self.set_webhook = AsyncMock()
+        self.delete_webhook = AsyncMock()
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, str]] = []
+
+    async def __aenter__(self) -> FakePipeline:
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        return None
+
+    def get(self, key: str) -> None:
+        self._ops.append(("get", key))
+
+    def hgetall(self, key: str) -> None:
+        self._ops.append(("hgetall", key))
+
+    async def execute(self) -> list:
+        self._redis.reads += 1
+        return [
+            self._redis.data.get(key) if op == "get" else dict(self._redis.hashes[key])
+            for op, key in self._ops
+        ]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.reads = 0
+
+    async def get(self, key: str) -> str | None:
+        self.reads += 1
+        return self.data.get(key)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+def _set_env(monkeypatch) -> None:
+    monkeypatch.setenv("APP_ENV", "dev")
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("BOT_TOKEN", "123456:ABCDEF")
+    monkeypatch.setenv("MINI_APP_URL", "https://example.com/miniapp")
+    monkeypatch.setenv("ADMIN_USER_IDS", "123")
+    monkeypatch.setenv("WEBHOOK_URL", "https://example.com")
+    monkeypatch.setenv("WEBHOOK_PATH", "/tg/webhook")
+    monkeypatch.setenv("WEBHOOK_SECRET_TOKEN", "secret")
+    monkeypatch.setenv("API_HOST", "0.0.0.0")
+    monkeypatch.setenv("API_PORT", "8000")
+    monkeypatch.setenv("DB_NAME", "app")
+    monkeypatch.setenv("DB_USER", "postgres")
+    monkeypatch.setenv("DB_PASSWORD", "postgres")
+    monkeypatch.setenv("DB_HOST", "localhost")
+    monkeypatch.setenv("DB_PORT", "5432")
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def _build_app(monkeypatch):
+    _set_env(monkeypatch)
+    module = importlib.import_module("apps.app.main")
+
+    dispatcher = Dispatcher()
+    dispatcher.feed_update = AsyncMock()
+
+    monkeypatch.setattr(module, "create_bot", lambda _settings: DummyBot())
+    monkeypatch.setattr(module, "create_dispatcher", lambda **_kwargs: dispatcher)
+
+    async def fake_start_polling(*_args, **_kwargs) -> None:
+        return None
+
+    monkeypatch.setattr(module, "start_polling", fake_start_polling)
+
+    return module.create_app()
+
+
+def test_calendar_availability_bitmap_etag_and_304(monkeypatch) -> None:
+    app = _build_app(monkeypatch)
+
+    today = today_msk()
+    tomorrow = today + timedelta(days=1)
+    redis = FakeRedis()
+    redis.data["availability:version"] = "7"
+    redis.hashes["availability:days"] = {
+        "_horizon": f"{today.isoformat()}:{(today + timedelta(days=2)).isoformat()}",
+        "_built_at": f"{time.time():.3f}",
+        today.isoformat(): "1,0,0",
+        tomorrow.isoformat(): "0,0,1",
+    }
+    cache = AvailabilityCache(
+        redis=redis,  # type: ignore[arg-type]
+        policy=SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=13),
+    )
+
+    async def _session_override():
+        # Opening a session is lazy; any query through it would fail here.
+        yield object()
+
+    app.dependency_overrides[deps_module.get_availability_cache] = lambda: cache
+    app.dependency_overrides[deps_module.get_session] = _session_override
+
+    client = TestClient(app)
+    response = client.get("/api/calendar/availability")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "version": 7,
+        "from": today.isoformat(),
+        "to": (today + timedelta(days=2)).isoformat(),
+        "slots": ["12:00", "13:00"],
+        "free": [0b10, 0, 0b11],
+    }
+    assert response.headers["cache-control"].startswith("public")
+    etag = response.headers["etag"]
+
+    reads = redis.reads
+    cached = client.get("/api/calendar/availability", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert redis.reads == reads + 1
+
+    redis.data["availability:version"] = "8"
+    changed = client.get("/api/calendar/availability", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import date
+
+from core.services.calendar_ui import (
+    CalendarView,
+    build_calendar_keyboard,
+    calendar_keyboard_cache_info,
+    clear_calendar_keyboard_cache,
+)
+
+
+def test_calendar_keyboard_is_memoised_per_visible_inputs() -> None:
+    clear_calendar_keyboard_cache()
+    today = date(2026, 2, 10)
+    view = CalendarView(year=2026, month=2)
+
+    first = build_calendar_keyboard(
+        today=today, view=view, disabled_dates={date(2026, 2, 12)}
+    )
+    # Dates outside the displayed month do not change the keyboard.
+    second = build_calendar_keyboard(
+        today=today,
+        view=view,
+        disabled_dates={date(2026, 2, 12), date(2026, 3, 1)},
+    )
+    hits, misses, size, _ = calendar_keyboard_cache_info()
+    assert (hits, misses, size) == (1, 1, 1)
+    assert first == second
+    # Callers get their own markup object and may swap rows freely.
+    assert first is not second
+    second.inline_keyboard = [*second.inline_keyboard, []]
+    assert len(first.inline_keyboard) != len(second.inline_keyboard)
+
+    other = build_calendar_keyboard(
+        today=today, view=view, disabled_dates={date(2026, 2, 13)}
+    )
+    assert other != first
+    assert calendar_keyboard_cache_info()[1] == 2
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiogram import F
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+from apps.bot.handlers.gallery import GalleryCb
+from core.services.booking_flow import BookingCb
+from core.services.calendar_ui import CalendarCb
+from core.services.callback_codec import CompiledCallbackCodec
+
+
+class FlagCb(CompiledCallbackCodec, CallbackData, prefix="flag"):
+    on: bool
+    note: str | None = None
+
+
+@pytest.mark.parametrize(
+    "cb",
+    [
+        CalendarCb(action="day", year=2026, month=2, day=14),
+        CalendarCb(action="noop", year=2026, month=2),
+        BookingCb(action="set", field="calendar_time", value="29489520"),
+        BookingCb(action="menu"),
+        GalleryCb(action="page", style_id=3, views=120, ref_id=45, seek="a", pos=8),
+        FlagCb(on=True),
+        FlagCb(on=False, note="x"),
+    ],
+)
+def test_compiled_codec_is_wire_compatible(cb: CallbackData) -> None:
+    cls = type(cb)
+    wire = CallbackData.pack(cb)
+    assert cb.pack() == wire
+
+    decoded = cls.unpack(wire)
+    assert decoded == CallbackData.unpack.__func__(cls, wire)  # type: ignore[attr-defined]
+    assert decoded == cb
+
+
+def test_compiled_codec_rejects_like_generic() -> None:
+    for bad in ("cal:day:abc:2:", "cal:day:2026", "x:noop:2026:2:"):
+        with pytest.raises((TypeError, ValueError)):
+            CalendarCb.unpack(bad)
+    with pytest.raises(ValueError):
+        BookingCb(action="set", value="a:b").pack()
+
+
+def _query(data: str) -> Any:
+    return CallbackQuery.model_construct(
+        id="1", from_user=SimpleNamespace(id=1), chat_instance="c", data=data
+    )
+
+
+@pytest.mark.asyncio
+async def test_filter_uses_compiled_unpack() -> None:
+    flt = CalendarCb.filter(F.action == "day")
+
+    assert await flt(_query("cal:day:2026:2:14")) == {
+        "callback_data": CalendarCb(action="day", year=2026, month=2, day=14)
+    }
+    assert await flt(_query("cal:noop:2026:2:")) is False
+    assert await flt(_query("gallery:page:3::2")) is False
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import core.repositories.styles as styles_repo
+import core.repositories.tattoos as tattoos_repo
+from core.services.catalog import (
+    CATALOG_CHANNEL,
+    CATALOG_VERSION_KEY,
+    CatalogSnapshot,
+    CatalogStore,
+)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._store: dict[str, str] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key: str) -> str | None:
+        return self._store.get(key)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._store.get(key, "0")) + 1
+        self._store[key] = str(value)
+        return value
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 1
+
+
+def _style(id: int, name: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id, name=name, multiplyer=Decimal("1.20"), top_tattoo_id=None
+    )
+
+
+def _tattoo(id: int, name: str, style_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id, name=name, style_id=style_id, price=None, views=3, photo_file_id=None
+    )
+
+
+class FakeDb:
+    def __init__(self) -> None:
+        self.styles = [_style(2, "Лайн"), _style(1, "Блэкворк")]
+        self.tattoos = [_tattoo(10, "Дракон", 1)]
+        self.loads = 0
+
+    def install(self, monkeypatch) -> None:
+        async def fake_list_styles(*, session):  # noqa: ANN001
+            self.loads += 1
+            return list(self.styles)
+
+        async def fake_list_tattoos(*, session):  # noqa: ANN001
+            return list(self.tattoos)
+
+        monkeypatch.setattr(styles_repo, "list_styles", fake_list_styles)
+        monkeypatch.setattr(tattoos_repo, "list_tattoos", fake_list_tattoos)
+
+
+def test_snapshot_indexes_records_by_id_and_name() -> None:
+    db = FakeDb()
+    snapshot = CatalogSnapshot.build(version=4, styles=db.styles, tattoos=db.tattoos)
+
+    assert [s.name for s in snapshot.styles] == ["Блэкворк", "Лайн"]
+    assert snapshot.style(2) is snapshot.styles_by_name["Лайн"]
+    assert snapshot.tattoo(10) is snapshot.tattoos_by_name["Дракон"]
+    assert snapshot.tattoo(11) is None
+    assert not hasattr(snapshot.tattoo(10), "__dict__")
+    with pytest.raises(TypeError):
+        snapshot.styles_by_id[3] = snapshot.styles[0]  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_memory_until_a_change(monkeypatch) -> None:
+    db = FakeDb()
+    db.install(monkeypatch)
+    redis = FakeRedis()
+    store = CatalogStore(redis=redis)  # type: ignore[arg-type]
+    session: Any = object()
+
+    first = await store.current(session=session)
+    assert await store.current(session=session) is first
+    assert db.loads == 1
+
+    db.tattoos.append(_tattoo(11, "Карп", 2))
+    published = await store.publish_change(session=session)
+
+    assert redis._store[CATALOG_VERSION_KEY] == "1"
+    assert redis.published == [(CATALOG_CHANNEL, "1")]
+    assert published.version == 1
+    assert published.tattoo(11) is not None
+    assert first.tattoo(11) is None
+    assert await store.current(session=session) is published
+
+
+@pytest.mark.asyncio
+async def test_newer_version_from_another_worker_triggers_reload(monkeypatch) -> None:
+    db = FakeDb()
+    db.install(monkeypatch)
+    redis = FakeRedis()
+    store = CatalogStore(redis=redis)  # type: ignore[arg-type]
+    session: Any = object()
+
+    await store.current(session=session)
+    # Stale or garbled announcements are ignored.
+    store.handle_invalidation("0")
+    store.handle_invalidation("oops")
+    await store.current(session=session)
+    assert db.loads == 1
+
+    await redis.incr(CATALOG_VERSION_KEY)
+    store.handle_invalidation("1")
+    snapshot = await store.current(session=session)
+    assert db.loads == 2
+    assert snapshot.version == 1
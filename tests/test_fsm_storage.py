@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from infra.redis.fsm_storage import CompactRedisStorage, decode_value, encode_value
+
+_PIPELINED = {"hset", "hdel", "hgetall", "delete", "expire"}
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self._buffered = False
+
+    async def __aenter__(self) -> FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def watch(self, *_keys: str) -> None:
+        return None
+
+    def multi(self) -> None:
+        self._buffered = True
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._redis, name)
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if self._buffered or name in _PIPELINED:
+                self._ops.append((name, args, kwargs))
+                return None
+            return method(*args, **kwargs)
+
+        return call
+
+    async def execute(self) -> list[Any]:
+        self._redis.writes += 1
+        return [await getattr(self._redis, n)(*a, **kw) for n, a, kw in self._ops]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.strings: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.writes = 0
+        self.hset_fields: list[str] = []
+        self.ttl: dict[str, int] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def hgetall(self, name: str) -> dict[str, str]:
+        return dict(self.hashes.get(name, {}))
+
+    async def hget(self, name: str, field: str) -> str | None:
+        return self.hashes.get(name, {}).get(field)
+
+    async def hkeys(self, name: str) -> list[str]:
+        return list(self.hashes.get(name, {}))
+
+    async def hset(
+        self, name: str, key: str | None = None, value: str | None = None, mapping=None
+    ) -> int:
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        self.hset_fields.extend(fields)
+        self.hashes.setdefault(name, {}).update(fields)
+        return len(fields)
+
+    async def hdel(self, name: str, *fields: str) -> int:
+        bucket = self.hashes.get(name, {})
+        for f in fields:
+            bucket.pop(f, None)
+        if not bucket:
+            self.hashes.pop(name, None)
+        return len(fields)
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        if name not in self.hashes:
+            return False
+        self.ttl[name] = seconds
+        return True
+
+    async def exists(self, name: str) -> int:
+        return int(name in self.hashes or name in self.strings)
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        return [self.strings.get(k) for k in keys]
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.strings.pop(k, None) is not None for k in keys)
+
+    async def scan_iter(self, match: str, count: int = 10):
+        prefix = match.rstrip("*")
+        for key in list(self.strings):
+            if key.startswith(prefix):
+                yield key
+
+
+KEY = StorageKey(bot_id=1, chat_id=7, user_id=7)
+
+
+def test_value_encoding_roundtrip() -> None:
+    for value in (None, True, False, 0, -12, "", "a:b", 1.5, [1, "x"], {"k": None}):
+        encoded = encode_value(value)
+        assert decode_value(encoded) == value
+        assert type(decode_value(encoded)) is type(value)
+    assert encode_value(29489520) == "i29489520"
+
+
+@pytest.mark.asyncio
+async def test_state_and_data_share_one_hash_and_writes_are_field_level() -> None:
+    redis = FakeRedis()
+    storage = CompactRedisStorage(redis=redis)  # type: ignore[arg-type]
+    storage.legacy_pending = False
+
+    await storage.set_state(KEY, "BookingStates:date")
+    await storage.set_data(KEY, {"calendar_date": "2026-02-10", "flag": False})
+    assert await storage.get_state(KEY) == "BookingStates:date"
+    assert set(redis.hashes) == {"f:7:7"}
+
+    redis.hset_fields.clear()
+    merged = await storage.update_data(KEY, {"flag": True})
+    assert merged == {"calendar_date": "2026-02-10", "flag": True}
+    assert redis.hset_fields == ["flag"]
+
+    redis.hset_fields.clear()
+    state, data = await storage.load_record(KEY)
+    await storage.save_record(
+        KEY,
+        state=state,
+        data={"flag": 1},
+        previous_data=data,
+        state_changed=False,
+        data_changed=True,
+    )
+    # Only the changed field is sent; removed fields are deleted.
+    assert redis.hset_fields == ["flag"]
+    assert await storage.load_record(KEY) == ("BookingStates:date", {"flag": 1})
+
+    await storage.set_data(KEY, {})
+    assert await storage.get_state(KEY) == "BookingStates:date"
+    assert await storage.get_data(KEY) == {}
+
+
+@pytest.mark.asyncio
+async def test_legacy_keys_are_migrated_lazily_and_in_bulk() -> None:
+    redis = FakeRedis()
+    redis.strings["fsm:7:7:state"] = "BookingStates:time"
+    redis.strings["fsm:7:7:data"] = json.dumps({"calendar_date": "2026-02-10"})
+    redis.strings["fsm:8:8:data"] = json.dumps({"page": 2})
+    storage = CompactRedisStorage(redis=redis)  # type: ignore[arg-type]
+
+    # A partial write during the migration window keeps the legacy fields.
+    await storage.update_data(KEY, {"calendar_time": "12:00"})
+    assert await storage.load_record(KEY) == (
+        "BookingStates:time",
+        {"calendar_date": "2026-02-10", "calendar_time": "12:00"},
+    )
+    assert "fsm:7:7:state" not in redis.strings
+
+    assert await storage.migrate_legacy_keys() == 1
+    assert storage.legacy_pending is False
+    assert redis.strings == {}
+    assert await storage.get_data(StorageKey(bot_id=1, chat_id=8, user_id=8)) == {
+        "page": 2
+    }
+
+
+@pytest.mark.asyncio
+async def test_ttl_slides_on_every_access() -> None:
+    redis = FakeRedis()
+    storage = CompactRedisStorage(redis=redis, ttl_seconds=60)  # type: ignore[arg-type]
+    storage.legacy_pending = False
+
+    await storage.update_data(KEY, {"a": 1})
+    assert redis.ttl == {"f:7:7": 60}
+
+    redis.ttl.clear()
+    await storage.load_record(KEY)
+    assert redis.ttl == {"f:7:7": 60}
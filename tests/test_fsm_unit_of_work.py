@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiogram.dispatcher.middlewares.user_context import EVENT_CONTEXT_KEY, EventContext
+from aiogram.fsm.storage.memory import DisabledEventIsolation
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import Chat, User
+
+from apps.bot.middlewares.fsm_unit_of_work import UnitOfWorkFSMMiddleware, flush_fsm
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self._ops.append(("set", (key, value)))
+
+    def delete(self, key: str) -> None:
+        self._ops.append(("delete", (key,)))
+
+    async def execute(self) -> list[Any]:
+        self._redis.round_trips += 1
+        for op, args in self._ops:
+            if op == "set":
+                self._redis.store[args[0]] = args[1]
+            else:
+                self._redis.store.pop(args[0], None)
+        return [True] * len(self._ops)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.round_trips = 0
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        self.round_trips += 1
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+def _middleware(redis: FakeRedis) -> UnitOfWorkFSMMiddleware:
+    return UnitOfWorkFSMMiddleware(
+        storage=RedisStorage(redis=redis),  # type: ignore[arg-type]
+        events_isolation=DisabledEventIsolation(),
+    )
+
+
+def _data() -> dict[str, Any]:
+    user = User(id=7, is_bot=False, first_name="u")
+    return {
+        "bot": SimpleNamespace(id=1),
+        EVENT_CONTEXT_KEY: EventContext(chat=Chat(id=7, type="private"), user=user),
+    }
+
+
+@pytest.mark.asyncio
+async def test_one_read_and_one_write_per_update() -> None:
+    redis = FakeRedis()
+    middleware = _middleware(redis)
+
+    async def handler(_event: Any, data: dict[str, Any]) -> None:
+        state = data["state"]
+        assert data["raw_state"] is None
+        await state.set_state("BookingStates:date")
+        await state.update_data({"a": 1})
+        payload = await state.get_data()
+        payload["b"] = 2
+        await state.set_data(payload)
+        assert await state.get_data() == {"a": 1, "b": 2}
+
+    await middleware(handler, object(), _data())
+    assert redis.round_trips == 2
+    assert redis.store["fsm:7:7:state"] == "BookingStates:date"
+
+    async def read_only(_event: Any, data: dict[str, Any]) -> None:
+        assert data["raw_state"] == "BookingStates:date"
+        assert await data["state"].get_data() == {"a": 1, "b": 2}
+        # Same value: nothing to write.
+        await data["state"].update_data({"a": 1})
+
+    await middleware(read_only, object(), _data())
+    assert redis.round_trips == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_fsm_writes_before_handler_ends_and_on_error() -> None:
+    redis = FakeRedis()
+    middleware = _middleware(redis)
+
+    async def handler(_event: Any, data: dict[str, Any]) -> None:
+        await data["state"].update_data({"confirm_in_flight": True})
+        await flush_fsm(data["state"])
+        assert '"confirm_in_flight": true' in redis.store["fsm:7:7:data"]
+        await data["state"].update_data({"confirm_in_flight": False})
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await middleware(handler, object(), _data())
+    assert '"confirm_in_flight": false' in redis.store["fsm:7:7:data"]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+import core.services.gallery_cache as gallery_cache_module
+from core.services.catalog import CATALOG_VERSION_KEY
+from core.services.gallery_cache import GalleryCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._store: dict[str, str] = {}
+        self.down = False
+
+    async def get(self, key: str) -> str | None:
+        if self.down:
+            raise RedisConnectionError("down")
+        return self._store.get(key)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._store.get(key, "0")) + 1
+        self._store[key] = str(value)
+        return value
+
+
+class Renderer:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> tuple[str, int]:
+        self.calls += 1
+        return "page", self.calls
+
+
+@pytest.mark.asyncio
+async def test_renders_are_shared_until_catalog_version_changes() -> None:
+    redis = FakeRedis()
+    cache = GalleryCache(redis=redis)  # type: ignore[arg-type]
+    render = Renderer()
+
+    assert await cache.get(("style", 1), render) == ("page", 1)
+    assert await cache.get(("style", 1), render) == ("page", 1)
+    assert await cache.get(("style", 2), render) == ("page", 2)
+
+    # Another worker added a tattoo.
+    await redis.incr(CATALOG_VERSION_KEY)
+    assert await cache.get(("style", 1), render) == ("page", 3)
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(gallery_cache_module, "monotonic", lambda: now[0])
+    cache = GalleryCache(redis=FakeRedis(), ttl_seconds=30)  # type: ignore[arg-type]
+    render = Renderer()
+
+    await cache.get(("styles",), render)
+    now[0] += 29
+    await cache.get(("styles",), render)
+    now[0] += 1
+    await cache.get(("styles",), render)
+
+    assert render.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_renders_uncached_when_redis_is_down() -> None:
+    redis = FakeRedis()
+    cache = GalleryCache(redis=redis)  # type: ignore[arg-type]
+    render = Renderer()
+    redis.down = True
+
+    await cache.get(("styles",), render)
+    await cache.get(("styles",), render)
+
+    assert render.calls == 2
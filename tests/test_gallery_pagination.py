@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import apps.bot.handlers.gallery as gallery
+from apps.bot.handlers.gallery import GalleryCb
+from core.repositories.tattoos import list_tattoos_by_style
+from core.services.catalog import StyleRecord
+
+# 20 tattoos in gallery order: views desc, id asc (with ties on views).
+TATTOOS = sorted(
+    (SimpleNamespace(id=i, name=f"t{i}", views=100 - i // 3) for i in range(1, 21)),
+    key=lambda t: (-t.views, t.id),
+)
+STYLE = StyleRecord(id=1, name="Лайн", multiplyer=None, top_tattoo_id=1)
+
+
+def _install_fakes(monkeypatch) -> None:
+    async def fake_list(
+        *, session, style_id, limit, cursor=None, before=False, inclusive=False
+    ):  # noqa: ANN001
+        if cursor is None:
+            return TATTOOS[:limit]
+        key = (-cursor[0], cursor[1])
+        keys = [(-t.views, t.id) for t in TATTOOS]
+        if before:
+            rows = [t for t, k in zip(TATTOOS, keys, strict=True) if k < key]
+            return rows[-limit:]
+        rows = [
+            t
+            for t, k in zip(TATTOOS, keys, strict=True)
+            if k > key or (inclusive and k == key)
+        ]
+        return rows[:limit]
+
+    monkeypatch.setattr(gallery, "list_tattoos_by_style", fake_list)
+
+
+def _nav(kb: Any) -> dict[str, GalleryCb]:
+    buttons = [b for row in kb.inline_keyboard for b in row]
+    return {
+        b.text: GalleryCb.unpack(b.callback_data)
+        for b in buttons
+        if b.text in {"« Назад", "Дальше »"}
+    }
+
+
+async def _open(cb: GalleryCb) -> tuple[str, Any]:
+    cursor = None if cb.views is None else (cb.views, cb.ref_id)
+    return await gallery._render_style_page(
+        session=object(),
+        style=STYLE,
+        cursor=cursor,
+        seek=cb.seek or "a",
+        pos=cb.pos or 0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_walk_forward_and_back(monkeypatch) -> None:
+    _install_fakes(monkeypatch)
+
+    text, kb = await gallery._render_style_page(session=object(), style=STYLE)
+    assert "1. t1 — 100 views" in text
+    assert set(_nav(kb)) == {"Дальше »"}
+
+    text, kb = await _open(_nav(kb)["Дальше »"])
+    assert "9. t9 — 97 views" in text
+    assert "16. t16 — 95 views" in text
+    assert set(_nav(kb)) == {"« Назад", "Дальше »"}
+    second_page_kb = kb
+
+    text, kb = await _open(_nav(kb)["Дальше »"])
+    assert "17. t17 — 95 views" in text
+    assert "20. t20 — 94 views" in text
+    assert set(_nav(kb)) == {"« Назад"}
+
+    text, kb = await _open(_nav(kb)["« Назад"])
+    assert [b.text for row in kb.inline_keyboard for b in row] == [
+        b.text for row in second_page_kb.inline_keyboard for b in row
+    ]
+    assert "9. t9 — 97 views" in text
+
+    text, kb = await _open(_nav(kb)["« Назад"])
+    assert "1. t1 — 100 views" in text
+    assert set(_nav(kb)) == {"Дальше »"}
+
+
+@pytest.mark.asyncio
+async def test_tattoo_card_returns_to_its_page(monkeypatch) -> None:
+    _install_fakes(monkeypatch)
+    _, kb = await gallery._render_style_page(session=object(), style=STYLE)
+    _, kb = await _open(_nav(kb)["Дальше »"])
+
+    tattoo_cb = GalleryCb.unpack(kb.inline_keyboard[2][0].callback_data)
+    assert tattoo_cb.tattoo_id == 11
+    back_kb = gallery._tattoo_keyboard(
+        style_id=1,
+        views=tattoo_cb.views,
+        ref_id=tattoo_cb.ref_id,
+        pos=tattoo_cb.pos,
+    )
+    text, _ = await _open(GalleryCb.unpack(back_kb.inline_keyboard[0][0].callback_data))
+    assert text.splitlines()[2] == "9. t9 — 97 views"
+
+
+@pytest.mark.asyncio
+async def test_list_tattoos_by_style_seeks_by_index_range() -> None:
+    statements: list[Any] = []
+
+    class FakeSession:
+        async def execute(self, stmt: Any) -> Any:
+            statements.append(stmt)
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+    session: Any = FakeSession()
+    await list_tattoos_by_style(session=session, style_id=1, limit=9, cursor=(97, 9))
+    await list_tattoos_by_style(
+        session=session, style_id=1, limit=9, cursor=(97, 9), before=True
+    )
+
+    after, before = (
+        " ".join(str(s.compile(dialect=postgresql.dialect())).split())
+        for s in statements
+    )
+    assert "tattoos.views <= " in after
+    assert "OFFSET" not in after
+    assert "ORDER BY tattoos.views DESC, tattoos.id ASC LIMIT" in after
+    assert "tattoos.views >= " in before
+    assert "ORDER BY tattoos.views ASC, tattoos.id DESC" in before
+
+
+class _LegacyRedis:
+    async def get(self, key: str) -> str | None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_legacy_page_button_reopens_the_first_page(monkeypatch) -> None:
+    from core.services.gallery_cache import GalleryCache
+
+    _install_fakes(monkeypatch)
+    legacy = "gallery:page:1::2"
+    # The keyset layout has more fields, so GalleryCb.filter() rejects it.
+    with pytest.raises(TypeError):
+        GalleryCb.unpack(legacy)
+
+    edits: list[dict[str, Any]] = []
+    answers: list[Any] = []
+    state_updates: list[dict[str, Any]] = []
+
+    async def edit_message_text(**kwargs: Any) -> None:
+        edits.append(kwargs)
+
+    async def answer(*args: Any, **kwargs: Any) -> None:
+        answers.append(args)
+
+    async def current(*, session: Any) -> Any:
+        return SimpleNamespace(style=lambda style_id: STYLE if style_id == 1 else None)
+
+    async def update_data(data: dict[str, Any]) -> None:
+        state_updates.append(data)
+
+    message = SimpleNamespace(
+        message_id=77,
+        chat=SimpleNamespace(id=5),
+        bot=SimpleNamespace(edit_message_text=edit_message_text),
+    )
+    query = SimpleNamespace(data=legacy, message=message, answer=answer)
+    router = gallery.create_gallery_router()
+    handler = router.callback_query.handlers[-1]
+
+    await handler.callback(
+        query,
+        session=object(),
+        state=SimpleNamespace(update_data=update_data),
+        gallery_cache=GalleryCache(redis=_LegacyRedis()),  # type: ignore[arg-type]
+        catalog=SimpleNamespace(current=current),
+    )
+
+    (edit,) = edits
+    assert edit["message_id"] == 77
+    assert "1. t1 — 100 views" in edit["text"]
+    assert answers == [()]
+    assert state_updates == [{gallery._GALLERY_MESSAGE_ID_KEY: 77}]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+_VERSIONS = Path(__file__).resolve().parents[1] / "alembic" / "versions"
+_REVISION = re.compile(r'^revision = "(\w+)"', re.M)
+_DOWN_REVISION = re.compile(r'^down_revision = (?:"(\w+)"|None)', re.M)
+
+
+def _revisions() -> dict[str, str | None]:
+    revisions: dict[str, str | None] = {}
+    for path in _VERSIONS.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        down_revision = _DOWN_REVISION.search(source)
+        assert revision and down_revision, path.name
+        revisions[revision.group(1)] = down_revision.group(1)
+    return revisions
+
+
+def test_migrations_form_a_single_linear_chain() -> None:
+    revisions = _revisions()
+    parents = [down for down in revisions.values() if down is not None]
+
+    # Two migrations revising the same parent fork the history.
+    assert len(parents) == len(set(parents))
+    (head,) = set(revisions) - set(parents)
+
+    chain: list[str] = []
+    current: str | None = head
+    while current is not None:
+        chain.append(current)
+        current = revisions[current]
+    assert len(chain) == len(revisions)
+    assert revisions["8d1f5a3e6b27"] == "4b7d2e91c3a5"
+    assert revisions["4b7d2e91c3a5"] == "9f3c1b2a7d10"
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+from typing import Any
+
+import pytest
+
+from core.services.webapp_context_service import (
+    selected_design_key,
+    set_selected_design,
+)
+from infra.redis.lifecycle import (
+    SWEEP_LEASE_KEY,
+    KeyTtlPolicy,
+    PrefixUsage,
+    apply_missing_ttls,
+    memory_report,
+    sweep_keys,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._calls: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def ttl(self, key: str) -> None:
+        self._calls.append(("ttl", (key,)))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self._calls.append(("expire", (key, seconds)))
+
+    def memory_usage(self, key: str, samples: int | None = None) -> None:
+        self._calls.append(("memory_usage", (key,)))
+
+    async def execute(self) -> list[Any]:
+        return [getattr(self._redis, f"_{name}")(*args) for name, args in self._calls]
+
+
+class FakeRedis:
+    def __init__(self, values: dict[str, str]) -> None:
+        self.values = values
+        self.ttls: dict[str, int] = {}
+
+    async def set(
+        self, key: str, value: str, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    async def scan_iter(self, match: str = "*", count: int = 10):
+        for key in list(self.values):
+            if fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def _ttl(self, key: str) -> int:
+        if key not in self.values:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def _expire(self, key: str, seconds: int) -> bool:
+        self.ttls[key] = seconds
+        return True
+
+    def _memory_usage(self, key: str) -> int:
+        return 50 + len(self.values[key])
+
+
+@pytest.mark.asyncio
+async def test_sweeper_sets_ttl_only_on_persistent_matching_keys() -> None:
+    redis = FakeRedis(
+        {
+            "f:1:1": "x",
+            "f:2:2": "x",
+            selected_design_key(tg_id=5): "10",
+            "availability:version": "3",
+        }
+    )
+    redis.ttls["f:2:2"] = 30
+
+    fixed = await apply_missing_ttls(
+        redis,  # type: ignore[arg-type]
+        [
+            KeyTtlPolicy("f:*", 600),
+            KeyTtlPolicy("user:*:selected_design_id", 900),
+        ],
+        batch_size=1,
+    )
+
+    assert fixed == {"f:*": 1, "user:*:selected_design_id": 1}
+    assert redis.ttls == {"f:1:1": 600, "f:2:2": 30, "user:5:selected_design_id": 900}
+
+
+@pytest.mark.asyncio
+async def test_memory_report_groups_by_prefix() -> None:
+    redis = FakeRedis({"f:1:1": "ab", "f:2:2": "c", "slot_hold:1": "7"})
+
+    report = await memory_report(redis, batch_size=2)  # type: ignore[arg-type]
+
+    assert report == {
+        "f": PrefixUsage(keys=2, bytes=103),
+        "slot_hold": PrefixUsage(keys=1, bytes=51),
+    }
+
+
+@pytest.mark.asyncio
+async def test_selected_design_is_written_with_ttl() -> None:
+    redis = FakeRedis({})
+    await set_selected_design(
+        redis=redis, tg_id=5, tattoo_id=10, ttl_seconds=60  # type: ignore[arg-type]
+    )
+    assert redis.ttls == {selected_design_key(tg_id=5): 60}
+
+
+@pytest.mark.asyncio
+async def test_only_the_lease_holder_sweeps() -> None:
+    redis = FakeRedis({"f:1:1": "x"})
+    policies = [KeyTtlPolicy("f:*", 600)]
+
+    assert await sweep_keys(
+        redis, policies, lease_seconds=3600  # type: ignore[arg-type]
+    )
+    assert redis.ttls == {"f:1:1": 600, SWEEP_LEASE_KEY: 3600}
+
+    # Another worker in the same interval skips the SCANs.
+    redis.values["f:2:2"] = "x"
+    assert not await sweep_keys(
+        redis, policies, lease_seconds=3600  # type: ignore[arg-type]
+    )
+    assert "f:2:2" not in redis.ttls
@@ -9,3 +9,23 @@ from core.services.schedule import today_msk
 def test_today_msk_matches_moscow_date() -> None:
     expected = datetime.now(ZoneInfo("Europe/Moscow")).date()
     assert today_msk() == expected
+
+
+def test_slot_key_matches_order_start_at() -> None:
+    from datetime import date, time
+
+    from core.services.schedule import (
+        compose_start_at_utc,
+        slot_key,
+        slot_key_from_datetime,
+        slot_key_to_datetime,
+        slot_key_to_msk,
+    )
+
+    day = date(2026, 2, 10)
+    start_at = compose_start_at_utc(chosen_date=day, chosen_time=time(13, 0))
+    key = slot_key(day, 13 * 60)
+
+    assert key == slot_key_from_datetime(start_at)
+    assert slot_key_to_datetime(key) == start_at
+    assert slot_key_to_msk(key) == (day, 13 * 60)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import date, time
+from typing import Any
+
+import pytest
+
+from core.services.calendar_availability import CalendarAvailabilityService
+from core.services.schedule import SchedulePolicy, slot_key
+from core.services.slot_holds import SlotHolds, slot_hold_key
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._store: dict[str, str] = {}
+        self.ttl: dict[str, int] = {}
+
+    async def set(
+        self, key: str, value: str, nx: bool = False, ex: int | None = None
+    ) -> bool | None:
+        if nx and key in self._store:
+            return None
+        self._store[key] = value
+        if ex is not None:
+            self.ttl[key] = ex
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self._store.get(key)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self.ttl[key] = seconds
+        return key in self._store
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [self._store.get(k) for k in keys]
+
+
+@pytest.mark.asyncio
+async def test_slot_hold_is_exclusive_per_holder() -> None:
+    redis = FakeRedis()
+    holds = SlotHolds(redis=redis, ttl_seconds=60)  # type: ignore[arg-type]
+    key = slot_key(date(2026, 2, 10), 12 * 60)
+
+    assert await holds.acquire(key=key, holder=1) is True
+    assert await holds.acquire(key=key, holder=2) is False
+    # Re-picking extends the holder's own lease.
+    assert await holds.acquire(key=key, holder=1) is True
+    assert redis.ttl[slot_hold_key(key)] == 60
+
+    assert await holds.held_by_others([key], holder=1) == set()
+    assert await holds.held_by_others([key], holder=2) == {key}
+
+
+@pytest.mark.asyncio
+async def test_held_slots_are_unavailable_for_other_users(monkeypatch) -> None:
+    import core.repositories.orders as orders_repo
+    import core.repositories.schedule_exceptions as exc_repo
+
+    day = date(2026, 2, 10)
+
+    async def fake_is_day_off(*, session, day):  # noqa: ANN001
+        return False
+
+    async def fake_list_blocked_slots_for_date(*, session, day):  # noqa: ANN001
+        return {time(14, 0)}
+
+    async def fake_list_orders_start_at_between(
+        *, session, start_at, end_at
+    ):  # noqa: ANN001
+        return []
+
+    monkeypatch.setattr(exc_repo, "is_day_off", fake_is_day_off)
+    monkeypatch.setattr(
+        exc_repo, "list_blocked_slots_for_date", fake_list_blocked_slots_for_date
+    )
+    monkeypatch.setattr(
+        orders_repo, "list_order_start_at_between", fake_list_orders_start_at_between
+    )
+
+    holds = SlotHolds(redis=FakeRedis())  # type: ignore[arg-type]
+    await holds.acquire(key=slot_key(day, 12 * 60), holder=1)
+    svc = CalendarAvailabilityService(
+        policy=SchedulePolicy(days_ahead=2, start_hour=12, end_hour_inclusive=14),
+        holds=holds,
+    )
+    session: Any = object()
+
+    assert await svc.get_available_slots(session=session, day=day, holder=1) == [
+        "12:00",
+        "13:00",
+    ]
+    assert await svc.get_available_slots(session=session, day=day, holder=2) == [
+        "13:00"
+    ]
+    assert not await svc.is_slot_available(
+        session=session, day=day, slot_hhmm="12:00", holder=2
+    )
+    assert await svc.is_slot_available(
+        session=session, day=day, slot_hhmm="12:00", holder=1
+    )
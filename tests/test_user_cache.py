@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+import pytest
+
+import core.repositories.users as users_repo
+from core.repositories.users import UserRef
+from core.services.user_cache import UserCache
+
+
+@pytest.mark.asyncio
+async def test_personal_discount_caches_known_and_unknown_users(monkeypatch) -> None:
+    lookups: list[int] = []
+    refs = {1: UserRef(id=10, tg_nickname="a", personal_discount=Decimal("0.90"))}
+
+    async def fake_get_user_ref(*, session, tg_id):  # noqa: ANN001
+        lookups.append(tg_id)
+        return refs.get(tg_id)
+
+    monkeypatch.setattr(users_repo, "get_user_ref", fake_get_user_ref)
+    cache = UserCache()
+    session: Any = object()
+
+    for _ in range(2):
+        assert await cache.personal_discount(session=session, tg_id=1) == Decimal(
+            "0.90"
+        )
+        assert await cache.personal_discount(session=session, tg_id=2) is None
+
+    assert lookups == [1, 2]
+
+
+def test_entries_expire_and_are_bounded(monkeypatch) -> None:
+    import core.services.user_cache as user_cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(user_cache_module, "monotonic", lambda: now[0])
+    cache = UserCache(ttl_seconds=10, max_entries=2)
+    for tg_id in (1, 2, 3):
+        cache.remember(
+            tg_id, UserRef(id=tg_id, tg_nickname="x", personal_discount=None)
+        )
+
+    # Least recently used entry is evicted.
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+
+    now[0] += 10
+    assert cache.get(2) is None
+    assert cache.get(3) is None
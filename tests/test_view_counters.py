@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import core.repositories.styles as styles_repo
+import core.repositories.tattoos as tattoos_repo
+from core.repositories.styles import add_style_views_stmt
+from core.services.view_counters import ViewCounters
+
+
+class FakeSession:
+    def begin(self) -> FakeSession:
+        return self
+
+    async def __aenter__(self) -> FakeSession:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+
+def test_style_views_are_one_update_from_values() -> None:
+    stmt = add_style_views_stmt({3: 2, 1: 5})
+    sql = " ".join(
+        str(
+            stmt.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        ).split()
+    )
+
+    assert sql == (
+        "UPDATE styles SET views=(styles.views + deltas.delta) "
+        "FROM (VALUES (1, 5), (3, 2)) AS deltas (id, delta) "
+        "WHERE styles.id = deltas.id"
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_accumulated_views_in_one_batch(monkeypatch) -> None:
+    writes: list[tuple[str, dict[int, int]]] = []
+
+    async def fake_add_style_views(*, session, deltas):  # noqa: ANN001
+        writes.append(("styles", dict(deltas)))
+
+    async def fake_add_tattoo_views(*, session, deltas):  # noqa: ANN001
+        writes.append(("tattoos", dict(deltas)))
+
+    monkeypatch.setattr(styles_repo, "add_style_views", fake_add_style_views)
+    monkeypatch.setattr(tattoos_repo, "add_tattoo_views", fake_add_tattoo_views)
+    session_maker: Any = FakeSession
+    counters = ViewCounters(session_maker=session_maker)
+
+    assert await counters.flush() == 0
+    for style_id in (1, 1, 2):
+        counters.add_style_view(style_id)
+    counters.add_tattoo_view(7)
+
+    assert await counters.flush() == 4
+    assert writes == [("styles", {1: 2, 2: 1}), ("tattoos", {7: 1})]
+    assert counters.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts_for_the_next_one(monkeypatch) -> None:
+    fail = [True]
+    written: list[dict[int, int]] = []
+
+    async def flaky_add_style_views(*, session, deltas):  # noqa: ANN001
+        if fail[0]:
+            raise ConnectionError("db down")
+        written.append(dict(deltas))
+
+    async def fake_add_tattoo_views(*, session, deltas):  # noqa: ANN001
+        return None
+
+    monkeypatch.setattr(styles_repo, "add_style_views", flaky_add_style_views)
+    monkeypatch.setattr(tattoos_repo, "add_tattoo_views", fake_add_tattoo_views)
+    session_maker: Any = FakeSession
+    counters = ViewCounters(session_maker=session_maker)
+
+    counters.add_style_view(1)
+    with pytest.raises(ConnectionError):
+        await counters.flush()
+    counters.add_style_view(1)
+    assert counters.pending() == 2
+
+    fail[0] = False
+    await counters.flush()
+    assert written == [{1: 2}]
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, stmt: Any) -> Any:
+        self.statements.append(
+            " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+        )
+        return SimpleNamespace(all=lambda: [])
+
+
+@pytest.mark.asyncio
+async def test_tattoo_views_refresh_top_tattoo_of_affected_styles() -> None:
+    session: Any = RecordingSession()
+
+    await tattoos_repo.add_tattoo_views(session=session, deltas={5: 1, 2: 3})
+
+    update_views, refresh_top = session.statements
+    assert update_views.startswith("UPDATE tattoos SET views=")
+    assert refresh_top.startswith("UPDATE styles SET top_tattoo_id=(SELECT tattoos.id")
+    assert "ORDER BY tattoos.views DESC, tattoos.id ASC LIMIT" in refresh_top
+    assert "WHERE styles.id IN (SELECT DISTINCT tattoos.style_id" in refresh_top
+
+
+@pytest.mark.asyncio
+async def test_styles_list_reads_the_summary_instead_of_ranking_tattoos() -> None:
+    session: Any = RecordingSession()
+
+    await styles_repo.list_styles_with_top_tattoo(session=session)
+
+    (sql,) = session.statements
+    assert "row_number" not in sql
+    assert "LEFT OUTER JOIN tattoos ON tattoos.id = styles.top_tattoo_id" in sql
@@ -8,6 +8,7 @@ from aiogram import Dispatcher
 from fastapi.testclient import TestClient
 
 from apps.app.routes import deps as deps_module
+from core.services.catalog import CatalogSnapshot
 from core.services.webapp_auth_service import WebAppIdentity
 from core.services.webapp_context_service import selected_design_key
 
@@ -35,6 +36,18 @@ class FakeRedis:
         self._store[key] = value
 
 
+class FakeCatalog:
+    def __init__(self, tattoos: list[SimpleNamespace] | None = None) -> None:
+        self.reads = 0
+        self._snapshot = CatalogSnapshot.build(
+            version=1, styles=[], tattoos=tattoos or []
+        )
+
+    async def current(self, *, session: object) -> CatalogSnapshot:
+        self.reads += 1
+        return self._snapshot
+
+
 def _set_env(monkeypatch) -> None:
     monkeypatch.setenv("APP_ENV", "dev")
     monkeypatch.setenv("LOG_LEVEL", "INFO")
@@ -87,13 +100,22 @@ def test_webapp_context_contract_with_selected_design(monkeypatch) -> None:
     def _redis_override() -> FakeRedis:
         return fake_redis
 
-    async def _get_tattoo(**_kwargs):
-        return SimpleNamespace(name="Dragon")
+    catalog = FakeCatalog(
+        [
+            SimpleNamespace(
+                id=10,
+                name="Dragon",
+                style_id=1,
+                price=None,
+                views=0,
+                photo_file_id=None,
+            )
+        ]
+    )
 
     async def _get_active_config(**_kwargs):
         return SimpleNamespace(id=5)
 
-    monkeypatch.setattr("core.services.webapp_context_service.get_tattoo", _get_tattoo)
     monkeypatch.setattr(
         "core.services.webapp_context_service.get_active_pricing_config",
         _get_active_config,
@@ -102,6 +124,7 @@ def test_webapp_context_contract_with_selected_design(monkeypatch) -> None:
     app.dependency_overrides[deps_module.get_webapp_identity] = _identity_override
     app.dependency_overrides[deps_module.get_session] = _session_override
     app.dependency_overrides[deps_module.get_redis] = _redis_override
+    app.dependency_overrides[deps_module.get_catalog] = lambda: catalog
 
     client = TestClient(app)
     response = client.get("/api/webapp/context")
@@ -129,15 +152,11 @@ def test_webapp_context_handles_invalid_selected_design_value(monkeypatch) -> No
     def _redis_override() -> FakeRedis:
         return fake_redis
 
-    async def _get_tattoo(**_kwargs):
-        raise AssertionError(
-            "get_tattoo should not be called for invalid selected_design"
-        )
+    catalog = FakeCatalog()
 
     async def _get_active_config(**_kwargs):
         return None
 
-    monkeypatch.setattr("core.services.webapp_context_service.get_tattoo", _get_tattoo)
     monkeypatch.setattr(
         "core.services.webapp_context_service.get_active_pricing_config",
         _get_active_config,
@@ -146,6 +165,7 @@ def test_webapp_context_handles_invalid_selected_design_value(monkeypatch) -> No
     app.dependency_overrides[deps_module.get_webapp_identity] = _identity_override
     app.dependency_overrides[deps_module.get_session] = _session_override
     app.dependency_overrides[deps_module.get_redis] = _redis_override
+    app.dependency_overrides[deps_module.get_catalog] = lambda: catalog
 
     client = TestClient(app)
     response = client.get("/api/webapp/context")
@@ -157,3 +177,5 @@ def test_webapp_context_handles_invalid_selected_design_value(monkeypatch) -> No
         "selected_design_name": None,
         "pricing_config_id": None,
     }
+    # Invalid selected_design values never reach the catalog.
+    assert catalog.reads == 0
@@ -0,0 +1,520 @@
+"""
+Availability benchmarks: latency percentiles and query counts vs booking volume.
+
+Seeds synthetic schedules (orders, blocked slots, days off over the horizon)
+into an in-memory fake repository layer and, with ``--database-url``, into
+Postgres inside a transaction that is rolled back afterwards.
+
+Usage:
+    python -m tools.bench.availability --scales 100,1000,2000 --output bench.json
+    python -m tools.bench.availability --database-url postgresql+asyncpg://...
+    python -m tools.bench.availability --compare old.json --output new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import json
+import random
+import subprocess
+import sys
+import time as time_mod
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from core.repositories import orders as orders_repo
+from core.repositories import schedule_exceptions as exc_repo
+from core.services.availability_index import AvailabilityIndex
+from core.services.calendar_availability import (
+    CalendarAvailabilityService,
+    _compute_available_slots,
+)
+from core.services.calendar_ui import CalendarView, build_calendar_keyboard
+from core.services.schedule import (
+    MOSCOW_TZ,
+    SchedulePolicy,
+    compose_start_at_utc,
+    list_time_slots,
+    today_msk,
+)
+
+Case = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class SyntheticSchedule:
+    """Randomly generated occupancy for ``[today, today + days_ahead]``."""
+
+    policy: SchedulePolicy
+    today: date
+    day_off: set[date] = field(default_factory=set)
+    blocked: dict[date, set[time]] = field(default_factory=dict)
+    order_start_ats: list[datetime] = field(default_factory=list)
+
+    @classmethod
+    def generate(
+        cls,
+        *,
+        policy: SchedulePolicy,
+        today: date,
+        orders: int,
+        blocked: int,
+        days_off: int,
+        seed: int,
+    ) -> SyntheticSchedule:
+        rnd = random.Random(seed)
+        days = [today + timedelta(days=i) for i in range(policy.days_ahead + 1)]
+        slot_times = [time(int(s[:2]), int(s[3:])) for s in list_time_slots(policy)]
+        cells = [(d, t) for d in days for t in slot_times]
+        rnd.shuffle(cells)
+        # uq_orders_start_at allows one order per slot, so volume is capped.
+        order_cells = cells[: min(orders, len(cells))]
+        blocked_cells = cells[len(order_cells) : len(order_cells) + blocked]
+
+        schedule = cls(policy=policy, today=today)
+        schedule.day_off = set(rnd.sample(days, min(days_off, len(days))))
+        for d, t in blocked_cells:
+            schedule.blocked.setdefault(d, set()).add(t)
+        schedule.order_start_ats = sorted(
+            compose_start_at_utc(chosen_date=d, chosen_time=t) for d, t in order_cells
+        )
+        return schedule
+
+    @property
+    def blocked_count(self) -> int:
+        return sum(len(times) for times in self.blocked.values())
+
+
+class FakeRepositories:
+    """In-memory stand-ins for the repository functions availability uses."""
+
+    def __init__(self, schedule: SyntheticSchedule) -> None:
+        self.schedule = schedule
+        self.queries = 0
+
+    async def list_day_off_dates(
+        self, *, session: Any, start_date: date, end_date_inclusive: date
+    ) -> set[date]:
+        self.queries += 1
+        return {
+            d for d in self.schedule.day_off if start_date <= d <= end_date_inclusive
+        }
+
+    async def is_day_off(self, *, session: Any, day: date) -> bool:
+        self.queries += 1
+        return day in self.schedule.day_off
+
+    async def list_blocked_slots_for_date(
+        self, *, session: Any, day: date
+    ) -> set[time]:
+        self.queries += 1
+        return set(self.schedule.blocked.get(day, ()))
+
+    async def list_blocked_slots_between(
+        self, *, session: Any, start_date: date, end_date_inclusive: date
+    ) -> dict[date, set[time]]:
+        self.queries += 1
+        return {
+            d: set(times)
+            for d, times in self.schedule.blocked.items()
+            if start_date <= d <= end_date_inclusive
+        }
+
+    async def list_order_start_at_between(
+        self, *, session: Any, start_at: datetime, end_at: datetime
+    ) -> list[datetime]:
+        self.queries += 1
+        items = self.schedule.order_start_ats
+        lo = bisect.bisect_left(items, start_at)
+        hi = bisect.bisect_left(items, end_at)
+        return items[lo:hi]
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator[None]:
+        patches = [
+            (exc_repo, "list_day_off_dates"),
+            (exc_repo, "is_day_off"),
+            (exc_repo, "list_blocked_slots_for_date"),
+            (exc_repo, "list_blocked_slots_between"),
+            (orders_repo, "list_order_start_at_between"),
+        ]
+        originals = [(module, name, getattr(module, name)) for module, name in patches]
+        try:
+            for module, name in patches:
+                setattr(module, name, getattr(self, name))
+            yield
+        finally:
+            for module, name, original in originals:
+                setattr(module, name, original)
+
+
+@dataclass(frozen=True, slots=True)
+class CaseResult:
+    case: str
+    backend: str
+    orders: int
+    blocked: int
+    days_off: int
+    iterations: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    mean_ms: float
+    queries_per_call: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[idx]
+
+
+async def _measure(
+    *,
+    name: str,
+    backend: str,
+    schedule: SyntheticSchedule,
+    case: Case,
+    new_session: Callable[[], contextlib.AbstractAsyncContextManager[Any]],
+    query_count: Callable[[], int],
+    iterations: int,
+    warmup: int,
+) -> CaseResult:
+    for _ in range(warmup):
+        async with new_session() as session:
+            await case(session)
+
+    samples: list[float] = []
+    queries_before = query_count()
+    for _ in range(iterations):
+        # Fresh session per call: the session-scoped memo must not hide work.
+        async with new_session() as session:
+            started = time_mod.perf_counter()
+            await case(session)
+            samples.append((time_mod.perf_counter() - started) * 1000)
+    queries = query_count() - queries_before
+
+    samples.sort()
+    return CaseResult(
+        case=name,
+        backend=backend,
+        orders=len(schedule.order_start_ats),
+        blocked=schedule.blocked_count,
+        days_off=len(schedule.day_off),
+        iterations=iterations,
+        p50_ms=round(_percentile(samples, 50), 4),
+        p90_ms=round(_percentile(samples, 90), 4),
+        p99_ms=round(_percentile(samples, 99), 4),
+        mean_ms=round(sum(samples) / len(samples), 4),
+        queries_per_call=round(queries / iterations, 2),
+    )
+
+
+def _build_cases(
+    *, schedule: SyntheticSchedule, backend: str, index: AvailabilityIndex
+) -> dict[str, Case]:
+    policy = schedule.policy
+    today = schedule.today
+    rnd = random.Random(0)
+    days = [today + timedelta(days=i) for i in range(policy.days_ahead + 1)]
+    plain = CalendarAvailabilityService(policy=policy)
+    indexed = CalendarAvailabilityService(policy=policy, index=index)
+    view = CalendarView(year=today.year, month=today.month)
+    disabled = set(schedule.day_off)
+
+    booked_by_day: dict[date, set[str]] = {}
+    for dt in schedule.order_start_ats:
+        dt_msk = dt.astimezone(MOSCOW_TZ)
+        booked_by_day.setdefault(dt_msk.date(), set()).add(dt_msk.strftime("%H:%M"))
+
+    async def compute_available_slots(_session: Any) -> Any:
+        day = rnd.choice(days)
+        return _compute_available_slots(
+            policy=policy,
+            is_day_off=day in schedule.day_off,
+            blocked={t.strftime("%H:%M") for t in schedule.blocked.get(day, ())},
+            booked=booked_by_day.get(day, set()),
+        )
+
+    async def calendar_keyboard(_session: Any) -> Any:
+        return build_calendar_keyboard(
+            today=today, view=view, policy=policy, disabled_dates=disabled
+        )
+
+    async def available_slots(session: Any) -> Any:
+        return await plain.get_available_slots(session=session, day=rnd.choice(days))
+
+    async def disabled_dates(session: Any) -> Any:
+        return await plain.get_disabled_dates(session=session, today=today)
+
+    async def disabled_dates_indexed(session: Any) -> Any:
+        return await indexed.get_disabled_dates(session=session, today=today)
+
+    cases: dict[str, Case] = {
+        "compute_available_slots": compute_available_slots,
+        "build_calendar_keyboard": calendar_keyboard,
+        "get_available_slots": available_slots,
+        "get_disabled_dates": disabled_dates,
+        "get_disabled_dates[index]": disabled_dates_indexed,
+    }
+    if backend == "postgres":
+        pushdown = CalendarAvailabilityService(
+            policy=policy, pushdown_disabled_dates=True
+        )
+
+        async def disabled_dates_pushdown(session: Any) -> Any:
+            return await pushdown.get_disabled_dates(session=session, today=today)
+
+        cases["get_disabled_dates[pushdown]"] = disabled_dates_pushdown
+    return cases
+
+
+async def _run_fake(
+    *, schedule: SyntheticSchedule, iterations: int, warmup: int
+) -> list[CaseResult]:
+    fake = FakeRepositories(schedule)
+
+    @contextlib.asynccontextmanager
+    async def new_session() -> Any:
+        yield SimpleNamespace(info={})
+
+    results: list[CaseResult] = []
+    with fake.installed():
+        index = AvailabilityIndex(policy=schedule.policy, max_age_seconds=3600.0)
+        cases = _build_cases(schedule=schedule, backend="fake", index=index)
+        for name, case in cases.items():
+            results.append(
+                await _measure(
+                    name=name,
+                    backend="fake",
+                    schedule=schedule,
+                    case=case,
+                    new_session=new_session,
+                    query_count=lambda: fake.queries,
+                    iterations=iterations,
+                    warmup=warmup,
+                )
+            )
+    return results
+
+
+async def _run_postgres(
+    *,
+    schedule: SyntheticSchedule,
+    database_url: str,
+    iterations: int,
+    warmup: int,
+) -> list[CaseResult]:
+    from sqlalchemy import event, insert
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from infra.db.models.blocked_slot import BlockedSlot
+    from infra.db.models.day_off import DayOff
+    from infra.db.models.order import Order
+    from infra.db.models.user import User
+
+    engine = create_async_engine(database_url)
+    queries = 0
+
+    def count_query(*_args: Any) -> None:
+        nonlocal queries
+        queries += 1
+
+    results: list[CaseResult] = []
+    try:
+        async with engine.connect() as conn:
+            # Everything, including the seed, is rolled back at the end.
+            outer = await conn.begin()
+            seed = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+            user_id = (
+                await seed.execute(
+                    insert(User)
+                    .values(tg_id=-random.randint(10**6, 10**9), tg_nickname="bench")
+                    .returning(User.id)
+                )
+            ).scalar_one()
+            if schedule.order_start_ats:
+                await seed.execute(
+                    insert(Order),
+                    [
+                        {"user_id": user_id, "start_at": dt}
+                        for dt in schedule.order_start_ats
+                    ],
+                )
+            if schedule.day_off:
+                await seed.execute(
+                    insert(DayOff), [{"date": d} for d in schedule.day_off]
+                )
+            blocked_rows = [
+                {"date": d, "time": t}
+                for d, times in schedule.blocked.items()
+                for t in times
+            ]
+            if blocked_rows:
+                await seed.execute(insert(BlockedSlot), blocked_rows)
+            await seed.flush()
+
+            @contextlib.asynccontextmanager
+            async def new_session() -> Any:
+                session = AsyncSession(
+                    bind=conn, join_transaction_mode="create_savepoint"
+                )
+                try:
+                    yield session
+                finally:
+                    await session.close()
+
+            event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+            index = AvailabilityIndex(policy=schedule.policy, max_age_seconds=3600.0)
+            cases = _build_cases(schedule=schedule, backend="postgres", index=index)
+            for name, case in cases.items():
+                results.append(
+                    await _measure(
+                        name=name,
+                        backend="postgres",
+                        schedule=schedule,
+                        case=case,
+                        new_session=new_session,
+                        query_count=lambda: queries,
+                        iterations=iterations,
+                        warmup=warmup,
+                    )
+                )
+            await outer.rollback()
+    finally:
+        await engine.dispose()
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _print_table(results: list[CaseResult], baseline: dict[tuple, dict]) -> None:
+    header = (
+        f"{'case':<30} {'backend':<9} {'orders':>6} {'p50ms':>9} {'p90ms':>9} "
+        f"{'p99ms':>9} {'q/call':>7} {'vs base':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        base = baseline.get((r.case, r.backend, r.orders))
+        delta = ""
+        if base and base.get("p50_ms"):
+            delta = f"{r.p50_ms / base['p50_ms']:.2f}x"
+        print(
+            f"{r.case:<30} {r.backend:<9} {r.orders:>6} {r.p50_ms:>9.3f} "
+            f"{r.p90_ms:>9.3f} {r.p99_ms:>9.3f} {r.queries_per_call:>7.2f} "
+            f"{delta:>8}"
+        )
+
+
+def _load_baseline(path: str | None) -> dict[tuple, dict]:
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    return {
+        (row["case"], row["backend"], row["orders"]): row
+        for row in payload.get("results", [])
+    }
+
+
+async def _run(args: argparse.Namespace) -> list[CaseResult]:
+    start_hour, end_hour = (int(part) for part in args.hours.split("-"))
+    policy = SchedulePolicy(
+        days_ahead=args.days_ahead,
+        start_hour=start_hour,
+        end_hour_inclusive=end_hour,
+    )
+    today = today_msk()
+    results: list[CaseResult] = []
+    for scale in args.scales:
+        schedule = SyntheticSchedule.generate(
+            policy=policy,
+            today=today,
+            orders=scale,
+            blocked=scale // 10,
+            days_off=max(1, policy.days_ahead // 15),
+            seed=args.seed,
+        )
+        results.extend(
+            await _run_fake(
+                schedule=schedule, iterations=args.iterations, warmup=args.warmup
+            )
+        )
+        if args.database_url:
+            results.extend(
+                await _run_postgres(
+                    schedule=schedule,
+                    database_url=args.database_url,
+                    iterations=args.iterations,
+                    warmup=args.warmup,
+                )
+            )
+    return results
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scales",
+        type=lambda v: [int(x) for x in v.split(",") if x],
+        default=[100, 500, 2000],
+        help="comma-separated order counts to seed (capped by slot capacity)",
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--days-ahead", type=int, default=90)
+    parser.add_argument(
+        "--hours",
+        default="0-23",
+        help="slot hours as START-END; the wide default allows thousands of orders",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to diff")
+    args = parser.parse_args(argv[1:])
+
+    results = asyncio.run(_run(args))
+    _print_table(results, _load_baseline(args.compare))
+
+    if args.output:
+        payload = {
+            "commit": _git_commit(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "params": {
+                "scales": args.scales,
+                "iterations": args.iterations,
+                "days_ahead": args.days_ahead,
+                "hours": args.hours,
+                "seed": args.seed,
+                "postgres": bool(args.database_url),
+            },
+            "results": [asdict(r) for r in results],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,587 @@
+"""
+Booking flow load simulator: scripted virtual users against the real bot router.
+
+Every virtual user walks the booking flow (menu button, sketch, body part, date,
+time, promo skip, confirm) through ``Dispatcher.feed_update`` with the
+production dispatcher, middlewares and handlers. The Bot API is replaced by a
+session that records calls; Redis is fakeredis (``--redis-url`` for a real
+one, preferably a spare database) and Postgres is the one from ``.env`` or
+``--database-url``. Virtual users get ``tg_id``s from ``--user-id-base`` up;
+their orders, users and FSM keys are deleted afterwards.
+
+Reported per step: latency percentiles plus DB queries, Redis commands, Redis
+round trips and Telegram calls per update.
+
+Usage:
+    python -m tools.bench.booking_load --users 200 --output load.json
+    python -m tools.bench.booking_load --users 200 --redis-url redis://localhost/15
+    python -m tools.bench.booking_load --compare load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time as time_mod
+from collections.abc import AsyncGenerator, Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.methods import TelegramMethod
+from aiogram.types import InlineKeyboardMarkup, Message, Update
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apps.bot.middlewares.db_session import DbSessionMiddleware
+from core.config.settings import Settings
+from core.services.calendar_availability import (
+    AVAILABILITY_DAYS_KEY,
+    AVAILABILITY_VERSION_KEY,
+    AvailabilityCache,
+)
+from core.services.menu import MENU_BOOK
+from core.services.month_cache import MonthCache
+from core.services.schedule import DEFAULT_SCHEDULE_POLICY
+from core.services.slot_holds import SlotHolds
+from core.services.user_cache import UserCache
+from infra.db.models.order import Order
+from infra.db.models.user import User
+from infra.db.session import create_async_engine, create_sessionmaker
+
+BOT_TOKEN = "42:booking-load-simulator"
+STEPS = (
+    "start",
+    "want_custom_sketch",
+    "body_part",
+    "calendar_date",
+    "calendar_time",
+    "promo_code",
+    "confirm",
+)
+
+
+@dataclass(slots=True)
+class UpdateStats:
+    """Side effects of one update (including tasks it spawned)."""
+
+    db_queries: int = 0
+    redis_commands: int = 0
+    redis_round_trips: int = 0
+    telegram_calls: int = 0
+
+
+_current: ContextVar[UpdateStats | None] = ContextVar(
+    "booking_load_stats", default=None
+)
+
+
+def _count(attr: str, n: int = 1) -> None:
+    stats = _current.get()
+    if stats is not None:
+        setattr(stats, attr, getattr(stats, attr) + n)
+
+
+@contextlib.contextmanager
+def _redis_counters(redis: Redis) -> Iterator[None]:
+    """Count Redis commands and round trips issued by the current update."""
+    execute_command = redis.execute_command
+    pipe_execute = Pipeline.execute
+    pipe_immediate = Pipeline.immediate_execute_command
+
+    async def counted_command(*args: Any, **options: Any) -> Any:
+        _count("redis_commands")
+        _count("redis_round_trips")
+        return await execute_command(*args, **options)
+
+    async def counted_execute(self: Pipeline, raise_on_error: bool = True) -> Any:
+        if self.command_stack:
+            _count("redis_commands", len(self.command_stack))
+            _count("redis_round_trips")
+        return await pipe_execute(self, raise_on_error)
+
+    async def counted_immediate(self: Pipeline, *args: Any, **options: Any) -> Any:
+        # Commands run directly on a pipeline in WATCH mode.
+        _count("redis_commands")
+        _count("redis_round_trips")
+        return await pipe_immediate(self, *args, **options)
+
+    redis.execute_command = counted_command  # type: ignore[method-assign]
+    Pipeline.execute = counted_execute  # type: ignore[method-assign]
+    Pipeline.immediate_execute_command = counted_immediate  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        del redis.execute_command
+        Pipeline.execute = pipe_execute  # type: ignore[method-assign]
+        Pipeline.immediate_execute_command = pipe_immediate  # type: ignore[method-assign]
+
+
+@dataclass(slots=True)
+class ChatMessage:
+    text: str
+    markup: InlineKeyboardMarkup | None
+
+
+class RecordingSession(BaseSession):
+    """Bot API stand-in: keeps each chat's messages and answers every call."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chats: dict[int, dict[int, ChatMessage]] = {}
+        self.calls: dict[str, int] = {}
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        return None
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes]:
+        raise NotImplementedError
+        yield b""  # pragma: no cover
+
+    def _message(self, bot: Bot, *, chat_id: int, message_id: int, text: str) -> Any:
+        return Message.model_validate(
+            {
+                "message_id": message_id,
+                "date": int(time_mod.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": bot.id, "is_bot": True, "first_name": "bot"},
+                "text": text,
+            },
+            context={"bot": bot},
+        )
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None
+    ) -> Any:
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        _count("telegram_calls")
+        chat_id = getattr(method, "chat_id", None)
+        if not isinstance(chat_id, int):
+            return True
+        messages = self.chats.setdefault(chat_id, {})
+        markup = getattr(method, "reply_markup", None)
+        if not isinstance(markup, InlineKeyboardMarkup):
+            markup = None
+        if name == "SendMessage":
+            message_id = next(self._message_ids)
+            messages[message_id] = ChatMessage(text=method.text, markup=markup)
+            return self._message(
+                bot, chat_id=chat_id, message_id=message_id, text=method.text
+            )
+        message_id = getattr(method, "message_id", None)
+        if name == "DeleteMessage":
+            messages.pop(message_id, None)
+        elif name == "EditMessageText" and message_id in messages:
+            messages[message_id] = ChatMessage(text=method.text, markup=markup)
+        elif name == "EditMessageReplyMarkup" and message_id in messages:
+            messages[message_id].markup = markup
+        return True
+
+
+@dataclass(slots=True)
+class StepSamples:
+    latencies_ms: list[float] = field(default_factory=list)
+    totals: UpdateStats = field(default_factory=UpdateStats)
+
+
+class VirtualUser:
+    """One scripted customer; each ``_press``/``_say`` is one update."""
+
+    def __init__(
+        self,
+        *,
+        tg_id: int,
+        dp: Dispatcher,
+        bot: Bot,
+        telegram: RecordingSession,
+        samples: dict[str, StepSamples],
+        rnd: random.Random,
+        think_ms: float,
+        max_retries: int,
+    ) -> None:
+        self.tg_id = tg_id
+        self.dp = dp
+        self.bot = bot
+        self.telegram = telegram
+        self.samples = samples
+        self.rnd = rnd
+        self.think_ms = think_ms
+        self.max_retries = max_retries
+        self._update_ids = itertools.count(tg_id * 100)
+
+    @property
+    def _user(self) -> dict[str, Any]:
+        return {"id": self.tg_id, "is_bot": False, "first_name": f"vu{self.tg_id}"}
+
+    async def _feed(self, step: str, payload: dict[str, Any]) -> None:
+        if self.think_ms:
+            await asyncio.sleep(self.rnd.uniform(0, self.think_ms) / 1000)
+        update = Update.model_validate(
+            {"update_id": next(self._update_ids), **payload},
+            context={"bot": self.bot},
+        )
+        stats = UpdateStats()
+        token = _current.set(stats)
+        try:
+            started = time_mod.perf_counter()
+            await self.dp.feed_update(self.bot, update)
+            elapsed = (time_mod.perf_counter() - started) * 1000
+        finally:
+            _current.reset(token)
+        sample = self.samples.setdefault(step, StepSamples())
+        sample.latencies_ms.append(elapsed)
+        for attr in UpdateStats.__slots__:
+            setattr(
+                sample.totals, attr, getattr(sample.totals, attr) + getattr(stats, attr)
+            )
+
+    async def _say(self, step: str, text: str) -> None:
+        message = {
+            "message_id": 0,
+            "date": int(time_mod.time()),
+            "chat": {"id": self.tg_id, "type": "private"},
+            "from": self._user,
+            "text": text,
+        }
+        await self._feed(step, {"message": message})
+
+    def _buttons(self, prefix: str) -> list[tuple[int, str]]:
+        """``(message_id, callback_data)`` of visible buttons starting with prefix."""
+        found: list[tuple[int, str]] = []
+        for message_id, msg in self.telegram.chats.get(self.tg_id, {}).items():
+            if msg.markup is None:
+                continue
+            for row in msg.markup.inline_keyboard:
+                for button in row:
+                    data = button.callback_data
+                    if data is not None and data.startswith(prefix):
+                        found.append((message_id, data))
+        return found
+
+    async def _press(self, step: str, prefix: str) -> bool:
+        buttons = self._buttons(prefix)
+        if not buttons:
+            return False
+        message_id, data = self.rnd.choice(buttons)
+        msg = self.telegram.chats[self.tg_id][message_id]
+        query = {
+            "id": f"{self.tg_id}-{message_id}-{self.rnd.random()}",
+            "from": self._user,
+            "chat_instance": str(self.tg_id),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time_mod.time()),
+                "chat": {"id": self.tg_id, "type": "private"},
+                "from": {"id": self.bot.id, "is_bot": True, "first_name": "bot"},
+                "text": msg.text,
+            },
+        }
+        await self._feed(step, {"callback_query": query})
+        return True
+
+    async def run(self) -> str:
+        """Walk the flow; returns the outcome (``confirmed`` or where it stopped)."""
+        await self._say("start", MENU_BOOK)
+        if not await self._press(
+            "want_custom_sketch", "booking:set:want_custom_sketch:"
+        ):
+            return "no_sketch_question"
+        if not await self._press("body_part", "booking:set:body_part:"):
+            return "no_body_part_question"
+        for _ in range(self.max_retries + 1):
+            if not self._buttons("booking:set:calendar_time:"):
+                if not await self._press("calendar_date", "cal:day:"):
+                    return "no_free_dates"
+            if not await self._press("calendar_time", "booking:set:calendar_time:"):
+                # Day filled up meanwhile: the bot asks for a date again.
+                continue
+            await self._press("promo_code", "booking:skip:promo_code:")
+            if not await self._press("confirm", "booking:confirm:"):
+                continue
+            if not self._buttons("booking:"):
+                # Confirmed: the flow keyboards are gone.
+                return "confirmed"
+        return "slot_taken"
+
+
+@dataclass(frozen=True, slots=True)
+class StepResult:
+    step: str
+    updates: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    db_queries_per_update: float
+    redis_commands_per_update: float
+    redis_round_trips_per_update: float
+    telegram_calls_per_update: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[idx]
+
+
+def _summarize(samples: dict[str, StepSamples]) -> list[StepResult]:
+    results: list[StepResult] = []
+    for step in (*STEPS, *sorted(set(samples) - set(STEPS))):
+        sample = samples.get(step)
+        if sample is None or not sample.latencies_ms:
+            continue
+        values = sorted(sample.latencies_ms)
+        n = len(values)
+        totals = sample.totals
+        results.append(
+            StepResult(
+                step=step,
+                updates=n,
+                p50_ms=round(_percentile(values, 50), 3),
+                p90_ms=round(_percentile(values, 90), 3),
+                p99_ms=round(_percentile(values, 99), 3),
+                max_ms=round(values[-1], 3),
+                db_queries_per_update=round(totals.db_queries / n, 2),
+                redis_commands_per_update=round(totals.redis_commands / n, 2),
+                redis_round_trips_per_update=round(totals.redis_round_trips / n, 2),
+                telegram_calls_per_update=round(totals.telegram_calls / n, 2),
+            )
+        )
+    return results
+
+
+async def _create_redis(redis_url: str | None) -> Redis:
+    if redis_url:
+        return Redis.from_url(redis_url, decode_responses=True)
+    try:
+        from fakeredis import FakeAsyncRedis
+    except ImportError as e:
+        raise SystemExit(
+            "fakeredis is not installed: pip install fakeredis, or pass --redis-url"
+        ) from e
+    return FakeAsyncRedis(decode_responses=True)
+
+
+def _build_dispatcher(
+    *, settings: Settings, redis: Redis, engine: AsyncEngine
+) -> Dispatcher:
+    # Same wiring as create_app(), minus the web server and background tasks.
+    # Imported here: apps.app.main builds the ASGI app (and reads .env) on import.
+    from apps.app.main import create_dispatcher
+
+    session_maker = create_sessionmaker(engine=engine)
+    dp = create_dispatcher(settings=settings, redis=redis)
+    dp["session_maker"] = session_maker
+    dp["availability_cache"] = AvailabilityCache(
+        redis=redis, policy=DEFAULT_SCHEDULE_POLICY
+    )
+    dp["calendar_months"] = MonthCache(session_maker=session_maker)
+    dp["slot_holds"] = SlotHolds(redis=redis)
+    dp["user_cache"] = UserCache()
+    dp.update.outer_middleware(DbSessionMiddleware(session_maker))
+    return dp
+
+
+async def _cleanup(
+    *, engine: AsyncEngine, redis: Redis, dp: Dispatcher, bot: Bot, tg_ids: range
+) -> int:
+    user_ids = select(User.id).where(User.tg_id.between(tg_ids[0], tg_ids[-1]))
+    async with engine.begin() as conn:
+        deleted = await conn.execute(
+            delete(Order).where(Order.user_id.in_(user_ids)).returning(Order.id)
+        )
+        orders = len(deleted.all())
+        await conn.execute(delete(User).where(User.id.in_(user_ids)))
+    storage = dp.fsm.storage
+    fsm_keys = [
+        storage.key_builder.build(  # type: ignore[attr-defined]
+            StorageKey(bot_id=bot.id, chat_id=tg_id, user_id=tg_id)
+        )
+        for tg_id in tg_ids
+    ]
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.delete(*fsm_keys)
+        # The shared availability snapshot still counts the deleted orders.
+        pipe.delete(AVAILABILITY_DAYS_KEY)
+        pipe.incr(AVAILABILITY_VERSION_KEY)
+        await pipe.execute()
+    return orders
+
+
+async def _run(args: argparse.Namespace) -> tuple[list[StepResult], dict[str, Any]]:
+    settings = Settings()
+    engine = create_async_engine(args.database_url or settings.database_url)
+    redis = await _create_redis(args.redis_url)
+    telegram = RecordingSession()
+    bot = Bot(token=BOT_TOKEN, session=telegram)
+    dp = _build_dispatcher(settings=settings, redis=redis, engine=engine)
+    tg_ids = range(args.user_id_base, args.user_id_base + args.users)
+
+    def count_query(*_args: Any) -> None:
+        _count("db_queries")
+
+    samples: dict[str, StepSamples] = {}
+    rnd = random.Random(args.seed)
+    gate = asyncio.Semaphore(args.concurrency or args.users)
+
+    async def run_user(tg_id: int) -> str:
+        user = VirtualUser(
+            tg_id=tg_id,
+            dp=dp,
+            bot=bot,
+            telegram=telegram,
+            samples=samples,
+            rnd=random.Random(rnd.random()),
+            think_ms=args.think_ms,
+            max_retries=args.max_retries,
+        )
+        async with gate:
+            try:
+                return await user.run()
+            except Exception as e:
+                # One broken user must not abort the run; report it as an outcome.
+                return f"error:{type(e).__name__}"
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    try:
+        with _redis_counters(redis):
+            started = time_mod.perf_counter()
+            outcomes = await asyncio.gather(*(run_user(tg_id) for tg_id in tg_ids))
+            wall_s = time_mod.perf_counter() - started
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+        try:
+            cleaned = await _cleanup(
+                engine=engine, redis=redis, dp=dp, bot=bot, tg_ids=tg_ids
+            )
+        finally:
+            await redis.aclose()
+            await engine.dispose()
+
+    totals: dict[str, int] = {}
+    for outcome in outcomes:
+        totals[outcome] = totals.get(outcome, 0) + 1
+    summary = {
+        "wall_s": round(wall_s, 3),
+        "outcomes": totals,
+        "telegram_calls": dict(sorted(telegram.calls.items())),
+        "orders_cleaned_up": cleaned,
+    }
+    return _summarize(samples), summary
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _load_baseline(path: str | None) -> dict[str, dict]:
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    return {row["step"]: row for row in payload.get("results", [])}
+
+
+def _print_table(
+    results: list[StepResult], summary: dict[str, Any], baseline: dict[str, dict]
+) -> None:
+    header = (
+        f"{'step':<20} {'n':>5} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} "
+        f"{'db/upd':>7} {'redis/upd':>9} {'rtt/upd':>7} {'tg/upd':>6} {'vs base':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        base = baseline.get(r.step)
+        delta = ""
+        if base and base.get("p50_ms"):
+            delta = f"{r.p50_ms / base['p50_ms']:.2f}x"
+        print(
+            f"{r.step:<20} {r.updates:>5} {r.p50_ms:>8.2f} {r.p90_ms:>8.2f} "
+            f"{r.p99_ms:>8.2f} {r.db_queries_per_update:>7.2f} "
+            f"{r.redis_commands_per_update:>9.2f} "
+            f"{r.redis_round_trips_per_update:>7.2f} "
+            f"{r.telegram_calls_per_update:>6.2f} {delta:>8}"
+        )
+    print(f"\nwall {summary['wall_s']}s, outcomes {summary['outcomes']}")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="virtual users in flight at once (default: all of them)",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=float,
+        default=300.0,
+        help="max random pause before each update",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="new time/date picks after losing a slot",
+    )
+    parser.add_argument("--user-id-base", type=int, default=2_000_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--redis-url", default=None, help="default: fakeredis")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to diff")
+    args = parser.parse_args(argv[1:])
+
+    results, summary = asyncio.run(_run(args))
+    _print_table(results, summary, _load_baseline(args.compare))
+
+    if args.output:
+        payload = {
+            "commit": _git_commit(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "params": {
+                "users": args.users,
+                "concurrency": args.concurrency or args.users,
+                "think_ms": args.think_ms,
+                "seed": args.seed,
+                "redis": "redis" if args.redis_url else "fakeredis",
+            },
+            "summary": summary,
+            "results": [asdict(r) for r in results],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,95 @@
+"""
+Callback data codec benchmark: aiogram's generic pack/unpack vs compiled codec.
+
+Runs both codecs over the same instances / wire strings for every callback
+class used by the bot and reports nanoseconds per operation.
+
+Usage:
+    python -m tools.bench.callback_codec --iterations 20000
+    python -m tools.bench.callback_codec --output codec.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from typing import Any
+
+from aiogram.filters.callback_data import CallbackData
+
+from apps.bot.handlers.admin_calendar import AdminCalCb
+from apps.bot.handlers.admin_catalog import AdminCatalogCb
+from apps.bot.handlers.gallery import GalleryCb
+from core.services.booking_flow import BookingCb
+from core.services.calendar_ui import CalendarCb
+
+SAMPLES: list[CallbackData] = [
+    CalendarCb(action="day", year=2026, month=2, day=14),
+    CalendarCb(action="noop", year=2026, month=2),
+    BookingCb(action="set", field="calendar_time", value="29489520"),
+    BookingCb(action="menu"),
+    GalleryCb(action="page", style_id=3, views=120, ref_id=45, seek="a", pos=8),
+    AdminCalCb(action="toggle_day", value="2026-02-14"),
+    AdminCatalogCb(action="style", style_id=7),
+]
+
+
+def _ns_per_op(fn: Any, iterations: int) -> float:
+    # Best of 3 repeats damps scheduler noise.
+    best = min(timeit.repeat(fn, number=iterations, repeat=3))
+    return best / iterations * 1e9
+
+
+def run(iterations: int) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for sample in SAMPLES:
+        cls = type(sample)
+        wire = CallbackData.pack(sample)
+        if sample.pack() != wire or cls.unpack(wire) != sample:
+            raise AssertionError(f"Codec mismatch for {wire!r}")
+        results.append(
+            {
+                "class": cls.__name__,
+                "wire": wire,
+                "pack_generic_ns": _ns_per_op(
+                    lambda s=sample: CallbackData.pack(s), iterations
+                ),
+                "pack_compiled_ns": _ns_per_op(sample.pack, iterations),
+                "unpack_generic_ns": _ns_per_op(
+                    lambda c=cls, w=wire: CallbackData.unpack.__func__(c, w),
+                    iterations,
+                ),
+                "unpack_compiled_ns": _ns_per_op(
+                    lambda c=cls, w=wire: c.unpack(w), iterations
+                ),
+            }
+        )
+    return results
+
+
+def _print_table(results: list[dict[str, Any]]) -> None:
+    print(f"{'wire':<34} {'pack ns':>17} {'unpack ns':>17}")
+    for row in results:
+        pack = f"{row['pack_generic_ns']:.0f}->{row['pack_compiled_ns']:.0f}"
+        unpack = f"{row['unpack_generic_ns']:.0f}->{row['unpack_compiled_ns']:.0f}"
+        print(f"{row['wire']:<34} {pack:>17} {unpack:>17}")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations)
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"results": results}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))